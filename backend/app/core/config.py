@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import FrozenSet, List
 import json
 import os
 
@@ -50,14 +51,57 @@ class Settings(BaseSettings):
     db_pool_timeout: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
     db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
 
+    # SQLite tuning (one pooled writer + reader pool)
+    sqlite_read_pool_size: int = int(os.getenv("SQLITE_READ_POOL_SIZE", "4"))
+    sqlite_mmap_size_mb: int = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+    sqlite_cache_size_mb: int = int(os.getenv("SQLITE_CACHE_SIZE_MB", "64"))
+    sqlite_checkpoint_interval_seconds: int = int(
+        os.getenv("SQLITE_CHECKPOINT_INTERVAL_SECONDS", "300")
+    )
+
+    # Query metrics (per-statement latency, N+1 detection, slow query log)
+    slow_query_ms: int = int(os.getenv("SLOW_QUERY_MS", "200"))
+    slow_query_explain: bool = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    n_plus_one_threshold: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+
+    # Logging pipeline (see app/core/logging_setup.py)
+    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_format: str = os.getenv("LOG_FORMAT", "json").lower()
+    # Per-logger sampling of DEBUG/INFO records: "logger=rate,logger=rate"
+    log_sample_rates: str = os.getenv("LOG_SAMPLE_RATES", "")
+
+    # Access log: fraction of requests logged (5xx responses are always logged)
+    access_log_sample_rate: float = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.1"))
+
+    # Read replicas (comma-separated URLs, used by get_db_readonly)
+    database_replica_urls: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    replica_max_lag_seconds: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    replica_lag_check_interval_seconds: int = int(
+        os.getenv("REPLICA_LAG_CHECK_INTERVAL_SECONDS", "10")
+    )
+    read_your_writes_seconds: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
     # Redis (optional, for scaling)
     redis_url: str = os.getenv("REDIS_URL", "")
 
+    # Authenticated user cache (get_current_user)
+    user_cache_ttl_seconds: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+    user_cache_max_size: int = int(os.getenv("USER_CACHE_MAX_SIZE", "2048"))
+
     # Security
     secret_key: str = os.getenv("SECRET_KEY", "")
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 480  # 8 hours for better UX
     refresh_token_expire_days: int = 30
+    # bcrypt runs in a dedicated thread pool; caps concurrent hashes per worker
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    # Revoked JWT IDs: Bloom filter sizing and rebuild period per worker
+    token_revocation_capacity: int = int(
+        os.getenv("TOKEN_REVOCATION_CAPACITY", "100000")
+    )
+    token_revocation_rebuild_seconds: int = int(
+        os.getenv("TOKEN_REVOCATION_REBUILD_SECONDS", "600")
+    )
 
     # CORS - requires explicit configuration, no wildcards by default
     # Упрощаем тип для совместимости
@@ -65,8 +109,57 @@ class Settings(BaseSettings):
 
     # Email
     internal_email_domain: str = os.getenv("INTERNAL_EMAIL_DOMAIN", "example.com")
+    # Incoming mail spool: SMTP replies once the raw message is on disk,
+    # workers parse and store it (with retries, then dead-letter)
+    email_spool_dir: str = os.getenv("EMAIL_SPOOL_DIR", "uploads/mail_spool")
+    email_spool_workers: int = int(os.getenv("EMAIL_SPOOL_WORKERS", "4"))
+    email_spool_max_attempts: int = int(os.getenv("EMAIL_SPOOL_MAX_ATTEMPTS", "5"))
+    email_spool_retry_seconds: float = float(
+        os.getenv("EMAIL_SPOOL_RETRY_SECONDS", "2")
+    )
+
+    # Outbound mail is queued and delivered by these in-process workers
+    email_outbox_workers: int = int(os.getenv("EMAIL_OUTBOX_WORKERS", "4"))
+    # A claim older than the relay's retry budget plus this grace is taken
+    # to be abandoned (crashed or failed worker) and is delivered again;
+    # each process looks for such claims every EMAIL_OUTBOX_RECLAIM_SECONDS
+    email_outbox_claim_grace_seconds: float = float(
+        os.getenv("EMAIL_OUTBOX_CLAIM_GRACE_SECONDS", "60")
+    )
+    email_outbox_reclaim_seconds: float = float(
+        os.getenv("EMAIL_OUTBOX_RECLAIM_SECONDS", "60")
+    )
+
+    # Incoming HTML sanitizer (see app/modules/email/sanitizer.py): bodies of
+    # EMAIL_SANITIZE_PROCESS_BYTES+ are cleaned in worker processes (0 = none)
+    email_sanitize_workers: int = int(os.getenv("EMAIL_SANITIZE_WORKERS", "2"))
+    email_sanitize_process_bytes: int = int(
+        os.getenv("EMAIL_SANITIZE_PROCESS_BYTES", "65536")
+    )
+    email_sanitize_cache_mb: int = int(os.getenv("EMAIL_SANITIZE_CACHE_MB", "32"))
+
+    # Keep mailbox counts in email_counters instead of aggregating per request
+    email_stats_counters: bool = (
+        os.getenv("EMAIL_STATS_COUNTERS", "false").lower() == "true"
+    )
+
+    # Outbound SMTP connection pool (see app/core/smtp_pool.py)
+    smtp_pool_max_per_host: int = int(os.getenv("SMTP_POOL_MAX_PER_HOST", "4"))
+    smtp_pool_idle_seconds: float = float(os.getenv("SMTP_POOL_IDLE_SECONDS", "30"))
+    smtp_pool_max_messages: int = int(os.getenv("SMTP_POOL_MAX_MESSAGES", "100"))
+    smtp_retry_attempts: int = int(os.getenv("SMTP_RETRY_ATTEMPTS", "3"))
+    smtp_retry_backoff_seconds: float = float(
+        os.getenv("SMTP_RETRY_BACKOFF_SECONDS", "1")
+    )
+
+    # Optional subsystems loaded at startup (comma-separated): email (mail
+    # API and handlers), smtp (inbound SMTP server), zsspd, mdns, metrics
+    subsystems: str = os.getenv("SUBSYSTEMS", "email,smtp,zsspd,mdns,metrics")
 
     # Seeding / Initial Setup
+    # Run create_all + seeding on startup when the stored schema/seed markers
+    # are stale. Set to false when deployments run `python -m scripts.migrate`
+    auto_migrate: bool = os.getenv("AUTO_MIGRATE", "true").lower() == "true"
     seed_test_data: bool = os.getenv("SEED_TEST_DATA", "false").lower() == "true"
     admin_username: str = os.getenv("ADMIN_USERNAME", "admin")
     # Use generic default for admin email if not provided
@@ -153,6 +246,18 @@ class Settings(BaseSettings):
         """Check if using SQLite database"""
         return "sqlite" in self.database_url.lower()
 
+    @property
+    def replica_urls(self) -> List[str]:
+        """Parsed read replica URLs"""
+        return [u.strip() for u in self.database_replica_urls.split(",") if u.strip()]
+
+    @property
+    def enabled_subsystems(self) -> FrozenSet[str]:
+        """Parsed SUBSYSTEMS setting"""
+        return frozenset(
+            name.strip().lower() for name in self.subsystems.split(",") if name.strip()
+        )
+
     @property
     def is_mysql(self) -> bool:
         """Check if using MySQL database"""
@@ -1,7 +1,139 @@
+import asyncio
+import json
+import logging
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.models import SystemSetting
-from typing import Any, Optional
+from app.core.redis_manager import redis_manager
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel used to propagate setting changes between workers
+SETTINGS_CHANNEL = "settings:invalidate"
+
+# Without a pub/sub subscription (e.g. Celery workers, scripts) changes made by
+# other processes can't reach us, so the snapshot is re-read after this many seconds.
+UNSUBSCRIBED_TTL_SECONDS = 60
+
+
+class CachedSetting(NamedTuple):
+    value: str
+    type: str
+    group: Optional[str]
+
+
+def decode_setting(value: str, setting_type: Optional[str]) -> Any:
+    """Convert a stored string value to its declared type"""
+    if setting_type == "int":
+        return int(value)
+    elif setting_type == "bool":
+        return value.lower() == "true"
+    elif setting_type == "json":
+        return json.loads(value)
+    return value
+
+
+class SettingsCache:
+    """
+    Process-wide in-memory snapshot of the system_settings table.
+
+    The whole table is loaded with a single query (at startup, or lazily on
+    first access) and then served from memory. Writes go through
+    ConfigService/SystemSettingService, which update the local snapshot and
+    publish the change so every other worker applies it as well.
+    """
+
+    def __init__(self) -> None:
+        self._settings: Dict[str, CachedSetting] = {}
+        self._loaded_at: Optional[float] = None
+        self._subscribed = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        if self._subscribed:
+            return True
+        return time.monotonic() - self._loaded_at < UNSUBSCRIBED_TTL_SECONDS
+
+    async def load(self, db: AsyncSession) -> None:
+        """Load all settings in one query, replacing the current snapshot"""
+        result = await db.execute(select(SystemSetting))
+        self._settings = {
+            s.key: CachedSetting(s.value, s.type, s.group)
+            for s in result.scalars().all()
+        }
+        self._loaded_at = time.monotonic()
+        logger.debug(f"Settings cache loaded ({len(self._settings)} keys)")
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load the snapshot if it is missing or stale"""
+        if self.is_loaded:
+            return
+        async with self._lock:
+            if not self.is_loaded:
+                await self.load(db)
+
+    async def get(
+        self, db: AsyncSession, key: str, group: Optional[str] = None
+    ) -> Optional[CachedSetting]:
+        """Get the cached entry for a key (None if missing)"""
+        await self.ensure_loaded(db)
+        entry = self._settings.get(key)
+        if entry is None or (group and entry.group != group):
+            return None
+        return entry
+
+    def apply(
+        self, key: str, value: str, setting_type: str, group: Optional[str]
+    ) -> None:
+        """Apply a single change to the local snapshot"""
+        self._settings[key] = CachedSetting(value, setting_type, group)
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next access reloads it"""
+        self._loaded_at = None
+
+    async def publish_change(self, setting: SystemSetting) -> None:
+        """Apply a committed change locally and broadcast it to other workers"""
+        self.apply(setting.key, setting.value, setting.type, setting.group)
+        await redis_manager.publish(
+            SETTINGS_CHANNEL,
+            {
+                "key": setting.key,
+                "value": setting.value,
+                "type": setting.type,
+                "group": setting.group,
+            },
+        )
+
+    async def publish_reload(self) -> None:
+        """Ask every worker (including this one) to reload the snapshot"""
+        self.invalidate()
+        await redis_manager.publish(SETTINGS_CHANNEL, {"reload": True})
+
+    async def subscribe(self) -> None:
+        """Subscribe to change notifications from other workers"""
+        await redis_manager.subscribe(SETTINGS_CHANNEL, self._handle_message)
+        # The in-memory fallback only delivers this process's own messages,
+        # so other workers' changes still need the periodic reload
+        self._subscribed = redis_manager.is_available
+
+    async def _handle_message(self, message: dict) -> None:
+        if message.get("reload"):
+            self.invalidate()
+            return
+        key = message.get("key")
+        if key is None:
+            return
+        self.apply(key, message["value"], message.get("type"), message.get("group"))
+
+
+# Singleton instance
+settings_cache = SettingsCache()
 
 
 class ConfigService:
@@ -11,16 +143,25 @@ class ConfigService:
     async def get_value(
         db: AsyncSession, key: str, default: Any = None, group: Optional[str] = None
     ) -> Any:
-        """Get configuration value with default"""
-        stmt = select(SystemSetting).where(SystemSetting.key == key)
-        if group:
-            stmt = stmt.where(SystemSetting.group == group)
+        """Get raw configuration value with default (served from settings cache)"""
+        entry = await settings_cache.get(db, key, group)
+        if entry is None:
+            return default
+        return entry.value
 
-        result = await db.execute(stmt)
-        setting = result.scalar_one_or_none()
-        if setting is None:
+    @staticmethod
+    async def get_typed_value(
+        db: AsyncSession, key: str, default: Any = None, group: Optional[str] = None
+    ) -> Any:
+        """Get configuration value decoded according to its stored type"""
+        entry = await settings_cache.get(db, key, group)
+        if entry is None:
+            return default
+        try:
+            return decode_setting(entry.value, entry.type)
+        except (ValueError, TypeError):
+            logger.warning(f"Setting {key} has invalid {entry.type} value")
             return default
-        return setting.value
 
     @staticmethod
     async def set_value(db: AsyncSession, key: str, value: Any, group: str = "general"):
@@ -32,7 +173,8 @@ class ConfigService:
             setting.value = str(value)
             # Optionally update group if it changed? Usually settings don't jump groups often.
         else:
-            setting = SystemSetting(key=key, value=str(value), group=group)
+            setting = SystemSetting(key=key, value=str(value), group=group, type="str")
             db.add(setting)
 
         await db.commit()
+        await settings_cache.publish_change(setting)
@@ -4,25 +4,35 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     AsyncEngine,
 )
-from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.pool import NullPool
-from sqlalchemy import select, delete, func, text, event
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy import select, delete, insert, inspect, func, text, event
 from app.core.config import get_settings
-from typing import AsyncGenerator
+from app.core.query_metrics import install_query_metrics
+from app.core.replicas import ReplicaSet, request_user_id
+from typing import AsyncGenerator, Dict, List, Optional
 
 
+import asyncio
+import hashlib
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+SCHEMA_VERSION_KEY = "schema_version"
+SEED_VERSION_KEY = "seed_version"
+
 
 def create_engine_with_pool() -> AsyncEngine:
     """
     Create database engine with appropriate connection pooling.
 
-    - SQLite: Uses NullPool (no pooling, single connection)
+    - SQLite: single persistent writer connection (SQLite allows one writer;
+      waiting for the pool serializes writes instead of hitting busy_timeout)
     - MySQL/PostgreSQL: Uses QueuePool with configurable size
     """
     common_args = {
@@ -31,11 +41,13 @@ def create_engine_with_pool() -> AsyncEngine:
     }
 
     if settings.is_sqlite:
-        # SQLite doesn't support connection pooling well
-        # Use NullPool to create new connection each time
-        logger.info("Database: Using SQLite with NullPool")
+        logger.info("Database: Using SQLite with pooled writer connection")
         return create_async_engine(
-            settings.database_url, poolclass=NullPool, **common_args
+            settings.database_url,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=settings.db_pool_timeout,
+            **common_args,
         )
     else:
         # MySQL/PostgreSQL - use connection pooling
@@ -54,36 +66,198 @@ def create_engine_with_pool() -> AsyncEngine:
         )
 
 
-# Create async engine with appropriate pooling
-engine = create_engine_with_pool()
-
-# Create async session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+def create_sqlite_read_engine() -> AsyncEngine:
+    """Create the SQLite reader pool (WAL lets readers run alongside the writer)"""
+    logger.info(
+        f"Database: Using SQLite reader pool (size={settings.sqlite_read_pool_size})"
+    )
+    return create_async_engine(
+        settings.database_url,
+        pool_size=settings.sqlite_read_pool_size,
+        max_overflow=settings.sqlite_read_pool_size,
+        pool_timeout=settings.db_pool_timeout,
+        echo=settings.debug,
+        future=True,
+    )
 
 
-@event.listens_for(engine.sync_engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
     """
     Apply SQLite performance and concurrency optimizations.
 
+    Runs once per physical connection; pooled connections keep these settings.
+
     - WAL Mode: Allows concurrent reads and writes
     - busy_timeout: Retries when database is locked
     - synchronous=NORMAL: Improved write performance safely in WAL mode
+    - mmap_size/cache_size: Serve hot pages from memory instead of read() calls
+    - temp_store=MEMORY: Sorts and temp indices don't touch disk
     """
     if settings.is_sqlite:
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute("PRAGMA synchronous=NORMAL")
         cursor.execute("PRAGMA busy_timeout=5000")  # 5 seconds
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}")
+        # Negative cache_size is in KiB
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_mb * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
         cursor.close()
 
 
+def create_replica_engines() -> List[AsyncEngine]:
+    """Create engines for read replicas (DATABASE_REPLICA_URLS)"""
+    engines = []
+    for url in settings.replica_urls:
+        engines.append(
+            create_async_engine(
+                url,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+                pool_timeout=settings.db_pool_timeout,
+                pool_recycle=settings.db_pool_recycle,
+                pool_pre_ping=True,
+                echo=settings.debug,
+                future=True,
+            )
+        )
+    if engines:
+        logger.info(f"Database: Using {len(engines)} read replica(s)")
+    return engines
+
+
+_TEXT_SELECT = re.compile(r"\s*select\b", re.IGNORECASE)
+
+
+def _is_write(clause) -> bool:
+    """INSERT/UPDATE/DELETE, DDL, or a raw text() statement other than SELECT"""
+    if isinstance(clause, UpdateBase) or getattr(clause, "is_ddl", False):
+        return True
+    if isinstance(clause, TextClause):
+        return _TEXT_SELECT.match(clause.text) is None
+    return False
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the reader engine and writes to its bind.
+
+    Once a transaction has written (flush, INSERT/UPDATE/DELETE, DDL or a
+    text() statement that isn't a SELECT), it stays on the writer until it
+    ends, so it always reads its own uncommitted changes.
+    Sessions given a ReplicaSet (get_db_readonly) read from one replica per
+    transaction when the replica set allows it.
+    """
+
+    def __init__(
+        self,
+        *args,
+        reader: Optional[AsyncEngine] = None,
+        replicas: Optional[ReplicaSet] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._reader = reader.sync_engine if reader is not None else None
+        self._replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        writer = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self.info.get("use_writer"):
+            return writer
+        if self._flushing or _is_write(clause):
+            self.info["use_writer"] = True
+            return writer
+        if self._replicas is not None:
+            if "replica" not in self.info:
+                replica = self._replicas.choose(request_user_id.get())
+                self.info["replica"] = replica.sync_engine if replica else None
+            if self.info["replica"] is not None:
+                return self.info["replica"]
+        return self._reader or writer
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _open_read_your_writes_window(session):
+    if session.info.get("use_writer"):
+        replicas.mark_write(request_user_id.get())
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_transaction_routing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("use_writer", None)
+        session.info.pop("replica", None)
+
+
+# Create async engine with appropriate pooling
+engine = create_engine_with_pool()
+event.listen(engine.sync_engine, "connect", set_sqlite_pragma)
+
+# SQLite reads use their own pool; other databases share the primary engine
+if settings.is_sqlite:
+    read_engine = create_sqlite_read_engine()
+    event.listen(read_engine.sync_engine, "connect", set_sqlite_pragma)
+else:
+    read_engine = engine
+
+# Per-statement latency/N+1 metrics on every engine
+install_query_metrics()
+
+replicas = ReplicaSet(
+    create_replica_engines(),
+    max_lag_seconds=settings.replica_max_lag_seconds,
+    read_your_writes_seconds=settings.read_your_writes_seconds,
+    check_interval_seconds=settings.replica_lag_check_interval_seconds,
+)
+
+# Create async session factories
+AsyncSessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    reader=read_engine if read_engine is not engine else None,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+ReadOnlySessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    reader=read_engine if read_engine is not engine else None,
+    replicas=replicas,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+
+async def checkpoint_sqlite_wal() -> None:
+    """
+    Periodically checkpoint the WAL on the writer connection.
+
+    PASSIVE never blocks readers or writers; it keeps the WAL (and read cost)
+    small when readers are almost always active.
+    """
+    while True:
+        await asyncio.sleep(settings.sqlite_checkpoint_interval_seconds)
+        try:
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)")
+        except Exception as e:
+            logger.warning(f"SQLite WAL checkpoint failed: {e}")
+
+
+async def dispose_engines() -> None:
+    """Close all pooled connections"""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+    for replica in replicas.engines:
+        await replica.dispose()
+
+
 class Base(DeclarativeBase):
     """Base class for all models"""
 
@@ -99,9 +273,21 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-async def init_db() -> None:
-    """Initialize database - create all tables"""
-    # Import all models here so they register with Base.metadata
+async def get_db_readonly() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for read-only endpoints: reads go to a replica when one is
+    in rotation and the current user has no recent writes, else the primary
+    """
+    async with ReadOnlySessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def import_models() -> None:
+    """Import all models so they register with Base.metadata"""
+    import app.core.models
     import app.modules.auth.models
     import app.modules.chat.models
     import app.modules.board.models
@@ -109,10 +295,74 @@ async def init_db() -> None:
     import app.modules.admin.models
     import app.modules.tasks.models
     import app.modules.email.models
+    import app.modules.zsspd.models
+
+
+def schema_fingerprint() -> str:
+    """Hash of tables, columns and indexes declared by the models"""
+    import_models()
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        parts.extend(
+            f"{c.name}:{c.type!r}:{c.nullable}:{c.primary_key}" for c in table.columns
+        )
+        parts.extend(
+            sorted(
+                f"ix {i.name}:{[c.name for c in i.columns]}:{i.unique}"
+                for i in table.indexes
+            )
+        )
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+async def read_schema_meta(conn) -> Dict[str, str]:
+    """Boot markers stored in schema_meta ({} if the table doesn't exist yet)"""
+    from app.core.models import SchemaMeta
+
+    has_table = await conn.run_sync(
+        lambda sync_conn: inspect(sync_conn).has_table(SchemaMeta.__tablename__)
+    )
+    if not has_table:
+        return {}
+    result = await conn.execute(select(SchemaMeta.key, SchemaMeta.value))
+    return dict(result.all())
+
+
+async def write_schema_meta(conn, key: str, value: str) -> None:
+    from app.core.models import SchemaMeta
+
+    await conn.execute(delete(SchemaMeta).where(SchemaMeta.key == key))
+    await conn.execute(insert(SchemaMeta).values(key=key, value=value))
+
+
+async def schema_is_current(bind: Optional[AsyncEngine] = None) -> bool:
+    """Whether the stored schema fingerprint matches the models"""
+    async with (bind or engine).connect() as conn:
+        meta = await read_schema_meta(conn)
+    return meta.get(SCHEMA_VERSION_KEY) == schema_fingerprint()
+
+
+async def init_db(bind: Optional[AsyncEngine] = None, force: bool = False) -> bool:
+    """
+    Initialize database - create all tables.
+
+    Skipped when the stored schema fingerprint matches the models (warm boot).
+    Returns True if create_all ran.
+    """
+    bind = bind or engine
+    fingerprint = schema_fingerprint()
 
     try:
-        async with engine.begin() as conn:
+        async with bind.begin() as conn:
+            if not force:
+                meta = await read_schema_meta(conn)
+                if meta.get(SCHEMA_VERSION_KEY) == fingerprint:
+                    return False
             await conn.run_sync(Base.metadata.create_all)
+            await write_schema_meta(conn, SCHEMA_VERSION_KEY, fingerprint)
     except Exception as e:
         logger.error(f"Failed to create database tables: {e}")
         raise
+    logger.info("Database schema created/updated")
+    return True
@@ -5,16 +5,22 @@ This module provides reusable functions for common database operations
 to reduce code duplication and improve consistency across routers.
 """
 
-from typing import Type, TypeVar, Optional
-from sqlalchemy.orm import Session
+from typing import Iterable, Sequence, Set, Type, TypeVar, Optional
+from sqlalchemy import exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from app.core.database import Base
+from app.core.repository import IN_CHUNK_SIZE
 
 T = TypeVar("T", bound=Base)
 
 
-def get_or_404(
-    db: Session, model: Type[T], entity_id: int, error_message: str = "Entity not found"
+async def get_or_404(
+    db: AsyncSession,
+    model: Type[T],
+    entity_id: int,
+    error_message: str = "Entity not found",
+    options: Sequence = (),
 ) -> T:
     """
     Get entity by ID or raise 404 HTTPException.
@@ -24,6 +30,7 @@ def get_or_404(
         model: SQLAlchemy model class
         entity_id: ID of the entity to retrieve
         error_message: Custom error message for 404 response
+        options: Loader options (e.g. selectinload) applied to the lookup
 
     Returns:
         The entity instance
@@ -32,9 +39,9 @@ def get_or_404(
         HTTPException: 404 if entity not found
 
     Example:
-        document = get_or_404(db, Document, document_id, "Document not found")
+        document = await get_or_404(db, Document, document_id, "Document not found")
     """
-    entity = db.query(model).filter(model.id == entity_id).first()
+    entity = await db.get(model, entity_id, options=options)
     if not entity:
         raise HTTPException(status_code=404, detail=error_message)
     return entity
@@ -69,8 +76,8 @@ def check_ownership(
         raise HTTPException(status_code=403, detail=error_message)
 
 
-def check_access(
-    db: Session,
+async def check_access(
+    db: AsyncSession,
     entity: Base,
     user_id: int,
     owner_field: str = "owner_id",
@@ -96,7 +103,7 @@ def check_access(
         HTTPException: 403 if user doesn't have access
 
     Example:
-        check_access(
+        await check_access(
             db, document, current_user.id,
             share_model=DocumentShare,
             entity_id_field='document_id'
@@ -108,15 +115,15 @@ def check_access(
 
     # Check if entity is shared with user
     if share_model and entity_id_field:
-        share = (
-            db.query(share_model)
-            .filter(
-                getattr(share_model, entity_id_field) == entity.id,
-                getattr(share_model, user_id_field) == user_id,
+        shared = await db.scalar(
+            select(
+                exists().where(
+                    getattr(share_model, entity_id_field) == entity.id,
+                    getattr(share_model, user_id_field) == user_id,
+                )
             )
-            .first()
         )
-        if share:
+        if shared:
             return
 
     # No access
@@ -127,7 +134,7 @@ def check_task_permission(
     task: Base, user_id: int, error_message: str = "Not authorized"
 ) -> None:
     """
-    Check if user has permission to access a task (as assignee or creator).
+    Check if user has permission to access a task (as assignee or issuer).
 
     Args:
         task: The task entity to check
@@ -140,5 +147,85 @@ def check_task_permission(
     Example:
         check_task_permission(task, current_user.id)
     """
-    if task.assignee_id != user_id and task.creator_id != user_id:
+    if task.assignee_id != user_id and task.issuer_id != user_id:
         raise HTTPException(status_code=403, detail=error_message)
+
+
+# ==================== Batched Access Checks ====================
+# Answer "which of these N entities can the user access" with one query
+# (per chunk of IDs) instead of one or more queries per entity.
+
+
+def _chunks(ids: Iterable[int]):
+    unique = list(dict.fromkeys(ids))
+    for start in range(0, len(unique), IN_CHUNK_SIZE):
+        yield unique[start : start + IN_CHUNK_SIZE]
+
+
+async def accessible_document_ids(
+    db: AsyncSession, user_id: int, document_ids: Iterable[int]
+) -> Set[int]:
+    """
+    Return the subset of document_ids the user can open.
+
+    Access is granted to the owner, to direct share recipients and to members
+    of any channel the document was posted in.
+    """
+    from app.modules.board.models import Document, DocumentShare
+    from app.modules.chat.models import ChannelMember, Message
+
+    shared = exists().where(
+        DocumentShare.document_id == Document.id,
+        DocumentShare.recipient_id == user_id,
+    )
+    posted_in_member_channel = (
+        select(Message.id)
+        .join(ChannelMember, ChannelMember.channel_id == Message.channel_id)
+        .where(Message.document_id == Document.id, ChannelMember.user_id == user_id)
+        .exists()
+    )
+
+    allowed: Set[int] = set()
+    for chunk in _chunks(document_ids):
+        result = await db.execute(
+            select(Document.id).where(
+                Document.id.in_(chunk),
+                or_(Document.owner_id == user_id, shared, posted_in_member_channel),
+            )
+        )
+        allowed.update(result.scalars().all())
+    return allowed
+
+
+async def accessible_archive_file_ids(
+    db: AsyncSession, user: Base, file_ids: Iterable[int]
+) -> Set[int]:
+    """
+    Return the subset of file_ids the user can view: files of their own unit
+    (admins can view every unit's files).
+    """
+    from app.modules.archive.models import ArchiveFile
+
+    return await _same_unit_ids(db, ArchiveFile, user, file_ids)
+
+
+async def accessible_archive_folder_ids(
+    db: AsyncSession, user: Base, folder_ids: Iterable[int]
+) -> Set[int]:
+    """Return the subset of folder_ids in the user's unit (admins: all units)"""
+    from app.modules.archive.models import ArchiveFolder
+
+    return await _same_unit_ids(db, ArchiveFolder, user, folder_ids)
+
+
+async def _same_unit_ids(
+    db: AsyncSession, model: Type[T], user: Base, ids: Iterable[int]
+) -> Set[int]:
+    allowed: Set[int] = set()
+    for chunk in _chunks(ids):
+        stmt = select(model.id).where(model.id.in_(chunk))
+        if user.role != "admin":
+            stmt = stmt.where(model.unit_id == user.unit_id)
+        result = await db.execute(stmt)
+        allowed.update(result.scalars().all())
+    return allowed
@@ -1,6 +1,9 @@
 from typing import Dict, List, Callable, Type, Awaitable
 from dataclasses import dataclass, field
 import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -34,8 +37,12 @@ class EventBus:
         for handler in handlers:
             try:
                 await handler(event)
-            except Exception as e:
-                print(f"Error in event handler: {e}")
+            except Exception:
+                logger.exception(
+                    "Error in event handler %s for %s",
+                    getattr(handler, "__qualname__", handler),
+                    type(event).__name__,
+                )
 
 
 event_bus = EventBus()
@@ -1,8 +1,11 @@
 import json
+import logging
 import os
 from pathlib import Path
 from typing import Dict, Any
 
+logger = logging.getLogger(__name__)
+
 
 class I18N:
     def __init__(self, locales_dir: str, default_locale: str = "ru"):
@@ -14,7 +17,7 @@ class I18N:
     def _load_translations(self):
         """Load translation files from the locales directory."""
         if not self.locales_dir.exists():
-            print(f"Warning: Locales directory {self.locales_dir} does not exist.")
+            logger.warning(f"Locales directory {self.locales_dir} does not exist")
             return
 
         for locale_dir in self.locales_dir.iterdir():
@@ -26,7 +29,7 @@ class I18N:
                         with open(messages_file, "r", encoding="utf-8") as f:
                             self.translations[locale] = json.load(f)
                     except Exception as e:
-                        print(f"Error loading translations for {locale}: {e}")
+                        logger.error(f"Error loading translations for {locale}: {e}")
 
     def t(self, key: str, locale: str = None, **kwargs) -> str:
         """
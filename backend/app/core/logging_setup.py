@@ -0,0 +1,133 @@
+"""
+Logging Pipeline
+
+All records are handed to a QueueHandler on the root logger and written
+by a QueueListener thread, so the event loop never blocks on stdout or
+file I/O:
+
+- Lazy formatting: the calling thread only attaches the request ID; the
+  message (`%`-style args) and traceback are rendered on the listener
+  thread. Hot paths should log with args, not f-strings
+- Structured output: one JSON object per line (LOG_FORMAT=json) or the
+  classic text format (LOG_FORMAT=text)
+- Request correlation: every record carries the request_id of the request
+  it was logged from
+- Sampling: LOG_SAMPLE_RATES="app.access=0.1,app.modules.chat.router=0.05"
+  keeps that fraction of a logger's DEBUG/INFO records; warnings and
+  errors always pass
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.core.config import get_settings
+from app.core.middleware import request_id
+
+settings = get_settings()
+
+# Loggers uvicorn configures with its own handlers; routed through the queue
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        rid = getattr(record, "request_id", None)
+        if rid:
+            entry["request_id"] = rid
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        rid = getattr(record, "request_id", None)
+        return f"{line} rid={rid}" if rid else line
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records without formatting them.
+
+    The stock QueueHandler renders the message in the calling thread; here
+    only context that is gone by the time the listener runs is captured.
+    Mutable objects passed as args must not be changed after logging.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id.get()
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of DEBUG/INFO records; WARNING and above always pass"""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for item in value.split(","):
+        name, sep, rate = item.partition("=")
+        if sep and name.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def setup_logging(stream=None) -> logging.handlers.QueueListener:
+    """Install the queue-backed pipeline (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(
+        JsonFormatter() if settings.log_format == "json" else TextFormatter()
+    )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [
+        h for h in root.handlers if not isinstance(h, ContextQueueHandler)
+    ] + [ContextQueueHandler(log_queue)]
+    root.setLevel(settings.log_level.upper())
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    for name, rate in parse_sample_rates(settings.log_sample_rates).items():
+        logging.getLogger(name).addFilter(SamplingFilter(rate))
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    # Flush whatever is still queued when the worker exits
+    atexit.register(_listener.stop)
+    return _listener
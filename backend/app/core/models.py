@@ -29,3 +29,16 @@ class SystemSetting(Base):
     group: Mapped[str] = mapped_column(
         String(50), default="general"
     )  # general, security, email, storage
+
+
+class SchemaMeta(Base):
+    """
+    Boot markers (schema fingerprint, seed version).
+
+    Lets warm boots skip create_all and seeding when nothing has changed.
+    """
+
+    __tablename__ = "schema_meta"
+
+    key: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -0,0 +1,218 @@
+"""
+Query Metrics
+
+SQLAlchemy cursor events time every statement on every engine:
+
+- db_query_duration_seconds{statement, route}: latency histogram, where
+  statement is a normalized "<VERB> <table>" fingerprint and route is the
+  matched route template (or "background" outside requests)
+- db_queries_per_request{route}: statements issued per HTTP request
+- N+1 detection: the same statement repeated N_PLUS_ONE_THRESHOLD times in one
+  request is logged once with its route
+- Slow query log: statements over SLOW_QUERY_MS are logged with their plan
+
+Metrics are exported through the default Prometheus registry (/api/metrics).
+Tests can assert a per-request query budget with query_budget().
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database statement latency",
+    ["statement", "route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Database statements issued per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_IN_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_TARGET = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+[\"`]?(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> Tuple[str, str]:
+    """
+    Return (normalized SQL, fingerprint) for a statement.
+
+    Expanded IN-lists and literals are collapsed so all executions of one
+    query share a key; the fingerprint ("SELECT messages") keeps label
+    cardinality bounded.
+    """
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _IN_LIST.sub("(?)", sql)
+    sql = _LITERAL.sub("?", sql)
+    verb = sql.split(" ", 1)[0].upper() if sql else ""
+    target = _TARGET.search(sql)
+    fingerprint = f"{verb} {target.group(1)}" if target else verb
+    return sql, fingerprint
+
+
+class QueryStats:
+    """Statements observed within one scope (a request or a query_budget block)"""
+
+    def __init__(self, scope: Optional[dict] = None) -> None:
+        self.scope = scope
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route") if self.scope else None
+        return getattr(route, "path", None) or "unmatched"
+
+    def record(self, sql: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[sql] += 1
+
+
+# Stack of active QueryStats collectors for the current context
+_collectors: ContextVar[Tuple[QueryStats, ...]] = ContextVar(
+    "query_collectors", default=()
+)
+# The request-level collector (first one pushed by the middleware)
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+@contextmanager
+def collect_queries(scope: Optional[dict] = None) -> Iterator[QueryStats]:
+    """Count statements executed in this context (and tasks spawned from it)"""
+    stats = QueryStats(scope)
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block issues more than max_queries statements.
+
+        with query_budget(3):
+            await client.get("/api/tasks/issued", headers=headers)
+    """
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        top = "\n".join(f"  {n}x {sql}" for sql, n in stats.statements.most_common(5))
+        raise AssertionError(
+            f"Query budget exceeded: {stats.count} > {max_queries}\n{top}"
+        )
+
+
+# ==================== Engine Events ====================
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+
+    sql, fingerprint = normalize_statement(statement)
+    request = _request_stats.get()
+    route = request.route if request else "background"
+    QUERY_DURATION.labels(fingerprint, route).observe(elapsed)
+
+    for stats in _collectors.get():
+        stats.record(sql, elapsed)
+
+    if request and request.statements[sql] == settings.n_plus_one_threshold:
+        logger.warning(
+            f"Possible N+1 on {request.route}: statement repeated "
+            f"{settings.n_plus_one_threshold} times: {sql}"
+        )
+
+    if elapsed * 1000 >= settings.slow_query_ms:
+        plan = _explain(conn, statement, parameters) if not executemany else None
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms) on {route}: {sql}"
+            + (f"\nPlan:\n{plan}" if plan else "")
+        )
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """Plan of a slow SELECT, run on the same connection (best effort)"""
+    if not settings.slow_query_explain:
+        return None
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"(EXPLAIN failed: {e})"
+    return "\n".join(" | ".join(str(col) for col in row) for row in rows)
+
+
+def install_query_metrics() -> None:
+    """Time statements on every engine (idempotent)"""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ==================== ASGI Middleware ====================
+
+
+class QueryMetricsMiddleware:
+    """Attach a query collector to each HTTP request and record its total"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect_queries(scope) as stats:
+            token = _request_stats.set(stats)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _request_stats.reset(token)
+                if stats.scope.get("route") is not None:
+                    QUERIES_PER_REQUEST.labels(stats.route).observe(stats.count)
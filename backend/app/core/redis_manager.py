@@ -276,6 +276,69 @@ class RedisManager:
             logger.error(f"Redis SMEMBERS error: {e}")
             return []
 
+    # ==================== Sorted Set Operations ====================
+
+    def _memory_zset(self, name: str) -> Dict[str, float]:
+        if not isinstance(self._memory_cache.get(name), dict):
+            self._memory_cache[name] = {}
+        return self._memory_cache[name]
+
+    async def zadd(self, name: str, member: str, score: float) -> None:
+        """Add member to sorted set (or update its score)"""
+        if self._fallback_mode:
+            self._memory_zset(name)[member] = score
+            return
+        try:
+            await self._redis.zadd(name, {member: score})
+        except Exception as e:
+            logger.error(f"Redis ZADD error: {e}")
+            self._memory_zset(name)[member] = score
+
+    async def zscore(self, name: str, member: str) -> Optional[float]:
+        """Get member score (None if not in set)"""
+        if self._fallback_mode:
+            return self._memory_zset(name).get(member)
+        try:
+            return await self._redis.zscore(name, member)
+        except Exception as e:
+            logger.error(f"Redis ZSCORE error: {e}")
+            return self._memory_zset(name).get(member)
+
+    async def zrangebyscore(
+        self, name: str, min_score: float, max_score: float
+    ) -> List[str]:
+        """
+        Get members with min_score <= score <= max_score. Redis errors are
+        raised: an empty result would be mistaken for an empty set.
+        """
+        if self._fallback_mode:
+            return [
+                m
+                for m, s in self._memory_zset(name).items()
+                if min_score <= s <= max_score
+            ]
+        try:
+            return list(await self._redis.zrangebyscore(name, min_score, max_score))
+        except Exception as e:
+            logger.error(f"Redis ZRANGEBYSCORE error: {e}")
+            raise
+
+    async def zremrangebyscore(
+        self, name: str, min_score: float, max_score: float
+    ) -> int:
+        """Remove members with min_score <= score <= max_score"""
+        if self._fallback_mode:
+            zset = self._memory_zset(name)
+            stale = [m for m, s in zset.items() if min_score <= s <= max_score]
+            for m in stale:
+                del zset[m]
+            return len(stale)
+        try:
+            return await self._redis.zremrangebyscore(name, min_score, max_score)
+        except Exception as e:
+            logger.error(f"Redis ZREMRANGEBYSCORE error: {e}")
+            return 0
+
     # ==================== Pub/Sub Operations ====================
 
     async def publish(self, channel: str, message: dict):
@@ -0,0 +1,175 @@
+"""
+Read Replica Routing
+
+Sessions from get_db_readonly send reads to a replica instead of the primary:
+
+- Round-robin over replicas whose last measured lag is within
+  REPLICA_MAX_LAG_SECONDS; if none qualify, reads go to the primary
+- Read-your-writes: after a user's transaction writes on the primary, that
+  user's reads stay on the primary for READ_YOUR_WRITES_SECONDS. The window
+  is broadcast over pub/sub so every worker honours it
+- Lag is sampled periodically per replica (an unreachable replica counts as
+  infinitely behind until the next successful check)
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+RECENT_WRITE_CHANNEL = "db:recent_write"
+
+# Authenticated user of the current request (set by get_current_user)
+request_user_id: ContextVar[Optional[int]] = ContextVar("request_user_id", default=None)
+
+
+class ReplicaSet:
+    """Replica engines with lag tracking and per-user read-your-writes windows"""
+
+    def __init__(
+        self,
+        engines: List[AsyncEngine],
+        max_lag_seconds: float,
+        read_your_writes_seconds: float,
+        check_interval_seconds: float,
+    ) -> None:
+        self.engines = engines
+        self.max_lag_seconds = max_lag_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._lag: List[float] = [0.0] * len(engines)
+        # user_id -> monotonic deadline of the read-your-writes window
+        self._recent_writers: Dict[int, float] = {}
+        self._round_robin = itertools.count()
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    # ==================== Routing ====================
+
+    def choose(self, user_id: Optional[int] = None) -> Optional[AsyncEngine]:
+        """Return a replica for this read, or None to use the primary"""
+        if not self.engines:
+            return None
+        if user_id is not None and self._in_write_window(user_id):
+            return None
+        healthy = [
+            engine
+            for engine, lag in zip(self.engines, self._lag)
+            if lag <= self.max_lag_seconds
+        ]
+        if not healthy:
+            return None
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    def mark_write(self, user_id: Optional[int]) -> None:
+        """Pin a user's reads to the primary after they wrote"""
+        if user_id is None or not self.engines:
+            return
+        self._open_write_window(user_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(
+            redis_manager.publish(RECENT_WRITE_CHANNEL, {"user_id": user_id})
+        )
+
+    def _open_write_window(self, user_id: int) -> None:
+        self._recent_writers[user_id] = time.monotonic() + self.read_your_writes_seconds
+
+    def _in_write_window(self, user_id: int) -> bool:
+        deadline = self._recent_writers.get(user_id)
+        if deadline is None:
+            return False
+        if deadline < time.monotonic():
+            self._recent_writers.pop(user_id, None)
+            return False
+        return True
+
+    # ==================== Lag Monitoring ====================
+
+    @staticmethod
+    async def measure_lag(engine: AsyncEngine) -> float:
+        """Seconds the replica is behind the primary (inf if unknown)"""
+        dialect = engine.dialect.name
+        async with engine.connect() as conn:
+            if dialect == "postgresql":
+                result = await conn.execute(
+                    text(
+                        "SELECT CASE WHEN pg_last_wal_receive_lsn() = "
+                        "pg_last_wal_replay_lsn() THEN 0 ELSE COALESCE("
+                        "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()),"
+                        " 0) END"
+                    )
+                )
+                return float(result.scalar() or 0)
+            if dialect in ("mysql", "mariadb"):
+                try:
+                    result = await conn.execute(text("SHOW REPLICA STATUS"))
+                    column = "Seconds_Behind_Source"
+                except Exception:
+                    result = await conn.execute(text("SHOW SLAVE STATUS"))
+                    column = "Seconds_Behind_Master"
+                row = result.mappings().first()
+                if row is None or row.get(column) is None:
+                    # Replication not running
+                    return math.inf
+                return float(row[column])
+        # SQLite and others read the primary's file directly
+        return 0.0
+
+    async def refresh_lag(self) -> None:
+        for index, engine in enumerate(self.engines):
+            try:
+                lag = await self.measure_lag(engine)
+            except Exception as e:
+                logger.warning(f"Replica {index} lag check failed: {e}")
+                lag = math.inf
+            if lag > self.max_lag_seconds >= self._lag[index]:
+                logger.warning(
+                    f"Replica {index} is {lag:.1f}s behind, routing reads to primary"
+                )
+            self._lag[index] = lag
+
+    def status(self) -> List[dict]:
+        return [
+            {
+                "index": index,
+                "lag_seconds": None if math.isinf(lag) else lag,
+                "in_rotation": lag <= self.max_lag_seconds,
+            }
+            for index, lag in enumerate(self._lag)
+        ]
+
+    async def start(self) -> None:
+        """Follow other workers' writes and start lag monitoring"""
+        if not self.engines:
+            return
+        await redis_manager.subscribe(RECENT_WRITE_CHANNEL, self._handle_write)
+        await self.refresh_lag()
+        if self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor_loop())
+
+    async def stop(self) -> None:
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+
+    async def _handle_write(self, message: dict) -> None:
+        user_id = message.get("user_id")
+        if user_id is not None:
+            self._open_write_window(int(user_id))
+
+    async def _monitor_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval_seconds)
+            await self.refresh_lag()
@@ -3,8 +3,19 @@ Base repository class to eliminate CRUD duplication.
 Provides generic database operations for all models.
 """
 
-from typing import Generic, TypeVar, Type, Optional, List, Any
-from sqlalchemy import select, update, delete as sql_delete
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
+from sqlalchemy import select, update, insert, func, inspect, delete as sql_delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from sqlalchemy.orm import DeclarativeBase
@@ -13,6 +24,14 @@ ModelType = TypeVar("ModelType", bound=DeclarativeBase)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=Any)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=Any)
 
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+IN_CHUNK_SIZE = 500
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
 
 class BaseRepository(Generic[ModelType]):
     """Generic repository with common CRUD operations."""
@@ -22,9 +41,36 @@ class BaseRepository(Generic[ModelType]):
         self.model_name = model.__name__
 
     async def get_by_id(self, db: AsyncSession, id: int) -> Optional[ModelType]:
-        """Get a single record by ID."""
-        result = await db.execute(select(self.model).where(self.model.id == id))
-        return result.scalar_one_or_none()
+        """Get a single record by ID (served from the session if already loaded)."""
+        return await db.get(self.model, id)
+
+    async def get_many(
+        self, db: AsyncSession, ids: Iterable[int]
+    ) -> Dict[int, ModelType]:
+        """
+        Get records by ID as {id: record}; missing IDs are omitted.
+
+        Records already in the session's identity map are reused; the rest
+        are loaded with one IN query per chunk.
+        """
+        found: Dict[int, ModelType] = {}
+        missing = []
+        for id in dict.fromkeys(ids):
+            key = db.sync_session.identity_key(self.model, id)
+            obj = db.sync_session.identity_map.get(key)
+            # Expired objects would need a lazy refresh; reload them instead
+            if obj is not None and not inspect(obj).expired_attributes:
+                found[id] = obj
+            else:
+                missing.append(id)
+
+        for chunk in _chunks(missing, IN_CHUNK_SIZE):
+            result = await db.execute(
+                select(self.model).where(self.model.id.in_(chunk))
+            )
+            for obj in result.scalars():
+                found[obj.id] = obj
+        return found
 
     async def get_all(
         self, db: AsyncSession, skip: int = 0, limit: int = 100
@@ -34,6 +80,29 @@ class BaseRepository(Generic[ModelType]):
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    async def iterate(
+        self, db: AsyncSession, *criteria: Any, batch_size: int = 500
+    ) -> AsyncIterator[List[ModelType]]:
+        """
+        Yield matching records in ID order, one batch at a time.
+
+        Uses keyset pagination (id > last seen id), so each batch costs the
+        same regardless of how deep into the table it is.
+        """
+        last_id = None
+        while True:
+            stmt = select(self.model).where(*criteria)
+            if last_id is not None:
+                stmt = stmt.where(self.model.id > last_id)
+            stmt = stmt.order_by(self.model.id).limit(batch_size)
+            batch = list((await db.execute(stmt)).scalars().all())
+            if not batch:
+                return
+            yield batch
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1].id
+
     async def create(self, db: AsyncSession, obj_data: CreateSchemaType) -> ModelType:
         """Create a new record."""
         db_obj = self.model(**obj_data.model_dump())
@@ -42,6 +111,35 @@ class BaseRepository(Generic[ModelType]):
         await db.refresh(db_obj)
         return db_obj
 
+    async def bulk_insert(
+        self, db: AsyncSession, rows: Sequence[Dict[str, Any]], commit: bool = True
+    ) -> List[int]:
+        """
+        Insert many rows in one round trip and return their IDs (input order).
+
+        Column defaults apply; ORM events and relationships do not. Pass
+        commit=False to keep the insert in the caller's transaction.
+        """
+        if not rows:
+            return []
+        if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            result = await db.execute(
+                insert(self.model).returning(
+                    self.model.id, sort_by_parameter_order=True
+                ),
+                rows,
+            )
+            ids = list(result.scalars().all())
+        else:
+            # No INSERT..RETURNING for executemany (MySQL): flush ORM objects
+            objs = [self.model(**row) for row in rows]
+            db.add_all(objs)
+            await db.flush()
+            ids = [obj.id for obj in objs]
+        if commit:
+            await db.commit()
+        return ids
+
     async def update(
         self, db: AsyncSession, id: int, obj_data: UpdateSchemaType
     ) -> Optional[ModelType]:
@@ -58,6 +156,40 @@ class BaseRepository(Generic[ModelType]):
         await db.refresh(db_obj)
         return db_obj
 
+    async def update_many(
+        self,
+        db: AsyncSession,
+        ids: Iterable[int],
+        values: Dict[str, Any],
+        commit: bool = True,
+    ) -> int:
+        """Set the same values on many records. Returns the number of rows matched."""
+        ids = list(dict.fromkeys(ids))
+        if not ids or not values:
+            return 0
+        matched = 0
+        for chunk in _chunks(ids, IN_CHUNK_SIZE):
+            result = await db.execute(
+                update(self.model)
+                .where(self.model.id.in_(chunk))
+                .values(**values)
+                .execution_options(synchronize_session="fetch")
+            )
+            matched += result.rowcount
+        if commit:
+            await db.commit()
+        return matched
+
+    async def bulk_update(
+        self, db: AsyncSession, rows: Sequence[Dict[str, Any]], commit: bool = True
+    ) -> None:
+        """Apply per-row changes by primary key (each dict must contain "id")."""
+        if not rows:
+            return
+        await db.execute(update(self.model), rows)
+        if commit:
+            await db.commit()
+
     async def delete(self, db: AsyncSession, id: int) -> bool:
         """Delete a record by ID."""
         db_obj = await self.get_by_id(db, id)
@@ -70,9 +202,16 @@ class BaseRepository(Generic[ModelType]):
 
     async def exists(self, db: AsyncSession, id: int) -> bool:
         """Check if a record exists."""
-        return await self.get_by_id(db, id) is not None
+        if db.sync_session.identity_map.get(
+            db.sync_session.identity_key(self.model, id)
+        ):
+            return True
+        result = await db.execute(
+            select(self.model.id).where(self.model.id == id).limit(1)
+        )
+        return result.first() is not None
 
-    async def count(self, db: AsyncSession) -> int:
-        """Count all records."""
-        result = await db.execute(select(self.model.id))
-        return result.scalar()
+    async def count(self, db: AsyncSession, *criteria: Any) -> int:
+        """Count records, optionally filtered."""
+        stmt = select(func.count()).select_from(self.model).where(*criteria)
+        return (await db.execute(stmt)).scalar_one()
@@ -1,12 +1,41 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional, TypeVar
+import asyncio
 import hashlib
+import time
+import uuid
 import bcrypt
 from jose import JWTError, jwt
+from prometheus_client import Histogram
 from app.core.config import get_settings
 
 settings = get_settings()
 
+T = TypeVar("T")
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop without the pickling/spawn cost of a process pool. max_workers is the
+# concurrency cap: extra logins queue here instead of stalling WebSockets.
+_password_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.password_hash_workers),
+    thread_name_prefix="password-hash",
+)
+
+PASSWORD_HASH_QUEUE_SECONDS = Histogram(
+    "password_hash_queue_seconds",
+    "Time a password hash/verify job waited for a free worker",
+    ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PASSWORD_HASH_DURATION_SECONDS = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent running bcrypt for a password hash/verify job",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password using SHA-256 raw digest pre-hashing"""
@@ -29,6 +58,36 @@ def get_password_hash(password: str) -> str:
     return hashed.decode("utf-8")
 
 
+async def _run_in_password_pool(operation: str, fn: Callable[..., T], *args) -> T:
+    """Run a bcrypt call in the password pool, recording queue and run time"""
+    submitted = time.perf_counter()
+
+    def job() -> T:
+        started = time.perf_counter()
+        PASSWORD_HASH_QUEUE_SECONDS.labels(operation).observe(started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH_DURATION_SECONDS.labels(operation).observe(
+                time.perf_counter() - started
+            )
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, job)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password without blocking the event loop"""
+    return await _run_in_password_pool(
+        "verify", verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash without blocking the event loop"""
+    return await _run_in_password_pool("hash", get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -43,7 +102,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     if "sub" in to_encode:
         to_encode["sub"] = str(to_encode["sub"])
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(
         to_encode, settings.secret_key, algorithm=settings.algorithm
     )
@@ -61,15 +120,81 @@ def create_refresh_token(data: dict) -> str:
     if "sub" in to_encode:
         to_encode["sub"] = str(to_encode["sub"])
 
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(
         to_encode, settings.secret_key, algorithm=settings.algorithm
     )
     return encoded_jwt
 
 
+class TokenVerificationCache:
+    """
+    Bounded per-process cache of verified JWT claims.
+
+    Keyed by the SHA-256 of the token, so raw tokens are never kept in memory.
+    Entries live until the token's own `exp`; refresh tokens are never cached
+    so /refresh always performs a full verification.
+    """
+
+    def __init__(self, max_size: int = 4096) -> None:
+        self.max_size = max_size
+        # token hash -> (exp timestamp, user id, claims)
+        self._entries: "OrderedDict[bytes, tuple[float, Optional[str], dict]]" = (
+            OrderedDict()
+        )
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return a copy of the cached claims, or None if missing/expired"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        exp, _, payload = entry
+        if exp <= time.time():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return dict(payload)
+
+    def put(self, token: str, payload: dict) -> None:
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or payload.get("type") == "refresh":
+            return
+        key = self._key(token)
+        self._entries[key] = (float(exp), payload.get("sub"), dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        """Forget a single token (e.g. on logout)"""
+        self._entries.pop(self._key(token), None)
+
+    def discard_user(self, user_id: int) -> None:
+        """Forget every cached token issued to a user"""
+        sub = str(user_id)
+        stale = [key for key, (_, uid, _) in self._entries.items() if uid == sub]
+        for key in stale:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Singleton instance
+token_cache = TokenVerificationCache()
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token"""
+    """Decode and verify a JWT token (verified claims are cached until exp)"""
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     import logging
 
     logger = logging.getLogger("app.security")
@@ -77,6 +202,7 @@ def decode_access_token(token: str) -> Optional[dict]:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
         )
+        token_cache.put(token, payload)
         return payload
     except JWTError as e:
         logger.error(f"JWT decode error: {e}")
@@ -0,0 +1,241 @@
+"""
+Outbound SMTP Connection Pool
+
+Keeps EHLO'd connections to the relay open between messages instead of
+connecting per message:
+
+- Keep-alive: idle connections are reused for up to SMTP_POOL_IDLE_SECONDS
+  and SMTP_POOL_MAX_MESSAGES messages, then closed
+- Per-host limit: at most SMTP_POOL_MAX_PER_HOST concurrent connections
+  (and transactions) per relay host:port
+- Several messages per connection: send_many() spreads a batch over the
+  host's connections, each carrying messages back to back
+- Retries: connection errors and 4xx replies are retried with exponential
+  backoff (SMTP_RETRY_ATTEMPTS, SMTP_RETRY_BACKOFF_SECONDS); 5xx replies
+  fail immediately
+
+send() never raises for delivery problems; it returns a DeliveryResult the
+caller records. Connections belong to the event loop that opened them.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from email.message import Message
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.config_service import ConfigService
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+@dataclass
+class DeliveryResult:
+    delivered: bool
+    attempts: int
+    error: Optional[str] = None
+    # Retrying won't help (5xx reply)
+    permanent: bool = False
+
+
+class _HostPool:
+    def __init__(self, limit: int) -> None:
+        self.semaphore = asyncio.Semaphore(limit)
+        # (client, last used, messages sent on it)
+        self.idle: List[Tuple[object, float, int]] = []
+
+
+class SMTPPool:
+    """Pool of keep-alive connections per relay host"""
+
+    def __init__(
+        self,
+        max_per_host: int = 4,
+        idle_seconds: float = 30.0,
+        max_messages_per_connection: int = 100,
+        retries: int = 3,
+        backoff_seconds: float = 1.0,
+        timeout: float = 30.0,
+    ) -> None:
+        self.max_per_host = max_per_host
+        self.idle_seconds = idle_seconds
+        self.max_messages_per_connection = max_messages_per_connection
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self._hosts: Dict[Tuple[str, int], _HostPool] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Connections opened (for tests and benchmarks)
+        self.connects = 0
+
+    def _host_pool(self, hostname: str, port: int) -> _HostPool:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Connections and semaphores can't cross event loops
+            self._hosts = {}
+            self._loop = loop
+        key = (hostname, port)
+        if key not in self._hosts:
+            self._hosts[key] = _HostPool(self.max_per_host)
+        return self._hosts[key]
+
+    # ==================== Connections ====================
+
+    async def _acquire(self, pool: _HostPool, hostname: str, port: int):
+        """An idle connection if one is usable, else a new one"""
+        now = time.monotonic()
+        while pool.idle:
+            client, last_used, sent = pool.idle.pop()
+            if client.is_connected and now - last_used < self.idle_seconds:
+                return client, sent, True
+            await self._close(client)
+
+        import aiosmtplib
+
+        client = aiosmtplib.SMTP(hostname=hostname, port=port, timeout=self.timeout)
+        await client.connect()
+        self.connects += 1
+        return client, 0, False
+
+    def _release(self, pool: _HostPool, client, sent: int) -> None:
+        if sent >= self.max_messages_per_connection:
+            asyncio.ensure_future(self._close(client))
+            return
+        pool.idle.append((client, time.monotonic(), sent))
+
+    @staticmethod
+    async def _close(client) -> None:
+        try:
+            if client.is_connected:
+                await client.quit()
+        except Exception:
+            client.close()
+
+    def delivery_budget_seconds(self) -> float:
+        """
+        Upper bound for send() once it holds a connection: every attempt
+        timing out on connect and on the transaction, plus the backoff sleeps.
+        """
+        backoff = sum(self.backoff_seconds * 2**i for i in range(self.retries - 1))
+        return self.retries * 2 * self.timeout + backoff
+
+    # ==================== Sending ====================
+
+    async def send(
+        self,
+        message: Message,
+        hostname: str,
+        port: int,
+        sender: Optional[str] = None,
+        recipients: Optional[Sequence[str]] = None,
+    ) -> DeliveryResult:
+        """Deliver one message to the relay, retrying transient failures"""
+        import aiosmtplib
+
+        pool = self._host_pool(hostname, int(port))
+        attempt = 0
+        while True:
+            attempt += 1
+            async with pool.semaphore:
+                try:
+                    client, sent, reused = await self._acquire(
+                        pool, hostname, int(port)
+                    )
+                except (aiosmtplib.SMTPException, OSError) as e:
+                    error, permanent = self._classify(e)
+                else:
+                    try:
+                        await client.send_message(
+                            message, sender=sender, recipients=recipients
+                        )
+                    except aiosmtplib.SMTPServerDisconnected as e:
+                        client.close()
+                        if reused:
+                            # The relay dropped an idle connection; not a failure
+                            attempt -= 1
+                            continue
+                        error, permanent = self._classify(e)
+                    except (aiosmtplib.SMTPException, OSError) as e:
+                        # Connection state after a failed transaction is unknown
+                        await self._close(client)
+                        error, permanent = self._classify(e)
+                    else:
+                        self._release(pool, client, sent + 1)
+                        return DeliveryResult(delivered=True, attempts=attempt)
+
+            if permanent or attempt >= self.retries:
+                logger.warning(
+                    "SMTP delivery to %s:%s failed after %d attempt(s): %s",
+                    hostname,
+                    port,
+                    attempt,
+                    error,
+                )
+                return DeliveryResult(
+                    delivered=False, attempts=attempt, error=error, permanent=permanent
+                )
+            delay = self.backoff_seconds * 2 ** (attempt - 1)
+            logger.info(
+                "SMTP delivery attempt %d to %s:%s failed (%s), retrying in %.1fs",
+                attempt,
+                hostname,
+                port,
+                error,
+                delay,
+            )
+            await asyncio.sleep(delay)
+
+    async def send_many(
+        self, messages: Sequence[Message], hostname: str, port: int
+    ) -> List[DeliveryResult]:
+        """Deliver a batch over the host's pooled connections"""
+        return list(
+            await asyncio.gather(
+                *(self.send(message, hostname, port) for message in messages)
+            )
+        )
+
+    @staticmethod
+    def _classify(error: Exception) -> Tuple[str, bool]:
+        """(description, permanent)"""
+        import aiosmtplib
+
+        if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+            codes = [r.code for r in error.recipients]
+            return str(error), all(500 <= code < 600 for code in codes)
+        if isinstance(error, aiosmtplib.SMTPResponseException):
+            return f"{error.code} {error.message}", 500 <= error.code < 600
+        return str(error) or type(error).__name__, False
+
+    async def close(self) -> None:
+        """Close idle connections (shutdown)"""
+        if self._loop is not asyncio.get_running_loop():
+            self._hosts = {}
+            return
+        for pool in self._hosts.values():
+            idle, pool.idle = pool.idle, []
+            for client, _, _ in idle:
+                await self._close(client)
+
+
+async def get_relay_address(db: AsyncSession) -> Tuple[str, int]:
+    """SMTP relay host and port for outbound mail (cached system settings)"""
+    smtp_host = await ConfigService.get_value(db, "email_smtp_host", "127.0.0.1")
+    smtp_port = await ConfigService.get_value(db, "email_smtp_port", "2525")
+    return smtp_host, int(smtp_port)
+
+
+# Singleton instance
+smtp_pool = SMTPPool(
+    max_per_host=settings.smtp_pool_max_per_host,
+    idle_seconds=settings.smtp_pool_idle_seconds,
+    max_messages_per_connection=settings.smtp_pool_max_messages,
+    retries=settings.smtp_retry_attempts,
+    backoff_seconds=settings.smtp_retry_backoff_seconds,
+)
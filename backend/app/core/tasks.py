@@ -11,19 +11,22 @@ import asyncio
 from datetime import datetime, timedelta, timezone
 from celery import shared_task
 
-from typing import Any, Coroutine
+from typing import Any, Coroutine, Optional
 
 logger = logging.getLogger(__name__)
 
+# One loop per worker process: pooled connections (database, SMTP relay)
+# are bound to the loop that opened them and are reused across tasks
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
 
 def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
     """Helper to run async code in sync Celery task."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop.run_until_complete(coro)
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
@@ -153,7 +156,7 @@ def send_notification_email(self, user_id: int, subject: str, body: str) -> None
         from app.core.database import AsyncSessionLocal
         from app.modules.auth.service import UserService
         from app.core.config_service import ConfigService
-        import aiosmtplib
+        from app.core.smtp_pool import get_relay_address, smtp_pool
         from email.message import EmailMessage
 
         async with AsyncSessionLocal() as db:
@@ -162,11 +165,6 @@ def send_notification_email(self, user_id: int, subject: str, body: str) -> None
                 logger.warning(f"Cannot send email to user {user_id}: no email")
                 return
 
-            # Get SMTP configuration
-            smtp_host = await ConfigService.get_value(
-                db, "email_smtp_host", "127.0.0.1"
-            )
-            smtp_port = await ConfigService.get_value(db, "email_smtp_port", "2525")
             smtp_enabled = await ConfigService.get_value(
                 db, "email_notifications_enabled", True
             )
@@ -183,16 +181,15 @@ def send_notification_email(self, user_id: int, subject: str, body: str) -> None
             msg["To"] = user.email
             msg.set_content(body, subtype="html")
 
-            try:
-                # Try to send via SMTP
-                async with aiosmtplib.SMTP(
-                    hostname=smtp_host, port=int(smtp_port)
-                ) as smtp:
-                    await smtp.send_message(msg)
+            # Pooled keep-alive connection; bulk notifications from this
+            # worker reuse it instead of connecting per email
+            smtp_host, smtp_port = await get_relay_address(db)
+            delivery = await smtp_pool.send(msg, smtp_host, smtp_port)
+            if delivery.delivered:
                 logger.info(f"Email sent successfully to {user.email}: {subject}")
-            except Exception as smtp_error:
+            else:
                 logger.warning(
-                    f"SMTP send failed to {user.email}, falling back to log: {smtp_error}"
+                    f"SMTP send failed to {user.email}, falling back to log: {delivery.error}"
                 )
                 # Fallback: just log the email content
                 logger.info(
@@ -0,0 +1,150 @@
+"""
+Token Revocation Store
+
+Revoked token IDs (`jti`) live in a Redis sorted set scored by the token's
+`exp`, so entries age out together with the token itself. Each worker keeps
+a Bloom filter of revoked IDs:
+
+- Not in the filter (the common case): the token is valid. This is a pure
+  in-memory check with no network I/O.
+- In the filter: confirmed against the sorted set, which rules out false positives.
+
+New revocations are published over pub/sub and added to every worker's
+filter on arrival. Bloom filters can't delete, so each worker periodically
+prunes expired IDs and rebuilds its filter from the sorted set; IDs
+revoked while the set is being read are carried over into the new filter.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Iterable, Optional, Set
+
+from app.core.config import get_settings
+from app.core.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+REVOKED_TOKENS_KEY = "auth:revoked_tokens"
+REVOCATION_CHANNEL = "auth:token_revoked"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item)
+        )
+
+
+class TokenRevocationStore:
+    """Redis-backed revocation list with a per-worker Bloom filter front"""
+
+    def __init__(self, capacity: int, rebuild_interval_seconds: int) -> None:
+        self.capacity = capacity
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        self._filter = BloomFilter(capacity)
+        # IDs added while rebuild() awaits Redis (None when not rebuilding)
+        self._added_during_rebuild: Optional[Set[str]] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+    def _add(self, jti: str) -> None:
+        self._filter.add(jti)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.add(jti)
+
+    async def revoke(self, jti: str, exp: float) -> None:
+        """Revoke a token until its expiry and notify every worker"""
+        if exp <= time.time():
+            return
+        await redis_manager.zadd(REVOKED_TOKENS_KEY, jti, float(exp))
+        self._add(jti)
+        await redis_manager.publish(REVOCATION_CHANNEL, {"jti": jti})
+
+    async def is_revoked(self, payload: dict) -> bool:
+        """Check a decoded token. Valid tokens never leave the process"""
+        jti = payload.get("jti")
+        if not jti or jti not in self._filter:
+            return False
+        return await redis_manager.zscore(REVOKED_TOKENS_KEY, jti) is not None
+
+    async def rebuild(self) -> None:
+        """
+        Prune expired entries and rebuild the local filter from Redis. If
+        the read fails this raises and the current filter stays in place.
+        """
+        now = time.time()
+        self._added_during_rebuild = set()
+        try:
+            await redis_manager.zremrangebyscore(REVOKED_TOKENS_KEY, 0, now)
+            active = await redis_manager.zrangebyscore(
+                REVOKED_TOKENS_KEY, now, float("inf")
+            )
+            # Revocations that arrived meanwhile may be missing from `active`
+            self._load([*active, *self._added_during_rebuild])
+        finally:
+            self._added_during_rebuild = None
+
+    def _load(self, jtis: Iterable[str]) -> None:
+        jtis = list(jtis)
+        bloom = BloomFilter(max(self.capacity, len(jtis) * 2))
+        for jti in jtis:
+            bloom.add(jti)
+        self._filter = bloom
+
+    async def start(self) -> None:
+        """Load revocations, follow new ones and schedule periodic rebuilds"""
+        try:
+            await self.rebuild()
+        except Exception as e:
+            # Retried by the maintenance loop
+            logger.error(f"Token revocation load failed: {e}")
+        await redis_manager.subscribe(REVOCATION_CHANNEL, self._handle_revoked)
+        if self._maintenance_task is None:
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def stop(self) -> None:
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
+
+    async def _handle_revoked(self, message: dict) -> None:
+        jti = message.get("jti")
+        if jti:
+            self._add(jti)
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.rebuild_interval_seconds)
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Token revocation rebuild failed: {e}")
+
+
+# Singleton instance
+token_revocations = TokenRevocationStore(
+    capacity=settings.token_revocation_capacity,
+    rebuild_interval_seconds=settings.token_revocation_rebuild_seconds,
+)
@@ -135,16 +135,22 @@ class WebSocketManager:
             # Add to Redis set (idempotent)
             # This handles both Redis mode and local fallback (via RedisManager)
             await redis_manager.sadd(f"ws:channel:{channel_id}:users", str(user_id))
-            logger.debug(f"Member {user_id} added to channel {channel_id} set")
+            logger.debug("Member %s added to channel %s set", user_id, channel_id)
         else:
             logger.debug(
-                f"Preview user {user_id} connected to channel {channel_id}, not counted in online"
+                "Preview user %s connected to channel %s, not counted in online",
+                user_id,
+                channel_id,
             )
 
         self.active_connections[channel_id].append((websocket, user_id))
 
         logger.debug(
-            f"User {user_id} connected to channel {channel_id} (member: {is_member}). Total connections: {len(self.active_connections[channel_id])}"
+            "User %s connected to channel %s (member: %s). Total connections: %s",
+            user_id,
+            channel_id,
+            is_member,
+            len(self.active_connections[channel_id]),
         )
 
         # Broadcast presence update to all users in channel
@@ -157,7 +163,7 @@ class WebSocketManager:
         """Connect a websocket to a user's global notification stream"""
         user_id = int(user_id)
         await websocket.accept()
-        logger.debug(f"connect_user called for user {user_id}")
+        logger.debug("connect_user called for user %s", user_id)
 
         is_first_connection = user_id not in self.user_connections
 
@@ -170,7 +176,7 @@ class WebSocketManager:
 
         self.user_connections[user_id].append(websocket)
         logger.debug(
-            f"User {user_id} connected. Total: {len(self.user_connections[user_id])}"
+            "User %s connected. Total: %s", user_id, len(self.user_connections[user_id])
         )
 
         if is_first_connection:
@@ -211,11 +217,13 @@ class WebSocketManager:
                 # Remove from Redis set (or local fallback)
                 await redis_manager.srem(f"ws:channel:{channel_id}:users", str(user_id))
                 logger.debug(
-                    f"User {user_id} fully disconnected from channel {channel_id}"
+                    "User %s fully disconnected from channel %s", user_id, channel_id
                 )
 
             logger.debug(
-                f"Channel {channel_id} after disconnect: {len(self.active_connections[channel_id])} connections"
+                "Channel %s after disconnect: %s connections",
+                channel_id,
+                len(self.active_connections[channel_id]),
             )
 
             # Clean up empty channel lists
@@ -239,7 +247,9 @@ class WebSocketManager:
             try:
                 self.user_connections[user_id].remove(websocket)
                 logger.debug(
-                    f"User {user_id} disconnected. Remaining: {len(self.user_connections[user_id])}"
+                    "User %s disconnected. Remaining: %s",
+                    user_id,
+                    len(self.user_connections[user_id]),
                 )
             except ValueError:
                 pass
@@ -247,7 +257,7 @@ class WebSocketManager:
             # Clean up empty user lists
             if not self.user_connections[user_id]:
                 del self.user_connections[user_id]
-                logger.debug(f"User {user_id} has no more connections. Waiting...")
+                logger.debug("User %s has no more connections. Waiting...", user_id)
 
                 # Wait a short time to allow for reconnection (reduced from 2s to 0.5s for snappier status)
                 await asyncio.sleep(0.5)
@@ -257,7 +267,7 @@ class WebSocketManager:
                     if redis_manager.is_available:
                         await redis_manager.srem("ws:online_users", str(user_id))
 
-                    logger.debug(f"User {user_id} still offline. Broadcasting...")
+                    logger.debug("User %s still offline. Broadcasting...", user_id)
                     await self.broadcast_to_all_users(
                         {
                             "type": "user_presence",
@@ -272,7 +282,7 @@ class WebSocketManager:
     async def disconnect_user_sessions(self, user_id: int):
         """Forcefully disconnect all WebSocket connections for a user (logout)"""
         user_id = int(user_id)
-        logger.info(f"Disconnecting all sessions for user {user_id}")
+        logger.info("Disconnecting all sessions for user %s", user_id)
 
         # 1. Disconnect from global connections
         if user_id in self.user_connections:
@@ -327,7 +337,7 @@ class WebSocketManager:
         self._local_session_starts.pop(user_id, None)
         await redis_manager.clear_session_start(user_id)
 
-        logger.info(f"All sessions disconnected for user {user_id}")
+        logger.info("All sessions disconnected for user %s", user_id)
 
     async def kick_user(self, user_id: int):
         """Forcefully disconnect all WebSocket connections for a user"""
@@ -456,7 +466,9 @@ class WebSocketManager:
                 pass
 
         logger.debug(
-            f"Broadcast ALL: {message.get('type')} to {len(self.user_connections)} users"
+            "Broadcast ALL: %s to %s users",
+            message.get("type"),
+            len(self.user_connections),
         )
 
         tasks = []
@@ -474,7 +486,7 @@ class WebSocketManager:
         try:
             await websocket.send_json(message)
         except Exception as e:
-            logger.debug(f"Error sending message: {e}")
+            logger.debug("Error sending message: %s", e)
 
     async def start_heartbeat(self):
         """Send periodic ping messages to keep connections alive"""
@@ -517,7 +529,7 @@ class WebSocketManager:
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
 
-        logger.info(f"WebSocket manager: Closed {len(tasks)} connections")
+        logger.info("WebSocket manager: Closed %s connections", len(tasks))
 
     async def _safe_close(self, websocket: WebSocket, code: int, reason: str):
         """Safely close a websocket connection"""
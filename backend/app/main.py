@@ -7,29 +7,49 @@ from sqlalchemy import text
 from typing import AsyncIterator, Any
 
 from fastapi.staticfiles import StaticFiles
+from datetime import datetime, timezone
+import asyncio
+import importlib
 import os
 import logging
 from app.core.config import get_settings
-from app.core.database import init_db, engine, get_db
+from app.core.database import (
+    AsyncSessionLocal,
+    init_db,
+    schema_is_current,
+    engine,
+    get_db,
+    checkpoint_sqlite_wal,
+    dispose_engines,
+)
 from app.core.events import event_bus
-from app.modules.auth.router import router as auth_router
-from app.modules.chat.router import router as chat_router
-from app.modules.board.router import router as board_router
-from app.modules.archive.router import router as archive_router
-from app.modules.admin.router import router as admin_router
-from app.modules.tasks.router import router as tasks_router
-from app.modules.email.router import router as email_router
-from app.modules.zsspd.router import router as zsspd_router
 import socket
-from zeroconf.asyncio import AsyncZeroconf
-from zeroconf import ServiceInfo
 
 from app.core.i18n import i18n, get_text
-from app.modules.email.smtp_server import SMTPServerManager
+from app.core.logging_setup import setup_logging
 
 settings = get_settings()
 logger = logging.getLogger("uvicorn.error")
 
+# Queue-backed structured logging; must run before anything logs at volume
+setup_logging()
+
+# (router module, subsystem). Modules of disabled subsystems are never imported
+ROUTER_MODULES = [
+    ("app.modules.auth.router", None),
+    ("app.modules.chat.router", None),
+    ("app.modules.board.router", None),
+    ("app.modules.archive.router", None),
+    ("app.modules.admin.router", None),
+    ("app.modules.tasks.router", None),
+    ("app.modules.email.router", "email"),
+    ("app.modules.zsspd.router", "zsspd"),
+]
+
+
+def subsystem_enabled(name: str) -> bool:
+    return name in settings.enabled_subsystems
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
@@ -63,16 +83,18 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     # ========== STARTUP ==========
 
-    # Initialize database
-    await init_db()
-    app.state.engine = engine
-
-    # Seed database with default data
+    # Initialize and seed the database (no-ops on warm boots)
     from scripts import seed_db
 
-    await seed_db.main()
-
-    from datetime import datetime, timezone
+    if settings.auto_migrate:
+        await init_db()
+        await seed_db.main()
+    elif not await schema_is_current() or not await seed_db.is_seeded():
+        logger.warning(
+            "Database schema or seed data is out of date. "
+            "Run `python -m scripts.migrate` before starting workers."
+        )
+    app.state.engine = engine
 
     app.state.start_time = datetime.now(timezone.utc)
 
@@ -81,11 +103,36 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     await manager.init_redis(settings.redis_url if settings.redis_url else None)
 
-    # Start WebSocket heartbeat
-    import asyncio
+    # Load system settings into the process-wide cache and follow changes
+    from app.core.config_service import settings_cache
+
+    async with AsyncSessionLocal() as db:
+        await settings_cache.load(db)
+    await settings_cache.subscribe()
+
+    # Follow authenticated-user cache invalidations from other workers
+    from app.modules.auth.cache import user_cache
+
+    await user_cache.subscribe()
+
+    # Load revoked token IDs and follow revocations from other workers
+    from app.core.token_revocation import token_revocations
+
+    await token_revocations.start()
+
+    # Follow read-your-writes windows and start replica lag monitoring
+    from app.core.database import replicas
 
+    await replicas.start()
+
+    # Start WebSocket heartbeat
     asyncio.create_task(manager.start_heartbeat())
 
+    # Keep the SQLite WAL small while pooled readers stay open
+    checkpoint_task = None
+    if settings.is_sqlite:
+        checkpoint_task = asyncio.create_task(checkpoint_sqlite_wal())
+
     # Register event handlers
     from app.modules.chat.handlers import (
         register_event_handlers as register_chat_handlers,
@@ -93,9 +140,10 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     await register_chat_handlers(event_bus)
 
-    from app.modules.email.handlers import register_email_handlers
+    if subsystem_enabled("email"):
+        from app.modules.email.handlers import register_email_handlers
 
-    await register_email_handlers(event_bus)
+        await register_email_handlers(event_bus)
 
     from app.modules.auth.handlers import register_auth_handlers
 
@@ -107,57 +155,70 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info(f"Server started: Database={db_type}, Redis={redis_status}")
 
     # Register mDNS service for auto-discovery
-    app.state.zeroconf = AsyncZeroconf()
-    try:
-        local_hostname = socket.gethostname()
-        # More reliable way to get the primary network IP (works with 127.0.1.1 too)
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if subsystem_enabled("mdns"):
+        from zeroconf import ServiceInfo
+        from zeroconf.asyncio import AsyncZeroconf
+
+        app.state.zeroconf = AsyncZeroconf()
         try:
-            # doesn't even have to be reachable
-            s.connect(("10.255.255.255", 1))
-            local_ip = s.getsockname()[0]
+            local_hostname = socket.gethostname()
+            # More reliable way to get the primary network IP (works with 127.0.1.1 too)
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                # doesn't even have to be reachable
+                s.connect(("10.255.255.255", 1))
+                local_ip = s.getsockname()[0]
+            except Exception:
+                local_ip = socket.gethostbyname(local_hostname)
+            finally:
+                s.close()
+
+            info = ServiceInfo(
+                "_koordinator._tcp.local.",
+                f"{local_hostname}._koordinator._tcp.local.",
+                addresses=[socket.inet_aton(local_ip)],
+                port=5100,
+                properties={
+                    "version": settings.app_version,
+                    "name": settings.app_name,
+                    "path": "/api",
+                    "protocol": "https" if settings.use_https else "http",
+                    "domain": settings.server_domain,
+                },
+                server=(
+                    settings.server_domain
+                    if settings.server_domain
+                    else f"{local_hostname}.local."
+                ),
+            )
+            await app.state.zeroconf.async_register_service(info)
+            app.state.zc_info = info
+            logger.info(
+                f"mDNS: Service registered as {settings.app_name} at {local_ip}:5100"
+            )
         except Exception:
-            local_ip = socket.gethostbyname(local_hostname)
-        finally:
-            s.close()
-
-        info = ServiceInfo(
-            "_koordinator._tcp.local.",
-            f"{local_hostname}._koordinator._tcp.local.",
-            addresses=[socket.inet_aton(local_ip)],
-            port=5100,
-            properties={
-                "version": settings.app_version,
-                "name": settings.app_name,
-                "path": "/api",
-                "protocol": "https" if settings.use_https else "http",
-                "domain": settings.server_domain,
-            },
-            server=(
-                settings.server_domain
-                if settings.server_domain
-                else f"{local_hostname}.local."
-            ),
-        )
-        await app.state.zeroconf.async_register_service(info)
-        app.state.zc_info = info
-        logger.info(
-            f"mDNS: Service registered as {settings.app_name} at {local_ip}:5100"
-        )
-    except Exception:
-        logger.exception("mDNS: Failed to register service")
+            logger.exception("mDNS: Failed to register service")
 
     # Start internal SMTP server for receiving emails
-    smtp_port = int(os.getenv("SMTP_SERVER_PORT", 2525))
-    smtp_host = os.getenv("SMTP_SERVER_HOST", "0.0.0.0")
-    smtp_server = SMTPServerManager(hostname=smtp_host, port=smtp_port)
-    try:
-        smtp_server.start()
-        app.state.smtp_server = smtp_server
-        logger.info(f"SMTP Server started on {smtp_host}:{smtp_port}")
-    except Exception as e:
-        logger.error(f"Failed to start SMTP server: {e}")
-        app.state.smtp_server = None
+    if subsystem_enabled("smtp"):
+        from app.modules.email.smtp_server import SMTPServerManager
+
+        smtp_port = int(os.getenv("SMTP_SERVER_PORT", 2525))
+        smtp_host = os.getenv("SMTP_SERVER_HOST", "0.0.0.0")
+        smtp_server = SMTPServerManager(hostname=smtp_host, port=smtp_port)
+        try:
+            await smtp_server.start()
+            app.state.smtp_server = smtp_server
+            logger.info(f"SMTP Server started on {smtp_host}:{smtp_port}")
+        except Exception as e:
+            logger.error(f"Failed to start SMTP server: {e}")
+            app.state.smtp_server = None
+
+    # Start outbound mail delivery workers
+    if subsystem_enabled("email"):
+        from app.modules.email.outbox import outbox
+
+        await outbox.start()
 
     yield
 
@@ -166,21 +227,44 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Stop SMTP server
     if hasattr(app.state, "smtp_server") and app.state.smtp_server:
         try:
-            app.state.smtp_server.stop()
+            await app.state.smtp_server.stop()
             logger.info("SMTP Server stopped")
         except Exception as e:
             logger.error(f"Error stopping SMTP server: {e}")
 
+    # Stop outbound delivery (undelivered mail is recovered on next start)
+    if subsystem_enabled("email"):
+        from app.modules.email.outbox import outbox
+
+        await outbox.stop()
+
+        from app.modules.email.sanitizer import shutdown_pool
+        from app.modules.email.storage import wait_for_cleanup
+
+        shutdown_pool()
+        await wait_for_cleanup()
+
+    # Close pooled outbound SMTP connections
+    from app.core.smtp_pool import smtp_pool
+
+    await smtp_pool.close()
+
     # Graceful WebSocket shutdown
     await manager.graceful_shutdown()
 
+    await token_revocations.stop()
+    await replicas.stop()
+
+    if checkpoint_task:
+        checkpoint_task.cancel()
+
     # Close Redis connection
     from app.core.redis_manager import redis_manager
 
     await redis_manager.disconnect()
 
-    # Dispose database engine
-    await engine.dispose()
+    # Dispose database engines
+    await dispose_engines()
 
     # Unregister mDNS service
     if hasattr(app.state, "zeroconf"):
@@ -232,109 +316,42 @@ else:
 app.add_middleware(CORSMiddleware, **cors_params)
 
 
-# Request ID middleware for tracing
-from uuid import uuid4
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        print(f"Incoming request: {request.method} {request.url.path}")
-        response = await call_next(request)
-        return response
-
-
-app.add_middleware(LoggingMiddleware)
-
-
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        request_id = str(uuid4())
-        request.state.request_id = request_id
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses"""
+# Request ID, security headers and sampled access log (pure ASGI)
+from app.core.middleware import RequestContextMiddleware
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        response = await call_next(request)
+app.add_middleware(RequestContextMiddleware)
 
-        # X-Content-Type-Options: Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
+# Per-request query counts and per-route statement latency
+from app.core.query_metrics import QueryMetricsMiddleware
 
-        # X-Frame-Options: Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-
-        # X-XSS-Protection: Enable XSS filter (legacy browsers)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # Referrer-Policy: Control referrer information
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-        # Permissions-Policy: Control browser features
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), "
-            "microphone=(), "
-            "camera=(), "
-            "payment=(), "
-            "usb=(), "
-            "magnetometer=(), "
-            "gyroscope=(), "
-            "accelerometer=()"
-        )
-
-        # Strict-Transport-Security: Enforce HTTPS (only in production with HTTPS)
-        if settings.use_https and not settings.debug:
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains; preload"
-            )
-
-        # Content-Security-Policy: Strict policy for API responses
-        if request.url.path.startswith("/api"):
-            response.headers["Content-Security-Policy"] = (
-                "default-src 'none'; frame-ancestors 'none'"
-            )
-
-        return response
-
-
-app.add_middleware(RequestIDMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(QueryMetricsMiddleware)
 
 # Include routers
-app.include_router(auth_router, prefix="/api")
-app.include_router(chat_router, prefix="/api")
-app.include_router(board_router, prefix="/api")
-app.include_router(archive_router, prefix="/api")
-app.include_router(admin_router, prefix="/api")
-app.include_router(tasks_router, prefix="/api")
-app.include_router(email_router, prefix="/api")
-app.include_router(zsspd_router, prefix="/api")
+for module_path, subsystem in ROUTER_MODULES:
+    if subsystem is None or subsystem_enabled(subsystem):
+        module = importlib.import_module(module_path)
+        app.include_router(module.router, prefix="/api")
 
 # Prometheus metrics
-from prometheus_fastapi_instrumentator import Instrumentator
-
-# Initialize and expose metrics at /metrics endpoint
-instrumentator = Instrumentator(
-    should_group_status_codes=True,
-    should_ignore_untemplated=True,
-    should_respect_env_var=True,
-    should_instrument_requests_inprogress=True,
-    excluded_handlers=["/health", "/metrics", "/api/health", "/api/metrics"],
-    inprogress_name="http_requests_inprogress",
-    inprogress_labels=True,
-)
-instrumentator.instrument(app).expose(
-    app, endpoint="/api/metrics", include_in_schema=False
-)
-instrumentator.expose(
-    app, endpoint="/metrics", include_in_schema=False
-)  # Keep legacy endpoint too
+if subsystem_enabled("metrics"):
+    from prometheus_fastapi_instrumentator import Instrumentator
+
+    # Initialize and expose metrics at /metrics endpoint
+    instrumentator = Instrumentator(
+        should_group_status_codes=True,
+        should_ignore_untemplated=True,
+        should_respect_env_var=True,
+        should_instrument_requests_inprogress=True,
+        excluded_handlers=["/health", "/metrics", "/api/health", "/api/metrics"],
+        inprogress_name="http_requests_inprogress",
+        inprogress_labels=True,
+    )
+    instrumentator.instrument(app).expose(
+        app, endpoint="/api/metrics", include_in_schema=False
+    )
+    instrumentator.expose(
+        app, endpoint="/metrics", include_in_schema=False
+    )  # Keep legacy endpoint too
 
 # Static files for avatars
 if not os.path.exists("static/avatars"):
@@ -402,9 +419,6 @@ async def health(db: AsyncSession = Depends(get_db)) -> dict[str, Any]:
         health_status["database"]["status"] = "connected"
     except Exception as e:
         # Log detailed error internally for debugging
-        import logging
-
-        logger = logging.getLogger(__name__)
         logger.error(f"Health check database error: {e}", exc_info=True)
         # Return generic status to client (no error details)
         health_status["database"]["status"] = "error"
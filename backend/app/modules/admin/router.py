@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Request, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.core.database import get_db, engine
+from app.core.database import get_db, engine, replicas
 from app.modules.auth.router import get_admin_user, get_current_user
 from app.modules.auth.schemas import UserResponse
 from app.modules.auth.models import User
@@ -179,6 +179,7 @@ async def get_database_status(
         ],  # Rough extraction
         "server_version": str(version),
         "pool_status": pool_status,
+        "replicas": replicas.status(),
         "config_source": "environment",
     }
 
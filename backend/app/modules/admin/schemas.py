@@ -106,12 +106,19 @@ class DatabasePoolStatus(BaseModel):
     overflow: int
 
 
+class DatabaseReplicaStatus(BaseModel):
+    index: int
+    lag_seconds: Optional[float] = None  # None = unreachable/not replicating
+    in_rotation: bool
+
+
 class DatabaseStatusResponse(BaseModel):
     type: str  # postgresql, mysql, sqlite
     dialect: str
     database_name: str
     server_version: str
     pool_status: Optional[DatabasePoolStatus] = None
+    replicas: List[DatabaseReplicaStatus] = []
     config_source: str = "environment"
 
 
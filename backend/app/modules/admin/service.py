@@ -8,72 +8,27 @@ from app.modules.admin.models import AuditLog
 from app.core.models import SystemSetting
 from app.core.websocket_manager import websocket_manager as manager
 from app.core.config import get_settings
-from app.core.config_service import ConfigService
+from app.core.config_service import ConfigService, settings_cache
 
 settings = get_settings()
 
 
-# Settings cache with TTL
-_settings_cache: dict = {}
-_cache_ttl_seconds = 60  # Cache for 60 seconds
-
-
 class SystemSettingService:
     @staticmethod
     async def get_value(db: AsyncSession, key: str, default: any = None) -> any:
         """
-        Get type-casted value from system_settings with caching.
-        Uses in-memory cache with TTL to reduce DB queries.
+        Get type-casted value from system_settings.
+        Served from the process-wide settings cache (no DB query once loaded).
         """
-        # Check cache first
-        if key in _settings_cache:
-            value, cached_type, expires = _settings_cache[key]
-            if datetime.now(timezone.utc) < expires:
-                # Return cached value with proper type conversion
-                if cached_type == "int":
-                    return int(value)
-                elif cached_type == "bool":
-                    return value.lower() == "true"
-                elif cached_type == "json":
-                    import json
-
-                    return json.loads(value)
-                return value
-
-        # Fetch from DB
-        setting = await db.scalar(select(SystemSetting).where(SystemSetting.key == key))
-        if not setting:
-            return default
-
-        # Store in cache with expiry
-        _settings_cache[key] = (
-            setting.value,
-            setting.type,
-            datetime.now(timezone.utc) + timedelta(seconds=_cache_ttl_seconds),
-        )
-
-        val = setting.value
-        if setting.type == "int":
-            return int(val)
-        elif setting.type == "bool":
-            return val.lower() == "true"
-        elif setting.type == "json":
-            import json
-
-            return json.loads(val)
-        return val
+        return await ConfigService.get_typed_value(db, key, default)
 
     @staticmethod
     def invalidate_cache(key: str = None):
         """
         Invalidate settings cache.
-        If key is None, invalidate all cached settings.
+        The snapshot is reloaded in bulk on next access, so the key is informational.
         """
-        global _settings_cache
-        if key:
-            _settings_cache.pop(key, None)
-        else:
-            _settings_cache = {}
+        settings_cache.invalidate()
 
     @staticmethod
     async def set_value(
@@ -112,8 +67,8 @@ class SystemSettingService:
         await db.commit()
         await db.refresh(setting)
 
-        # Invalidate cache for this key
-        SystemSettingService.invalidate_cache(key)
+        # Update cached value in this and every other worker
+        await settings_cache.publish_change(setting)
 
         return setting
 
@@ -689,9 +644,6 @@ class AdminService:
             db, "internal_email_domain", settings_data.internal_email_domain, admin_id
         )
 
-        # Invalidate cache to ensure fresh data
-        SystemSettingService.invalidate_cache("internal_email_domain")
-
         # Create audit log
         await AdminService.create_audit_log(
             db,
@@ -712,8 +664,9 @@ class AdminService:
             EmailAccount,
             EmailMessage,
             EmailFolder,
-            EmailAttachment,
         )
+        from app.modules.email.stats import invalidate_counters
+        from app.modules.email.storage import delete_messages, remove_blob_files
         from app.modules.auth.models import User
         from sqlalchemy import delete
         from app.core.config import get_settings
@@ -729,8 +682,10 @@ class AdminService:
             # Get all users
             result = await db.execute(select(User))
             all_users = result.scalars().all()
+            user_ids = [user.id for user in all_users]
 
             recreated_count = 0
+            released_paths = []
 
             for user in all_users:
                 # Delete existing email account and all related data if exists
@@ -739,23 +694,18 @@ class AdminService:
                 )
 
                 if existing_account:
-                    # Delete all attachments first (due to foreign key constraints)
-                    await db.execute(
-                        delete(EmailAttachment).where(
-                            EmailAttachment.message_id.in_(
-                                select(EmailMessage.id).where(
-                                    EmailMessage.account_id == existing_account.id
-                                )
+                    # Delete all messages with their attachments, releasing
+                    # shared bodies and attachment blobs
+                    message_ids = (
+                        await db.scalars(
+                            select(EmailMessage.id).where(
+                                EmailMessage.account_id == existing_account.id
                             )
                         )
-                    )
+                    ).all()
+                    released_paths += await delete_messages(db, list(message_ids))
 
-                    # Delete all messages
-                    await db.execute(
-                        delete(EmailMessage).where(
-                            EmailMessage.account_id == existing_account.id
-                        )
-                    )
+                    await invalidate_counters(db, [existing_account.id])
 
                     # Delete all folders
                     await db.execute(
@@ -781,6 +731,12 @@ class AdminService:
                 recreated_count += 1
 
             await db.commit()
+            await remove_blob_files(db, released_paths)
+
+            # Cached identities carry the old email address
+            from app.modules.auth.cache import user_cache
+
+            await user_cache.invalidate(*user_ids)
 
             return {
                 "updated_accounts": recreated_count,
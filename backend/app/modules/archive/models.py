@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from typing import Optional
-from sqlalchemy import String, Integer, ForeignKey, DateTime
+from sqlalchemy import String, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
@@ -55,3 +55,14 @@ class ArchiveFile(Base):
     unit = relationship("Unit", backref="archive_files")
     owner = relationship("User", backref="archived_files")
     folder = relationship("ArchiveFolder", back_populates="files")
+
+    __table_args__ = (
+        # Folder listing: unit + folder + visibility, ordered by date
+        Index(
+            "ix_archive_files_unit_folder_private_created",
+            "unit_id",
+            "folder_id",
+            "is_private",
+            "created_at",
+        ),
+    )
@@ -15,7 +15,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
-from app.core.database import get_db
+from app.core.database import get_db, get_db_readonly
+from app.core.db_helpers import (
+    accessible_archive_file_ids,
+    accessible_archive_folder_ids,
+)
 from app.modules.auth.router import get_current_user
 from app.modules.auth.models import User
 from app.modules.archive.service import ArchiveService
@@ -42,7 +46,7 @@ async def get_archive_contents(
     is_private: bool = Query(False),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db_readonly),
     current_user: User = Depends(get_current_user),
 ):
     """Get contents of a folder (folders and files). Defaults to current user's unit if unit_id not specified."""
@@ -369,28 +373,37 @@ async def batch_action(
 ):
     """Handle batch move or copy actions for files and folders"""
 
-    # Security: verify user has permission to access source items
-    for item_id, item_type in zip(batch_data.item_ids, batch_data.item_types):
-        if item_type == "file":
-            file = await ArchiveService.get_file_by_id(db, item_id)
-            if not file:
-                raise HTTPException(status_code=404, detail=f"File {item_id} not found")
-            # Non-admin users can only access files from their unit
-            if current_user.role != "admin" and file.unit_id != current_user.unit_id:
-                raise HTTPException(
-                    status_code=403, detail="Access denied to source files"
-                )
-        else:
-            folder = await ArchiveService.get_folder_by_id(db, item_id)
-            if not folder:
-                raise HTTPException(
-                    status_code=404, detail=f"Folder {item_id} not found"
-                )
-            # Non-admin users can only access folders from their unit
-            if current_user.role != "admin" and folder.unit_id != current_user.unit_id:
-                raise HTTPException(
-                    status_code=403, detail="Access denied to source folders"
-                )
+    # Security: verify user has permission to access source items.
+    # Non-admin users can only access files and folders from their unit.
+    file_ids = [
+        item_id
+        for item_id, item_type in zip(batch_data.item_ids, batch_data.item_types)
+        if item_type == "file"
+    ]
+    folder_ids = [
+        item_id
+        for item_id, item_type in zip(batch_data.item_ids, batch_data.item_types)
+        if item_type != "file"
+    ]
+
+    allowed_files = await accessible_archive_file_ids(db, current_user, file_ids)
+    denied_files = [i for i in file_ids if i not in allowed_files]
+    if denied_files:
+        # Only the failing item is looked up: missing is 404, another unit's 403
+        if not await ArchiveService.get_file_by_id(db, denied_files[0]):
+            raise HTTPException(
+                status_code=404, detail=f"File {denied_files[0]} not found"
+            )
+        raise HTTPException(status_code=403, detail="Access denied to source files")
+
+    allowed_folders = await accessible_archive_folder_ids(db, current_user, folder_ids)
+    denied_folders = [i for i in folder_ids if i not in allowed_folders]
+    if denied_folders:
+        if not await ArchiveService.get_folder_by_id(db, denied_folders[0]):
+            raise HTTPException(
+                status_code=404, detail=f"Folder {denied_folders[0]} not found"
+            )
+        raise HTTPException(status_code=403, detail="Access denied to source folders")
 
     # Security: verify user has permission to write to target unit
     if (
@@ -0,0 +1,181 @@
+"""
+Authenticated User Cache
+
+Short-lived cache of User rows used by get_current_user, so authenticated
+requests don't re-read an unchanged user on every call.
+
+- Local tier: per-process LRU of column snapshots
+- Redis tier (optional): shared snapshots, so a cold worker doesn't hit the DB
+- Invalidation: UserService/UnitService call invalidate() after writes; the
+  user IDs are broadcast over pub/sub so every worker drops its local copy
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import DateTime, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import get_settings
+from app.core.redis_manager import redis_manager
+from app.modules.auth.models import User, Unit
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+INVALIDATE_CHANNEL = "auth:user_invalidate"
+REDIS_KEY_PREFIX = "auth:user:"
+
+# Never cached: the password hash stays in the database only
+_EXCLUDED_COLUMNS = {"hashed_password"}
+
+
+def _serialize_row(obj: Any, columns) -> Dict[str, Any]:
+    data = {}
+    for column in columns:
+        if column.key in _EXCLUDED_COLUMNS:
+            continue
+        value = getattr(obj, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        data[column.key] = value
+    return data
+
+
+def _deserialize_row(data: Dict[str, Any], columns) -> Dict[str, Any]:
+    values = {}
+    for column in columns:
+        if column.key not in data:
+            continue
+        value = data[column.key]
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        values[column.key] = value
+    return values
+
+
+class UserCache:
+    """Two-tier (local LRU + optional Redis) cache of authenticated users"""
+
+    def __init__(self, max_size: int, ttl_seconds: int) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # user_id -> (expires_at, snapshot)
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    # ==================== Lookup ====================
+
+    async def get(self, user_id: int) -> Optional[User]:
+        """Return a detached User for user_id, or None on a cache miss"""
+        snapshot = self._get_local(user_id)
+
+        if snapshot is None and redis_manager.is_available:
+            raw = await redis_manager.get(f"{REDIS_KEY_PREFIX}{user_id}")
+            if raw:
+                try:
+                    snapshot = json.loads(raw)
+                except ValueError:
+                    snapshot = None
+                if snapshot is not None:
+                    self._set_local(user_id, snapshot)
+
+        if snapshot is None:
+            return None
+        return self._build_user(snapshot)
+
+    async def set(self, user: User) -> None:
+        """Store a freshly loaded user (unit relationship must be loaded)"""
+        snapshot = self._snapshot(user)
+        if snapshot is None:
+            return
+        self._set_local(user.id, snapshot)
+        if redis_manager.is_available:
+            await redis_manager.set(
+                f"{REDIS_KEY_PREFIX}{user.id}",
+                json.dumps(snapshot),
+                ex=self.ttl_seconds,
+            )
+
+    # ==================== Invalidation ====================
+
+    async def invalidate(self, *user_ids: int) -> None:
+        """Drop users from every worker's cache and from Redis"""
+        ids = [int(uid) for uid in user_ids]
+        if not ids:
+            return
+        for uid in ids:
+            self._entries.pop(uid, None)
+            if redis_manager.is_available:
+                await redis_manager.delete(f"{REDIS_KEY_PREFIX}{uid}")
+        await redis_manager.publish(INVALIDATE_CHANNEL, {"user_ids": ids})
+
+    def clear(self) -> None:
+        """Drop all local entries (this worker only)"""
+        self._entries.clear()
+
+    async def subscribe(self) -> None:
+        """Follow invalidations published by other workers"""
+        await redis_manager.subscribe(INVALIDATE_CHANNEL, self._handle_invalidate)
+
+    async def _handle_invalidate(self, message: dict) -> None:
+        for uid in message.get("user_ids", []):
+            self._entries.pop(int(uid), None)
+
+    # ==================== Helpers ====================
+
+    def _get_local(self, user_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, snapshot = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(user_id, None)
+            return None
+        self._entries.move_to_end(user_id)
+        return snapshot
+
+    def _set_local(self, user_id: int, snapshot: Dict[str, Any]) -> None:
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, snapshot)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _snapshot(user: User) -> Optional[Dict[str, Any]]:
+        state = inspect(user)
+        if "unit" in state.unloaded:
+            # Building the snapshot would trigger a lazy load; skip caching
+            return None
+        snapshot = _serialize_row(user, User.__table__.columns)
+        snapshot["unit"] = (
+            _serialize_row(user.unit, Unit.__table__.columns) if user.unit else None
+        )
+        return snapshot
+
+    @staticmethod
+    def _build_user(snapshot: Dict[str, Any]) -> User:
+        """
+        Rebuild a detached User from a snapshot.
+        Detached (not transient) so it is never INSERTed if it reaches a session.
+        """
+        unit = None
+        if snapshot.get("unit"):
+            unit = Unit(**_deserialize_row(snapshot["unit"], Unit.__table__.columns))
+            make_transient_to_detached(unit)
+
+        user = User(**_deserialize_row(snapshot, User.__table__.columns))
+        user.unit = unit
+        make_transient_to_detached(user)
+        return user
+
+
+# Singleton instance
+user_cache = UserCache(
+    max_size=settings.user_cache_max_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
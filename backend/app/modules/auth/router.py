@@ -22,12 +22,15 @@ from app.core.i18n import get_text
 logger = logging.getLogger(__name__)
 
 from app.core.database import get_db
+from app.core.replicas import request_user_id
 from app.core.security import (
     create_access_token,
     decode_access_token,
     create_refresh_token,
+    token_cache,
 )
 from app.core.config import get_settings
+from app.core.token_revocation import token_revocations
 from app.modules.auth.schemas import (
     UserCreate,
     UserResponse,
@@ -47,6 +50,7 @@ from typing import List, Optional, Dict, Any
 
 
 from app.modules.auth.service import UserService, UnitService
+from app.modules.auth.cache import user_cache
 from app.core.config_service import ConfigService
 from app.modules.admin.service import AdminService, SystemSettingService
 from app.modules.auth.models import User
@@ -88,6 +92,11 @@ settings = get_settings()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
+# The refresh cookie is only sent to the auth endpoints (refresh and logout).
+# Cookies issued before logout needed it were scoped to the refresh endpoint.
+REFRESH_COOKIE_PATH = "/api/auth"
+LEGACY_REFRESH_COOKIE_PATH = "/api/auth/refresh"
+
 
 async def get_current_user(
     token: Optional[str] = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
@@ -103,7 +112,7 @@ async def get_current_user(
         raise credentials_exception
 
     payload = decode_access_token(token)
-    if payload is None:
+    if payload is None or await token_revocations.is_revoked(payload):
         raise credentials_exception
 
     user_id_str = payload.get("sub")
@@ -115,9 +124,12 @@ async def get_current_user(
     except (ValueError, TypeError):
         raise credentials_exception
 
-    user = await UserService.get_user_by_id(db, user_id=user_id)
+    user = await user_cache.get(user_id)
     if user is None:
-        raise credentials_exception
+        user = await UserService.get_user_by_id(db, user_id=user_id)
+        if user is None:
+            raise credentials_exception
+        await user_cache.set(user)
 
     if not user.is_active:
         raise HTTPException(
@@ -126,6 +138,8 @@ async def get_current_user(
             headers={"X-Account-Blocked": "true"},
         )
 
+    # Lets replica routing honour this user's read-your-writes window
+    request_user_id.set(user.id)
     return user
 
 
@@ -220,7 +234,7 @@ async def login(
         secure=settings.use_https,
         samesite="lax",
         max_age=settings.refresh_token_expire_days * 24 * 60 * 60,
-        path="/api/auth/refresh",  # Restrict to refresh endpoint
+        path=REFRESH_COOKIE_PATH,  # Restrict to auth endpoints
     )
 
     # Generate and set CSRF token cookie
@@ -247,24 +261,43 @@ async def login(
 @router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout(
     response: Response,
+    request: Request,
     current_user: User = Depends(get_current_user),
+    token: Optional[str] = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
 ):
-    """Logout user and disconnect all WebSocket sessions"""
+    """Logout user, revoke its tokens and disconnect all WebSocket sessions"""
+    # Revoke the presented access token and the session's refresh token for
+    # the rest of their lifetime
+    refresh = request.cookies.get("refresh_token")
+    for presented, token_type in ((token, "access"), (refresh, "refresh")):
+        payload = decode_access_token(presented) if presented else None
+        if (
+            payload
+            and payload.get("type", "access") == token_type
+            and payload.get("jti")
+            and payload.get("exp")
+        ):
+            await token_revocations.revoke(payload["jti"], payload["exp"])
+
     # Disconnect all WebSocket sessions for this user
     await websocket_manager.disconnect_user_sessions(current_user.id)
 
+    # Drop cached verifications so the user's tokens are fully re-checked
+    token_cache.discard_user(current_user.id)
+
     response.delete_cookie(
         key="csrf_token", path="/", samesite="lax", secure=settings.use_https
     )
 
     # Clear refresh token cookie
-    response.delete_cookie(
-        key="refresh_token",
-        path="/api/auth/refresh",
-        samesite="lax",
-        secure=settings.use_https,
-    )
+    for path in (REFRESH_COOKIE_PATH, LEGACY_REFRESH_COOKIE_PATH):
+        response.delete_cookie(
+            key="refresh_token",
+            path=path,
+            samesite="lax",
+            secure=settings.use_https,
+        )
 
     return {"message": get_text("auth.logged_out")}
 
@@ -291,7 +324,11 @@ async def refresh_token(
         )
 
     payload = decode_access_token(refresh_token)
-    if payload is None or payload.get("type") != "refresh":
+    if (
+        payload is None
+        or payload.get("type") != "refresh"
+        or await token_revocations.is_revoked(payload)
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=get_text("auth.invalid_refresh_token"),
@@ -333,7 +370,13 @@ async def refresh_token(
         secure=settings.use_https,
         samesite="lax",
         max_age=settings.refresh_token_expire_days * 24 * 60 * 60,
-        path="/api/auth/refresh",
+        path=REFRESH_COOKIE_PATH,
+    )
+    response.delete_cookie(
+        key="refresh_token",
+        path=LEGACY_REFRESH_COOKIE_PATH,
+        samesite="lax",
+        secure=settings.use_https,
     )
 
     # Regenerate CSRF token on refresh
@@ -4,8 +4,9 @@ from sqlalchemy.orm import joinedload, defer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.modules.auth.models import User, Unit
 from app.modules.auth.schemas import UserCreate, UnitCreate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async
 from app.core.config_service import ConfigService
+from app.modules.auth.cache import user_cache
 
 
 class UserService:
@@ -48,7 +49,7 @@ class UserService:
 
         await UserService.validate_password(db, user_data.password)
 
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
 
         # Use ConfigService for runtime override, but fallback to settings env var
         email_domain = await ConfigService.get_value(
@@ -171,6 +172,7 @@ class UserService:
         # Delete user - DB cascades will handle Message, Document, EmailAccount etc.
         await db.delete(user)
         await db.commit()
+        await user_cache.invalidate(user_id)
         return True
 
     @staticmethod
@@ -184,6 +186,7 @@ class UserService:
         user.role = role
         await db.commit()
         await db.refresh(user)
+        await user_cache.invalidate(user_id)
         return user
 
     @staticmethod
@@ -201,7 +204,7 @@ class UserService:
 
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
 
         return user
@@ -228,6 +231,7 @@ class UserService:
             user.unit_id = None
 
         await db.commit()
+        await user_cache.invalidate(user_id)
         # Re-fetch with unit relationship loaded
         user = await UserService.get_user_by_id(db, user_id)
         return user, "ok"
@@ -243,6 +247,7 @@ class UserService:
         user.avatar_url = avatar_url
         await db.commit()
         await db.refresh(user)
+        await user_cache.invalidate(user_id)
         return user
 
     @staticmethod
@@ -263,27 +268,29 @@ class UserService:
 
         await db.commit()
         await db.refresh(user)
+        # Covers admin changes to is_active, so blocked users are rejected at once
+        await user_cache.invalidate(user_id)
         return user
 
     @staticmethod
     async def change_password(
         db: AsyncSession, user_id: int, password_data: Any
     ) -> bool:
-        from app.core.security import verify_password, get_password_hash
-
         result = await db.execute(select(User).where(User.id == user_id))
         user = result.scalar_one_or_none()
 
         if not user:
             return False
 
-        if not verify_password(password_data.current_password, user.hashed_password):
+        if not await verify_password_async(
+            password_data.current_password, user.hashed_password
+        ):
             return False
 
         # Validate new password
         await UserService.validate_password(db, password_data.new_password)
 
-        user.hashed_password = get_password_hash(password_data.new_password)
+        user.hashed_password = await get_password_hash_async(password_data.new_password)
         await db.commit()
         return True
 
@@ -299,7 +306,7 @@ class UserService:
         # Validate new password
         await UserService.validate_password(db, password)
 
-        user.hashed_password = get_password_hash(password)
+        user.hashed_password = await get_password_hash_async(password)
         await db.commit()
         return True
 
@@ -346,6 +353,10 @@ class UnitService:
 
         await db.commit()
         await db.refresh(unit)
+
+        # Cached members carry the unit name
+        member_ids = await db.scalars(select(User.id).where(User.unit_id == unit_id))
+        await user_cache.invalidate(*member_ids)
         return unit
 
     @staticmethod
@@ -363,6 +374,9 @@ class UnitService:
             return False
 
         # 2. Reset unit_id for all users in this unit
+        member_ids = list(
+            await db.scalars(select(User.id).where(User.unit_id == unit_id))
+        )
         await db.execute(
             update(User).where(User.unit_id == unit_id).values(unit_id=None)
         )
@@ -383,4 +397,5 @@ class UnitService:
         # 5. Delete the unit itself
         await db.delete(unit)
         await db.commit()
+        await user_cache.invalidate(*member_ids)
         return True
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import String, Integer, ForeignKey, DateTime, Enum
+from sqlalchemy import String, Integer, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 import enum
@@ -60,3 +60,13 @@ class DocumentShare(Base):
     # Relationships
     document = relationship("Document", back_populates="shares")
     recipient = relationship("User", backref="received_documents")
+
+    __table_args__ = (
+        # "Shared with me", newest first
+        Index(
+            "ix_document_shares_recipient_id_created_at",
+            "recipient_id",
+            "created_at",
+            postgresql_include=["document_id", "status"],
+        ),
+    )
@@ -10,14 +10,15 @@ from fastapi import (
     Form,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 import os
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
-from app.core.database import get_db
+from app.core.database import get_db, get_db_readonly
+from app.core.db_helpers import accessible_document_ids
 from app.modules.auth.router import get_current_user
 from app.modules.auth.models import User
 from app.modules.board.schemas import (
@@ -175,32 +176,10 @@ async def get_document_file(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # Check authorization: owner OR recipient (direct or via group)
-    is_authorized = False
-    if document.owner_id == current_user.id:
-        is_authorized = True
-    else:
-        # Check direct share
-        share = await BoardService.get_document_share(db, doc_id, current_user.id)
-        if share:
-            is_authorized = True
-        else:
-            # Check if document was shared in a channel where user is a member
-            from sqlalchemy import select
-            from app.modules.chat.models import Message, ChannelMember
-
-            stmt = (
-                select(Message.id)
-                .join(ChannelMember, Message.channel_id == ChannelMember.channel_id)
-                .where(
-                    Message.document_id == doc_id,
-                    ChannelMember.user_id == current_user.id,
-                )
-                .limit(1)
-            )
-            result = await db.execute(stmt)
-            if result.scalar():
-                is_authorized = True
+    # Check authorization: owner OR recipient (direct or via group), one query
+    is_authorized = document.owner_id == current_user.id or bool(
+        await accessible_document_ids(db, current_user.id, [doc_id])
+    )
 
     if not is_authorized:
         raise HTTPException(
@@ -249,7 +228,7 @@ async def get_my_documents(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=1000),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db_readonly),
 ):
     """Get documents owned by current user"""
     return await BoardService.get_owned_documents(
@@ -262,7 +241,7 @@ async def get_received_documents(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=1000),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db_readonly),
 ):
     """Get documents shared with current user"""
     return await BoardService.get_shared_with_me_documents(
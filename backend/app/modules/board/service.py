@@ -1,12 +1,15 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, Optional, TYPE_CHECKING
 from app.modules.board.models import Document, DocumentShare
 from app.modules.board.schemas import DocumentCreate
 from app.modules.board.events import DocumentSharedEvent
 from app.core.i18n import get_text
 
+if TYPE_CHECKING:
+    from app.modules.auth.models import User
+
 
 class BoardService:
     @staticmethod
@@ -140,7 +143,7 @@ class BoardService:
         document_id: int,
         recipient_ids: List[int],
         channel_ids_map: dict[int, int],
-        sender_user: User,
+        sender_user: "User",
     ) -> List[DocumentShare]:
         """
         Bulk share document with recipients and publish events.
@@ -206,13 +209,15 @@ class BoardService:
         document_id: int,
         recipient_id: int,
         channel_id: Optional[int] = None,
-        sender_user: Optional[User] = None,
+        sender_user: Optional["User"] = None,
         notify: bool = True,
     ):
         """
         Share document with recipient.
         If notify is True, publishes DocumentSharedEvent.
         """
+        from app.modules.auth.models import User
+
         # Check if already shared
         query = (
             select(DocumentShare)
@@ -266,6 +271,7 @@ class BoardService:
                 sender_full_name=sender_user.full_name,
                 sender_avatar_url=sender_user.avatar_url,
                 channel_id=channel_id,
+                message_id=None,
                 created_at=datetime.now(timezone.utc).isoformat(),
             )
             await event_bus.publish(event)
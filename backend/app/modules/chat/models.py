@@ -7,6 +7,7 @@ from sqlalchemy import (
     Integer,
     Text,
     UniqueConstraint,
+    Index,
     Enum as SQLEnum,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship, backref
@@ -83,6 +84,12 @@ class Message(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # Channel history pages (ORDER BY id / created_at within a channel)
+        Index("ix_messages_channel_id_id", "channel_id", "id"),
+        Index("ix_messages_channel_id_created_at", "channel_id", "created_at"),
+    )
+
 
 class ChannelMember(Base):
     __tablename__ = "channel_members"
@@ -104,6 +111,13 @@ class ChannelMember(Base):
 
     __table_args__ = (
         UniqueConstraint("channel_id", "user_id", name="uq_channel_user"),
+        # "My channels" lookups; unread state is read from the index on PostgreSQL
+        Index(
+            "ix_channel_members_user_id_channel_id",
+            "user_id",
+            "channel_id",
+            postgresql_include=["last_read_message_id", "is_pinned"],
+        ),
     )
 
 
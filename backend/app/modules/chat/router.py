@@ -23,6 +23,7 @@ from typing import List, Optional
 
 from app.core.database import get_db, AsyncSessionLocal
 from app.core.security import decode_access_token
+from app.core.token_revocation import token_revocations
 from app.core.file_security import safe_file_operation
 from app.core.rate_limit import rate_limit_chat_message
 from app.modules.auth.router import get_current_user
@@ -693,7 +694,7 @@ async def user_websocket_endpoint(
     # STEP 1: Authenticate BEFORE accepting connection
     try:
         payload = decode_access_token(token)
-        if not payload:
+        if not payload or await token_revocations.is_revoked(payload):
             logger.warning("Invalid token, rejecting connection")
             return
 
@@ -728,7 +729,7 @@ async def user_websocket_endpoint(
     # STEP 2 & 3: Connect and handle online status
     try:
         await manager.connect_user(websocket, user_id)
-        logger.info(f"WebSocket connection established for user {user_id}")
+        logger.info("WebSocket connection established for user %s", user_id)
 
         # Update last_seen in DB immediately
         try:
@@ -784,7 +785,7 @@ async def user_websocket_endpoint(
                 await db.commit()
         except (SQLAlchemyError, Exception) as db_err:
             logger.error(f"Error updating last_seen on disconnect: {db_err}")
-        logger.info(f"Cleaned up connection for user {user_id}")
+        logger.info("Cleaned up connection for user %s", user_id)
 
 
 @router.websocket("/ws/{channel_id}")
@@ -796,7 +797,7 @@ async def websocket_endpoint(
     """WebSocket endpoint for real-time messaging"""
     # Authenticate user
     payload = decode_access_token(token)
-    if not payload:
+    if not payload or await token_revocations.is_revoked(payload):
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
@@ -1030,8 +1031,10 @@ async def websocket_endpoint(
                 # Also broadcast to all channel members via global WebSocket
                 # This notifies users who are not currently viewing the channel
                 member_ids = await ChatService.get_channel_member_ids(db, channel_id)
-                logger.info(
-                    f"New message in channel {channel_id}. Broadcasting to members: {member_ids}"
+                logger.debug(
+                    "New message in channel %s, broadcasting to %d members",
+                    channel_id,
+                    len(member_ids),
                 )
 
                 for member_id in member_ids:
@@ -1,7 +1,6 @@
 """Validators and sanitizers for chat module"""
 
 import re
-import bleach
 from typing import Optional
 
 
@@ -13,6 +12,9 @@ def sanitize_message_content(content: str) -> str:
     if not content:
         return content
 
+    # Deferred: bleach pulls in html5lib on import
+    import bleach
+
     # Remove all HTML tags - chat messages should be plain text
     return bleach.clean(
         content,
@@ -0,0 +1,432 @@
+"""
+Streaming MIME Parser
+
+Parses an incoming message from a binary stream in fixed-size chunks instead
+of building the whole message tree in memory (message_from_bytes):
+
+- Headers of each part are parsed with the stdlib header parser
+- text/plain and text/html body parts are collected (capped at the
+  attachment size limit)
+- Attachment bodies are decoded (base64 / quoted-printable) chunk by chunk,
+  hashed and written to a temporary file next to the blob store. A part that
+  exceeds the size limits is dropped as soon as it crosses them
+
+Memory per message is bounded by the chunk size plus the text bodies,
+regardless of attachment size. Blocking; run it in a thread.
+"""
+
+import binascii
+import hashlib
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from email.message import Message
+from email.parser import BytesHeaderParser
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Longer lines (e.g. unwrapped binary) are processed in fragments
+MAX_LINE = 64 * 1024
+# Per header block; the rest of an oversized header block is ignored
+MAX_HEADER_BYTES = 256 * 1024
+
+
+@dataclass
+class StreamedAttachment:
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+    temp_path: str
+
+
+@dataclass
+class ParsedEmail:
+    headers: Message
+    body_text: str = ""
+    # Not sanitized
+    body_html: str = ""
+    attachments: List[StreamedAttachment] = field(default_factory=list)
+
+    def discard(self) -> None:
+        """Remove temporary files of attachments that were not stored"""
+        for attachment in self.attachments:
+            try:
+                os.remove(attachment.temp_path)
+            except FileNotFoundError:
+                pass
+
+
+# ==================== Transfer decoders ====================
+
+
+class _IdentityDecoder:
+    def feed(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _Base64Decoder:
+    def __init__(self) -> None:
+        self._rest = b""
+
+    def feed(self, data: bytes) -> bytes:
+        data = self._rest + data.translate(None, b" \t\r\n")
+        usable = len(data) // 4 * 4
+        self._rest = data[usable:]
+        try:
+            return binascii.a2b_base64(data[:usable])
+        except binascii.Error:
+            return b""
+
+    def flush(self) -> bytes:
+        rest, self._rest = self._rest, b""
+        if not rest:
+            return b""
+        try:
+            return binascii.a2b_base64(rest + b"=" * (-len(rest) % 4))
+        except binascii.Error:
+            return b""
+
+
+class _QuotedPrintableDecoder:
+    def __init__(self) -> None:
+        self._rest = b""
+
+    def feed(self, data: bytes) -> bytes:
+        data = self._rest + data
+        # Decode complete lines; soft line breaks need the line end
+        cut = data.rfind(b"\n") + 1
+        if not cut and len(data) > MAX_LINE:
+            cut = len(data) - 2
+            # Don't split an =XX escape
+            escape = data.rfind(b"=", cut - 2, cut)
+            if escape != -1:
+                cut = escape
+        self._rest = data[cut:]
+        return binascii.a2b_qp(data[:cut])
+
+    def flush(self) -> bytes:
+        rest, self._rest = self._rest, b""
+        return binascii.a2b_qp(rest)
+
+
+def _decoder_for(part: Message):
+    encoding = str(part.get("Content-Transfer-Encoding", "")).strip().lower()
+    if encoding == "base64":
+        return _Base64Decoder()
+    if encoding == "quoted-printable":
+        return _QuotedPrintableDecoder()
+    return _IdentityDecoder()
+
+
+# ==================== Sinks ====================
+
+
+class _TextSink:
+    """Collects a text body part, truncated at `limit` bytes"""
+
+    def __init__(self, part: Message, limit: int) -> None:
+        self.subtype = part.get_content_subtype()
+        self.charset = part.get_content_charset() or "utf-8"
+        self.limit = limit
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        room = self.limit - self.size
+        if room > 0:
+            self.chunks.append(data[:room])
+            self.size += min(len(data), room)
+
+    def text(self) -> str:
+        raw = b"".join(self.chunks)
+        try:
+            return raw.decode(self.charset, errors="ignore")
+        except LookupError:
+            return raw.decode("utf-8", errors="ignore")
+
+
+class _FileSink:
+    """Hashes and writes an attachment to a temporary file"""
+
+    def __init__(self, directory: str, filename: str, part: Message, limit: int):
+        self.filename = filename
+        self.content_type = part.get_content_type()
+        self.limit = limit
+        self.size = 0
+        self.oversized = False
+        self.hash = hashlib.sha256()
+        self.path = str(Path(directory) / f".{uuid.uuid4().hex}.part")
+        self.file = open(self.path, "wb")
+
+    def write(self, data: bytes) -> None:
+        if self.oversized or not data:
+            return
+        self.size += len(data)
+        if self.size > self.limit:
+            # Stop decoding into it; nothing of this part is kept
+            self.oversized = True
+            self.abort()
+            return
+        self.hash.update(data)
+        self.file.write(data)
+
+    def finish(self) -> Optional[StreamedAttachment]:
+        if self.oversized:
+            return None
+        self.file.close()
+        return StreamedAttachment(
+            filename=self.filename,
+            content_type=self.content_type,
+            size=self.size,
+            sha256=self.hash.hexdigest(),
+            temp_path=self.path,
+        )
+
+    def abort(self) -> None:
+        self.file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+# ==================== Parser ====================
+
+
+class StreamingMimeParser:
+    """
+    Incremental parser: feed() chunks, then close() for the result.
+
+    Attachments whose extension is not in allowed_exts (when given), that
+    are larger than max_attachment_bytes, or that would take the message
+    over max_total_bytes are skipped, as before.
+    """
+
+    def __init__(
+        self,
+        attachment_dir: str,
+        max_attachment_bytes: int,
+        max_total_bytes: int,
+        allowed_exts: Optional[set] = None,
+    ) -> None:
+        self.attachment_dir = attachment_dir
+        self.max_attachment_bytes = max_attachment_bytes
+        self.max_total_bytes = max_total_bytes
+        self.allowed_exts = allowed_exts or set()
+        self.result: Optional[ParsedEmail] = None
+
+        self._buffer = b""
+        self._in_headers = True
+        self._header_lines: List[bytes] = []
+        self._header_size = 0
+        self._boundaries: List[bytes] = []
+        self._line_start = True
+        self._pending_eol = b""
+        self._decoder = None
+        self._sink = None
+        self._text_parts: List[_TextSink] = []
+        self._total_size = 0
+
+    def feed(self, data: bytes) -> None:
+        buffer = self._buffer + data
+        pos = 0
+        size = len(buffer)
+        while pos < size:
+            if not self._in_headers and not (
+                self._line_start and buffer.startswith(b"--", pos)
+            ):
+                # Body lines up to the next one that could be a boundary
+                end = buffer.find(b"\n--", pos) + 1 or buffer.rfind(b"\n", pos) + 1
+                if end:
+                    self._body(buffer[pos:end], complete=True)
+                    pos = end
+                    continue
+            end = buffer.find(b"\n", pos) + 1
+            if end:
+                self._line(buffer[pos:end], complete=True)
+                pos = end
+            elif size - pos > MAX_LINE:
+                self._line(buffer[pos:], complete=False)
+                pos = size
+            else:
+                break
+        self._buffer = buffer[pos:]
+
+    def close(self) -> ParsedEmail:
+        if self._buffer:
+            self._line(self._buffer, complete=True)
+            self._buffer = b""
+        if self._in_headers:
+            self._end_headers()
+        self._close_part()
+
+        result = self.result
+        for sink in self._text_parts:
+            if sink.subtype == "html":
+                result.body_html += sink.text()
+            else:
+                result.body_text += sink.text()
+        return result
+
+    def abort(self) -> None:
+        """Discard temporary files after a failure"""
+        if self._sink is not None and isinstance(self._sink, _FileSink):
+            self._sink.abort()
+        self._sink = None
+        if self.result is not None:
+            self.result.discard()
+
+    # ==================== Lines ====================
+
+    def _line(self, line: bytes, complete: bool) -> None:
+        at_line_start = self._line_start
+        self._line_start = complete
+
+        if self._in_headers:
+            if at_line_start and line in (b"\r\n", b"\n"):
+                self._end_headers()
+            elif self._header_size < MAX_HEADER_BYTES:
+                self._header_lines.append(line)
+                self._header_size += len(line)
+            return
+
+        if at_line_start and self._boundaries and line.startswith(b"--"):
+            if self._boundary(line.rstrip(b" \t\r\n")):
+                return
+
+        self._body(line, complete)
+
+    def _body(self, data: bytes, complete: bool) -> None:
+        """Body data: one or more lines, or a fragment of a long line"""
+        self._line_start = complete
+        if self._sink is None:
+            # Preamble, epilogue or a part we don't keep
+            return
+        if data.endswith(b"\r\n"):
+            eol = b"\r\n"
+        elif data.endswith(b"\n"):
+            eol = b"\n"
+        else:
+            eol = b""
+        # The line break before a boundary belongs to the boundary
+        self._write(self._pending_eol + data[: len(data) - len(eol)])
+        self._pending_eol = eol
+
+    def _boundary(self, delimiter: bytes) -> bool:
+        for depth in range(len(self._boundaries) - 1, -1, -1):
+            boundary = b"--" + self._boundaries[depth]
+            if delimiter == boundary:
+                self._close_part()
+                del self._boundaries[depth + 1 :]
+                self._in_headers = True
+                return True
+            if delimiter == boundary + b"--":
+                self._close_part()
+                del self._boundaries[depth:]
+                return True
+        return False
+
+    # ==================== Parts ====================
+
+    def _end_headers(self) -> None:
+        part = BytesHeaderParser().parsebytes(b"".join(self._header_lines))
+        self._header_lines = []
+        self._header_size = 0
+        self._in_headers = False
+        if self.result is None:
+            self.result = ParsedEmail(headers=part)
+
+        if part.get_content_maintype() == "multipart":
+            boundary = part.get_boundary()
+            if boundary:
+                self._boundaries.append(boundary.encode("utf-8", "surrogateescape"))
+                return
+        self._open_part(part)
+
+    def _open_part(self, part: Message) -> None:
+        cdispo = str(part.get("Content-Disposition"))
+        filename = part.get_filename()
+
+        if filename and ("attachment" in cdispo or "filename" in cdispo):
+            ext = Path(filename).suffix.lower()
+            if self.allowed_exts and ext not in self.allowed_exts:
+                logger.warning(
+                    f"Skipping attachment with disallowed extension: {filename}"
+                )
+                return
+            limit = min(
+                self.max_attachment_bytes, self.max_total_bytes - self._total_size
+            )
+            self._sink = _FileSink(self.attachment_dir, filename, part, limit)
+        elif (
+            part.get_content_type() in ("text/plain", "text/html")
+            and "attachment" not in cdispo
+        ):
+            self._sink = _TextSink(part, self.max_attachment_bytes)
+        else:
+            return
+        self._decoder = _decoder_for(part)
+        self._pending_eol = b""
+
+    def _write(self, data: bytes) -> None:
+        if getattr(self._sink, "oversized", False):
+            # Already rejected; don't bother decoding the rest
+            return
+        self._sink.write(self._decoder.feed(data))
+
+    def _close_part(self) -> None:
+        sink, self._sink = self._sink, None
+        if sink is None:
+            return
+        sink.write(self._decoder.flush())
+        self._decoder = None
+        self._pending_eol = b""
+
+        if isinstance(sink, _TextSink):
+            self._text_parts.append(sink)
+            return
+        attachment = sink.finish()
+        if attachment is None:
+            if sink.limit < self.max_attachment_bytes:
+                logger.warning(
+                    f"Total attachment size exceeded, skipping: {sink.filename}"
+                )
+            else:
+                logger.warning(
+                    f"Skipping oversized attachment: {sink.filename} "
+                    f"(over {sink.limit} bytes)"
+                )
+            return
+        self._total_size += attachment.size
+        self.result.attachments.append(attachment)
+
+
+def parse_message(
+    stream: BinaryIO,
+    attachment_dir: str,
+    max_attachment_bytes: int,
+    max_total_bytes: int,
+    allowed_exts: Optional[set] = None,
+) -> ParsedEmail:
+    """Parse a message from a binary stream (blocking)"""
+    parser = StreamingMimeParser(
+        attachment_dir, max_attachment_bytes, max_total_bytes, allowed_exts
+    )
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+        return parser.close()
+    except BaseException:
+        parser.abort()
+        raise
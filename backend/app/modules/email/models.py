@@ -1,6 +1,9 @@
+import enum
+import re
 from datetime import datetime, timezone
+from html import unescape
 from typing import Optional
-from sqlalchemy import String, Integer, ForeignKey, DateTime, Text, Boolean
+from sqlalchemy import String, Integer, ForeignKey, DateTime, Text, Boolean, Index, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
@@ -54,6 +57,50 @@ class EmailFolder(Base):
     messages = relationship("EmailMessage", back_populates="folder")
 
 
+# Must match how get_emails renders the inbox filter, or SQLite won't use it
+INBOX_INDEX_WHERE = {
+    "sqlite": "is_sent = 0 AND is_deleted = 0 AND is_spam = 0 AND folder_id IS NULL",
+    "postgresql": (
+        "is_sent = false AND is_deleted = false AND is_spam = false "
+        "AND folder_id IS NULL"
+    ),
+}
+
+
+SNIPPET_LENGTH = 200
+_HIDDEN_HTML = re.compile(
+    r"<(script|style|head)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+_HTML_TAG = re.compile(r"<[^>]*>")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def html_to_text(body_html: str) -> str:
+    """Visible text of an HTML body (markup, scripts and styles removed)"""
+    return unescape(_HTML_TAG.sub(" ", _HIDDEN_HTML.sub(" ", body_html)))
+
+
+def make_snippet(body_text: Optional[str], body_html: Optional[str]) -> str:
+    """List view preview of a body, stored in EmailMessage.snippet"""
+    if body_text:
+        # Whitespace collapses, so a few times the length is plenty
+        text = body_text[: SNIPPET_LENGTH * 4]
+    elif body_html:
+        text = html_to_text(body_html)
+    else:
+        return ""
+    return _WHITESPACE.sub(" ", text).strip()[:SNIPPET_LENGTH]
+
+
+class DeliveryStatus(str, enum.Enum):
+    """Outbound delivery state of a sent message (None for received mail)"""
+    PENDING = "pending"
+    # Claimed by an outbox worker
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
 class EmailMessage(Base):
     __tablename__ = "email_messages"
 
@@ -75,9 +122,14 @@ class EmailMessage(Base):
         Text, nullable=True
     )  # Usually only stored for sent messages
 
-    # Content
-    body_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    body_html: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Content. Sent mail (and rows stored before shared bodies) keep the body
+    # inline; received mail points at one EmailBody shared by all recipients.
+    # Use the body_text / body_html properties below.
+    _body_text: Mapped[Optional[str]] = mapped_column("body_text", Text, nullable=True)
+    _body_html: Mapped[Optional[str]] = mapped_column("body_html", Text, nullable=True)
+    body_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("email_bodies.id"), nullable=True, index=True
+    )
 
     # Flags
     is_read: Mapped[bool] = mapped_column(default=False, nullable=False)
@@ -93,6 +145,17 @@ class EmailMessage(Base):
     is_important: Mapped[bool] = mapped_column(default=False, nullable=False)
     is_spam: Mapped[bool] = mapped_column(default=False, nullable=False, index=True)
 
+    # List view data, computed when the message is stored
+    snippet: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    has_attachments: Mapped[bool] = mapped_column(default=False, nullable=False)
+
+    # Outbound delivery to the relay (sent mail only)
+    delivery_status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    delivery_attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    delivery_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # When an outbox worker claimed it (stale claims are put back to pending)
+    delivery_claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
     folder_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("email_folders.id", ondelete="SET NULL"), nullable=True, index=True
     )
@@ -107,26 +170,115 @@ class EmailMessage(Base):
 
     account = relationship("EmailAccount", back_populates="messages")
     folder = relationship("EmailFolder", back_populates="messages")
+    body = relationship("EmailBody", lazy="joined")
     attachments = relationship(
         "EmailAttachment", back_populates="message", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Mailbox views filter by account/trash/spam/folder and sort by date
+        Index(
+            "ix_email_messages_mailbox",
+            "account_id",
+            "is_deleted",
+            "is_spam",
+            "folder_id",
+            "received_at",
+        ),
+        # Inbox only (partial where supported; a plain index on MySQL)
+        Index(
+            "ix_email_messages_inbox",
+            "account_id",
+            "received_at",
+            sqlite_where=text(INBOX_INDEX_WHERE["sqlite"]),
+            postgresql_where=text(INBOX_INDEX_WHERE["postgresql"]),
+        ),
+    )
+
     @property
-    def has_attachments(self) -> bool:
-        return len(self.attachments) > 0
+    def body_text(self) -> Optional[str]:
+        return self.body.body_text if self.body is not None else self._body_text
+
+    @body_text.setter
+    def body_text(self, value: Optional[str]) -> None:
+        self._body_text = value
 
     @property
-    def snippet(self) -> str:
-        """Returns a brief snippet of the email body text."""
-        if not self.body_text:
-            if self.body_html:
-                # Basic HTML tag removal if body_text is missing
-                import re
-                clean = re.compile('<.*?>')
-                text = re.sub(clean, '', self.body_html)
-                return text[:200].strip()
-            return ""
-        return self.body_text[:200].strip()
+    def body_html(self) -> Optional[str]:
+        return self.body.body_html if self.body is not None else self._body_html
+
+    @body_html.setter
+    def body_html(self, value: Optional[str]) -> None:
+        self._body_html = value
+
+
+# Full-text index over subject, addresses and body text, one row per message
+# (maintained by search.py). Not an ORM table: FTS5 on SQLite, a tsvector
+# table on PostgreSQL, a FULLTEXT table on MySQL. Created with email_messages.
+SEARCH_INDEX_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS email_search USING fts5("
+        "account, subject, from_address, to_address, body, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS email_search ("
+        "message_id INTEGER PRIMARY KEY, account_id INTEGER NOT NULL, "
+        "document TSVECTOR NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_email_search_document "
+        "ON email_search USING gin (document)",
+        "CREATE INDEX IF NOT EXISTS ix_email_search_account "
+        "ON email_search (account_id)",
+    ],
+    "mysql": [
+        "CREATE TABLE IF NOT EXISTS email_search ("
+        "message_id INTEGER PRIMARY KEY, account_id INTEGER NOT NULL, "
+        "document MEDIUMTEXT NOT NULL, "
+        "KEY ix_email_search_account (account_id), "
+        "FULLTEXT KEY ix_email_search_document (document))",
+    ],
+}
+
+
+@event.listens_for(EmailMessage.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    for statement in SEARCH_INDEX_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(EmailMessage.__table__, "after_drop")
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name in SEARCH_INDEX_DDL:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS email_search")
+
+
+class EmailBody(Base):
+    """Message body stored once and shared by every recipient's copy"""
+    __tablename__ = "email_bodies"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    body_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    body_html: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+
+class EmailBlob(Base):
+    """Attachment content on disk, stored once per SHA-256"""
+    __tablename__ = "email_blobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    sha256: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    file_path: Mapped[str] = mapped_column(String(512), nullable=False)
+    file_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Number of EmailAttachment rows pointing here; the file goes at 0
+    ref_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
 
 
 class EmailAttachment(Base):
@@ -141,9 +293,40 @@ class EmailAttachment(Base):
     content_type: Mapped[str] = mapped_column(String(100), nullable=True)
     file_path: Mapped[str] = mapped_column(String(512), nullable=False)  # Path on disk
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    blob_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("email_blobs.id"), nullable=True, index=True
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
     )
 
     message = relationship("EmailMessage", back_populates="attachments")
+
+
+class EmailCounters(Base):
+    """
+    Per-account mailbox counts (EMAIL_STATS_COUNTERS). A cache of the stats
+    aggregate: adjusted on single-message changes, deleted by bulk changes
+    and rebuilt on the next read.
+    """
+    __tablename__ = "email_counters"
+
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey("email_accounts.id", ondelete="CASCADE"), primary_key=True
+    )
+    inbox: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sent: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    important: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    starred: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    archived: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    spam: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    trash: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    unread: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Unread incoming including spam (the unread-count badge)
+    unread_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
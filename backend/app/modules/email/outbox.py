@@ -0,0 +1,139 @@
+"""
+Outbound Mail Queue
+
+send_email only persists the message with delivery_status "pending" and
+enqueues its id; building the MIME message, reading attachment files and
+waiting for the relay happen afterwards in a pool of workers on the
+application event loop. Delivery state changes are pushed to the sender
+over WebSocket ("email_delivery").
+
+The database is the durable part of the queue: on start every message
+still pending is queued again, so a restart never loses a send. A worker
+claims a message (delivery_status "sending" plus delivery_claimed_at)
+before talking to the relay; claims older than the relay's retry budget
+were abandoned by a crashed process or a failed delivery and are put back
+to pending, on start and every EMAIL_OUTBOX_RECLAIM_SECONDS. Claims still
+in flight on other processes are left alone. Delivery is at-least-once.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+DeliverFunc = Callable[[int], Awaitable[None]]
+RecoverFunc = Callable[[], Awaitable[List[int]]]
+ReclaimFunc = Callable[[], Awaitable[List[int]]]
+
+
+class Outbox:
+    """Queue of sent messages waiting for delivery plus the workers draining it"""
+
+    def __init__(
+        self,
+        deliver: Optional[DeliverFunc] = None,
+        recover: Optional[RecoverFunc] = None,
+        workers: int = 4,
+        reclaim: Optional[ReclaimFunc] = None,
+        reclaim_seconds: float = 60.0,
+    ) -> None:
+        self.deliver = deliver or deliver_queued_email
+        self.recover = recover or recover_queued_emails
+        self.reclaim = reclaim or reclaim_stale_emails
+        self.worker_count = workers
+        self.reclaim_seconds = reclaim_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def is_running(self) -> bool:
+        return self._queue is not None
+
+    def enqueue(self, message_id: int) -> None:
+        """Queue a committed message for delivery"""
+        if self._queue is None:
+            # Workers not running; the message is recovered on start()
+            return
+        self._queue.put_nowait(message_id)
+
+    async def _worker(self) -> None:
+        while True:
+            message_id = await self._queue.get()
+            try:
+                await self.deliver(message_id)
+            except Exception:
+                # Left pending/sending in the database; the claim goes stale
+                # and the reclaimer queues it again
+                logger.exception("Outbox worker error for message %s", message_id)
+            finally:
+                self._queue.task_done()
+
+    async def _reclaimer(self) -> None:
+        while True:
+            await asyncio.sleep(self.reclaim_seconds)
+            try:
+                for message_id in await self.reclaim():
+                    self._queue.put_nowait(message_id)
+            except Exception:
+                logger.exception("Outbox: reclaiming stale deliveries failed")
+
+    # ==================== Lifecycle ====================
+
+    async def start(self) -> None:
+        """Queue messages left undelivered and start the worker pool"""
+        self._queue = asyncio.Queue()
+        for message_id in await self.recover():
+            self._queue.put_nowait(message_id)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+        self._workers.append(asyncio.create_task(self._reclaimer()))
+        if self._queue.qsize():
+            logger.info(f"Outbox: recovered {self._queue.qsize()} messages")
+
+    async def drain(self) -> None:
+        """Wait until every queued message has been handled (tests, benchmarks)"""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+
+async def deliver_queued_email(message_id: int) -> None:
+    from app.core.database import AsyncSessionLocal
+    from app.modules.email.service import deliver_email
+
+    async with AsyncSessionLocal() as db:
+        await deliver_email(db, message_id)
+
+
+async def recover_queued_emails() -> List[int]:
+    from app.core.database import AsyncSessionLocal
+    from app.modules.email.service import get_undelivered_message_ids
+
+    async with AsyncSessionLocal() as db:
+        return await get_undelivered_message_ids(db)
+
+
+async def reclaim_stale_emails() -> List[int]:
+    from app.core.database import AsyncSessionLocal
+    from app.modules.email.service import release_stale_claims
+
+    async with AsyncSessionLocal() as db:
+        return await release_stale_claims(db)
+
+
+# Singleton instance
+outbox = Outbox(
+    workers=settings.email_outbox_workers,
+    reclaim_seconds=settings.email_outbox_reclaim_seconds,
+)
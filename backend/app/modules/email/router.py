@@ -10,6 +10,7 @@ from fastapi import (
 )
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from typing import List, Optional
 import os
 import mimetypes
@@ -48,6 +49,8 @@ async def list_messages(
     ),
     skip: int = 0,
     limit: int = 50,
+    before_received_at: Optional[datetime] = None,
+    before_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -55,7 +58,27 @@ async def list_messages(
     if not account:
         raise HTTPException(status_code=404, detail="Email account not set up")
 
-    return await service.get_emails(db, account.id, folder, skip, limit)
+    return await service.get_emails(
+        db, account.id, folder, skip, limit, before_received_at, before_id
+    )
+
+
+@router.get("/search", response_model=List[schemas.EmailMessageList])
+async def search_messages(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(50, ge=1, le=200),
+    before_received_at: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    account = await service.get_user_email_account(db, current_user.id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Email account not set up")
+
+    return await service.search_emails(
+        db, account.id, q, limit, before_received_at, before_id
+    )
 
 
 @router.get("/messages/{message_id}", response_model=schemas.EmailMessage)
@@ -73,9 +96,7 @@ async def get_message(
         raise HTTPException(status_code=404, detail="Message not found")
 
     # Mark as read if not sent by us
-    if not message.is_read:
-        message.is_read = True
-        await db.commit()
+    await service.mark_as_read(db, message)
 
     return message
 
@@ -147,6 +168,34 @@ async def delete_message(
     return {"status": "success"}
 
 
+@router.post("/messages/bulk-update", response_model=schemas.EmailBulkResult)
+async def bulk_update_messages(
+    request: schemas.EmailBulkUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    account = await service.get_user_email_account(db, current_user.id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Email account not set up")
+
+    count = await service.bulk_update_emails(db, account.id, request, request.updates)
+    return {"count": count}
+
+
+@router.post("/messages/bulk-delete", response_model=schemas.EmailBulkResult)
+async def bulk_delete_messages(
+    selection: schemas.EmailSelection,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    account = await service.get_user_email_account(db, current_user.id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Email account not set up")
+
+    count = await service.bulk_delete_emails(db, account.id, selection)
+    return {"count": count}
+
+
 @router.get("/messages/{message_id}/print")
 async def print_message(
     message_id: int,
@@ -292,8 +341,8 @@ async def download_email_attachment(
     if not os.path.exists(safe_path):
         raise HTTPException(status_code=404, detail="File not found on disk")
 
-    # Determine filename and media type
-    mime_type, _ = mimetypes.guess_type(safe_path)
+    # Determine filename and media type (blob files are named by hash)
+    mime_type, _ = mimetypes.guess_type(attachment.filename)
     if not mime_type:
         mime_type = "application/octet-stream"
 
@@ -0,0 +1,225 @@
+"""
+Email HTML Sanitizer
+
+Incoming HTML bodies are reduced to the allow-list below before they are
+stored (XSS protection for the web client).
+
+- Engine: a bleach Cleaner built once per thread and reused
+- Cache: results keyed by the SHA-256 of the input (EMAIL_SANITIZE_CACHE_MB),
+  so a newsletter that arrives once per recipient is cleaned once
+- Process pool: bodies of EMAIL_SANITIZE_PROCESS_BYTES and more are cleaned
+  in EMAIL_SANITIZE_WORKERS worker processes by sanitize_html_async(), so a
+  large HTML part doesn't hold the GIL for the event loop and other ingest
+  workers (0 workers cleans everything in-process)
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+ALLOWED_TAGS = [
+    "p",
+    "br",
+    "strong",
+    "em",
+    "u",
+    "a",
+    "ul",
+    "ol",
+    "li",
+    "blockquote",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "table",
+    "tr",
+    "td",
+    "th",
+    "thead",
+    "tbody",
+    "div",
+    "span",
+    "img",
+    "hr",
+]
+
+ALLOWED_ATTRIBUTES = {
+    "a": ["href", "title", "target", "rel"],
+    "img": ["src", "alt", "title", "width", "height", "align"],
+    "*": ["class", "style"],
+}
+
+ALLOWED_STYLES = [
+    "color",
+    "background-color",
+    "font-family",
+    "font-size",
+    "font-weight",
+    "text-align",
+    "text-decoration",
+    "padding",
+    "margin",
+    "border",
+    "border-collapse",
+    "border-radius",
+    "width",
+    "height",
+    "line-height",
+]
+
+# URL schemes kept in href / src (bleach's defaults)
+ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
+
+
+# ==================== Engine ====================
+
+_local = threading.local()
+
+
+def _bleach_cleaner():
+    """This thread's bleach Cleaner (Cleaner instances are not thread-safe)"""
+    cleaner = getattr(_local, "cleaner", None)
+    if cleaner is None:
+        # Deferred: bleach (html5lib, tinycss2) is only needed once mail arrives
+        from bleach.css_sanitizer import CSSSanitizer
+        from bleach.sanitizer import Cleaner
+
+        cleaner = Cleaner(
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            protocols=ALLOWED_PROTOCOLS,
+            css_sanitizer=CSSSanitizer(allowed_css_properties=ALLOWED_STYLES),
+            strip=True,
+        )
+        _local.cleaner = cleaner
+    return cleaner
+
+
+def clean_html(html: str) -> str:
+    """Sanitize without the cache (also the process pool's job)"""
+    return _bleach_cleaner().clean(html)
+
+
+# ==================== Cache ====================
+
+
+class SanitizedCache:
+    """
+    LRU of sanitized bodies keyed by the SHA-256 of the input, bounded by
+    the total size of the cached output.
+    """
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self._size = 0
+        self._entries: "OrderedDict[bytes, str]" = OrderedDict()
+
+    @staticmethod
+    def key(html: str) -> bytes:
+        return hashlib.sha256(html.encode("utf-8", "surrogatepass")).digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: bytes, value: str) -> None:
+        if len(value) > self.max_chars:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = value
+        self._size += len(value)
+        while self._size > self.max_chars:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+# Singleton instance
+sanitized_cache = SanitizedCache(settings.email_sanitize_cache_mb * 1024 * 1024)
+
+
+def sanitize_html(html: str) -> str:
+    """
+    Sanitize HTML content to prevent XSS attacks.
+    Removes dangerous tags and attributes while preserving safe formatting.
+    """
+    if not html:
+        return html
+    key = sanitized_cache.key(html)
+    cleaned = sanitized_cache.get(key)
+    if cleaned is None:
+        cleaned = clean_html(html)
+        sanitized_cache.put(key, cleaned)
+    return cleaned
+
+
+# ==================== Process pool ====================
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs an event loop and DB threads
+        # can copy held locks into the child
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.email_sanitize_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def sanitize_html_async(html: str) -> str:
+    """sanitize_html, with large bodies cleaned in the process pool"""
+    if not html:
+        return html
+    if (
+        settings.email_sanitize_workers <= 0
+        or len(html) < settings.email_sanitize_process_bytes
+    ):
+        return sanitize_html(html)
+
+    key = sanitized_cache.key(html)
+    cleaned = sanitized_cache.get(key)
+    if cleaned is not None:
+        return cleaned
+    loop = asyncio.get_running_loop()
+    try:
+        cleaned = await loop.run_in_executor(_get_pool(), clean_html, html)
+    except BrokenProcessPool:
+        logger.error("HTML sanitizer pool died, cleaning in-process")
+        shutdown_pool()
+        cleaned = clean_html(html)
+    sanitized_cache.put(key, cleaned)
+    return cleaned
+
+
+def shutdown_pool() -> None:
+    """Stop the worker processes (started again on next use)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -66,6 +66,24 @@ class EmailMessageUpdate(BaseModel):
     folder_id: Optional[int] = None
 
 
+class EmailSelection(BaseModel):
+    """Messages a bulk action applies to: exactly one of ids, folder or q"""
+
+    ids: Optional[List[int]] = Field(None, max_length=5000)
+    # A mailbox view, as for GET /messages (inbox, trash, ... or a folder id)
+    folder: Optional[str] = None
+    # A search query, as for GET /search
+    q: Optional[str] = Field(None, min_length=1, max_length=500)
+
+
+class EmailBulkUpdate(EmailSelection):
+    updates: EmailMessageUpdate
+
+
+class EmailBulkResult(BaseModel):
+    count: int
+
+
 class EmailMessage(EmailMessageBase):
     id: int
     account_id: int
@@ -80,6 +98,8 @@ class EmailMessage(EmailMessageBase):
     is_spam: bool
     folder_id: Optional[int] = None
     received_at: datetime
+    delivery_status: Optional[str] = None
+    delivery_error: Optional[str] = None
     attachments: List[EmailAttachment] = []
 
     class Config:
@@ -97,6 +117,7 @@ class EmailMessageList(BaseModel):
     is_important: bool
     is_spam: bool
     received_at: datetime
+    delivery_status: Optional[str] = None
     has_attachments: bool
     snippet: Optional[str] = ""
 
@@ -0,0 +1,268 @@
+"""
+Email Full-Text Search
+
+The email_search index (see SEARCH_INDEX_DDL in models.py) holds one row
+per message with its subject, addresses and body text:
+
+- SQLite: FTS5 table keyed by rowid = message id; the account is an
+  indexed token ("a<id>") so a match only walks that account's postings
+- PostgreSQL: tsvector with a GIN index
+- MySQL: FULLTEXT index, boolean mode
+
+Rows are written when a message is stored (index_messages) and removed
+when it is deleted for good (remove_from_index). Query syntax: plain words
+and "quoted phrases" (all must match, word* for a prefix), plus filters
+handled on email_messages: from:, to:, subject:, has:attachment,
+is:unread, is:starred, in:trash, after:YYYY-MM-DD (inclusive),
+before:YYYY-MM-DD (exclusive).
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Integer, and_, bindparam, column, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.email.models import EmailMessage, html_to_text
+
+# Body text indexed per message; long bodies are searchable by their start
+BODY_INDEX_CHARS = 65536
+
+_TOKEN = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+_WORD = re.compile(r"\w+")
+
+
+@dataclass
+class SearchQuery:
+    # Words / phrases matched by the full-text index; a trailing * is a prefix
+    terms: List[str] = field(default_factory=list)
+    from_address: List[str] = field(default_factory=list)
+    to_address: List[str] = field(default_factory=list)
+    subject: List[str] = field(default_factory=list)
+    has_attachment: Optional[bool] = None
+    is_unread: Optional[bool] = None
+    is_starred: Optional[bool] = None
+    in_trash: bool = False
+    after: Optional[datetime] = None
+    before: Optional[datetime] = None
+
+
+def _parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid date '{value}', expected YYYY-MM-DD"
+        )
+
+
+def parse_query(q: str) -> SearchQuery:
+    query = SearchQuery()
+    for match in _TOKEN.finditer(q):
+        key, phrase, word = match.groups()
+        value = phrase if phrase is not None else word
+        key = (key or "").lower()
+        if key == "from":
+            query.from_address.append(value)
+        elif key == "to":
+            query.to_address.append(value)
+        elif key == "subject":
+            query.subject.append(value)
+        elif key == "has" and value.lower() in ("attachment", "attachments"):
+            query.has_attachment = True
+        elif key == "is" and value.lower() in ("unread", "read"):
+            query.is_unread = value.lower() == "unread"
+        elif key == "is" and value.lower() == "starred":
+            query.is_starred = True
+        elif key == "in" and value.lower() == "trash":
+            query.in_trash = True
+        elif key == "after":
+            query.after = _parse_date(value)
+        elif key == "before":
+            query.before = _parse_date(value)
+        elif key:
+            # Not a known filter: search for the text as typed
+            query.terms.append(match.group(0))
+        elif value.strip():
+            query.terms.append(value)
+    return query
+
+
+# ==================== Index maintenance ====================
+
+
+def _dialect(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+
+def body_index_text(body_text: Optional[str], body_html: Optional[str]) -> str:
+    """Plain text indexed for a body"""
+    if body_text:
+        return body_text[:BODY_INDEX_CHARS]
+    if body_html:
+        return html_to_text(body_html)[:BODY_INDEX_CHARS]
+    return ""
+
+
+# Insert for one index row per dialect; parameters from index_row()
+INDEX_INSERT = {
+    "sqlite": text(
+        "INSERT INTO email_search "
+        "(rowid, account, subject, from_address, to_address, body) "
+        "VALUES (:id, :account, :subject, :from_address, :to_address, :body)"
+    ),
+    "postgresql": text(
+        "INSERT INTO email_search (message_id, account_id, document) VALUES "
+        "(:id, :account_id, "
+        "setweight(to_tsvector('simple', :subject), 'A') || "
+        "setweight(to_tsvector('simple', :from_address || ' ' || :to_address), 'B') || "
+        "to_tsvector('simple', :body))"
+    ),
+    "mysql": text(
+        "INSERT INTO email_search (message_id, account_id, document) VALUES "
+        "(:id, :account_id, "
+        "CONCAT_WS(' ', :subject, :from_address, :to_address, :body))"
+    ),
+}
+
+
+def index_row(message, body: str) -> dict:
+    """INDEX_INSERT parameters for a message (or a row with the same columns)"""
+    return {
+        "id": message.id,
+        "account_id": message.account_id,
+        "account": f"a{message.account_id}",
+        "subject": message.subject or "",
+        "from_address": message.from_address or "",
+        "to_address": " ".join(
+            filter(None, (message.to_address, message.cc_address, message.bcc_address))
+        ),
+        "body": body,
+    }
+
+
+async def index_messages(
+    db: AsyncSession, messages: Sequence[EmailMessage], body: str
+) -> None:
+    """Add flushed messages sharing one body (body_index_text) to the index"""
+    stmt = INDEX_INSERT.get(_dialect(db))
+    if stmt is None or not messages:
+        # No full-text index on this database
+        return
+    await db.execute(stmt, [index_row(m, body) for m in messages])
+
+
+async def remove_from_index(db: AsyncSession, message_ids: Sequence[int]) -> None:
+    if not message_ids:
+        return
+    dialect = _dialect(db)
+    if dialect not in INDEX_INSERT:
+        return
+    key = "rowid" if dialect == "sqlite" else "message_id"
+    await db.execute(
+        text(f"DELETE FROM email_search WHERE {key} IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+        {"ids": list(message_ids)},
+    )
+
+
+# ==================== Querying ====================
+
+
+def _fts5_expression(terms: List[str]) -> str:
+    parts = []
+    for term in terms:
+        prefix = term.endswith("*")
+        words = " ".join(_WORD.findall(term))
+        if words:
+            parts.append(f'"{words}"' + ("*" if prefix else ""))
+    return " AND ".join(parts)
+
+
+def _mysql_expression(terms: List[str]) -> str:
+    parts = []
+    for term in terms:
+        words = _WORD.findall(term)
+        if len(words) > 1:
+            parts.append('+"' + " ".join(words) + '"')
+        elif words:
+            parts.append("+" + words[0] + ("*" if term.endswith("*") else ""))
+    return " ".join(parts)
+
+
+def _text_match(db: AsyncSession, account_id: int, terms: List[str]):
+    """email_messages.id IN (index matches for the account), or None"""
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        expression = _fts5_expression(terms)
+        if not expression:
+            return None
+        matches = text(
+            "SELECT rowid FROM email_search WHERE email_search MATCH :match"
+        ).bindparams(
+            match=f"account : a{account_id} AND "
+            f"{{subject from_address to_address body}} : ({expression})"
+        )
+    elif dialect == "postgresql":
+        queries = []
+        params = {"account_id": account_id}
+        for i, term in enumerate(terms):
+            words = _WORD.findall(term)
+            if not words:
+                continue
+            params[f"t{i}"] = " ".join(words)
+            if term.endswith("*") and len(words) == 1:
+                queries.append(f"to_tsquery('simple', :t{i} || ':*')")
+            else:
+                queries.append(f"phraseto_tsquery('simple', :t{i})")
+        if not queries:
+            return None
+        matches = text(
+            "SELECT message_id FROM email_search WHERE account_id = :account_id "
+            f"AND document @@ ({' && '.join(queries)})"
+        ).bindparams(**params)
+    elif dialect == "mysql":
+        expression = _mysql_expression(terms)
+        if not expression:
+            return None
+        matches = text(
+            "SELECT message_id FROM email_search WHERE account_id = :account_id "
+            "AND MATCH(document) AGAINST (:match IN BOOLEAN MODE)"
+        ).bindparams(account_id=account_id, match=expression)
+    else:
+        return None
+    return EmailMessage.id.in_(matches.columns(column("message_id", Integer)))
+
+
+def search_condition(db: AsyncSession, account_id: int, query: SearchQuery):
+    """WHERE clause on email_messages for a parsed query"""
+    conditions = [
+        EmailMessage.account_id == account_id,
+        EmailMessage.is_deleted == query.in_trash,
+    ]
+    if query.terms:
+        match = _text_match(db, account_id, query.terms)
+        if match is not None:
+            conditions.append(match)
+    for value in query.from_address:
+        conditions.append(EmailMessage.from_address.ilike(f"%{value}%"))
+    for value in query.to_address:
+        conditions.append(EmailMessage.to_address.ilike(f"%{value}%"))
+    for value in query.subject:
+        conditions.append(EmailMessage.subject.ilike(f"%{value}%"))
+    if query.has_attachment:
+        conditions.append(EmailMessage.has_attachments == True)
+    if query.is_unread is not None:
+        conditions.append(EmailMessage.is_read == (not query.is_unread))
+        conditions.append(EmailMessage.is_sent == False)
+    if query.is_starred:
+        conditions.append(EmailMessage.is_starred == True)
+    if query.after is not None:
+        conditions.append(EmailMessage.received_at >= query.after)
+    if query.before is not None:
+        conditions.append(EmailMessage.received_at < query.before)
+    return and_(*conditions)
@@ -1,114 +1,68 @@
-from sqlalchemy import select, update, desc, and_, func
+from sqlalchemy import select, update, desc, and_, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException
-from typing import List, Optional
-import aiosmtplib
+from typing import BinaryIO, List, Optional
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.mime.base import MIMEBase
+import asyncio
+import io
 import os
 import uuid
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import bleach
-from bleach.css_sanitizer import CSSSanitizer
 
 from app.modules.email.models import (
     EmailMessage,
     EmailAccount,
     EmailAttachment,
+    EmailBody,
     EmailFolder,
+    DeliveryStatus,
+    make_snippet,
+)
+from app.modules.email import storage
+from app.modules.email.outbox import outbox
+from app.modules.email.sanitizer import sanitize_html_async
+from app.modules.email.search import (
+    body_index_text,
+    index_messages,
+    parse_query,
+    search_condition,
+)
+from app.modules.email.stats import (
+    adjust_counters,
+    get_counts,
+    invalidate_counters,
+    message_buckets,
+)
+from app.modules.email.mime_stream import ParsedEmail, parse_message
+from app.modules.email.storage import (
+    UPLOAD_DIR,
+    delete_messages,
+    remove_blob_files,
+    remove_blob_files_later,
+    store_blob,
+    store_blob_file,
 )
 from app.modules.email.schemas import (
     EmailMessageCreate,
     EmailMessageUpdate,
+    EmailSelection,
     EmailFolderCreate,
 )
 from app.modules.auth.models import User
-from email import message_from_bytes, encoders
+from email import encoders
 from email.header import decode_header
+from app.core.config import get_settings
+from app.core.repository import IN_CHUNK_SIZE
+from app.core.smtp_pool import DeliveryResult, get_relay_address, smtp_pool
 from app.core.websocket_manager import websocket_manager
 
 logger = logging.getLogger(__name__)
 
-# Configuration (In a real app, these should be in settings)
-UPLOAD_DIR = "uploads/email_attachments"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-# HTML sanitization configuration
-ALLOWED_TAGS = [
-    "p",
-    "br",
-    "strong",
-    "em",
-    "u",
-    "a",
-    "ul",
-    "ol",
-    "li",
-    "blockquote",
-    "h1",
-    "h2",
-    "h3",
-    "h4",
-    "h5",
-    "h6",
-    "table",
-    "tr",
-    "td",
-    "th",
-    "thead",
-    "tbody",
-    "div",
-    "span",
-    "img",
-    "hr",
-]
-
-ALLOWED_ATTRIBUTES = {
-    "a": ["href", "title", "target", "rel"],
-    "img": ["src", "alt", "title", "width", "height", "align"],
-    "*": ["class", "style"],
-}
-
-ALLOWED_STYLES = [
-    "color",
-    "background-color",
-    "font-family",
-    "font-size",
-    "font-weight",
-    "text-align",
-    "text-decoration",
-    "padding",
-    "margin",
-    "border",
-    "border-collapse",
-    "border-radius",
-    "width",
-    "height",
-    "line-height",
-]
-
-
-def sanitize_html(html: str) -> str:
-    """
-    Sanitize HTML content to prevent XSS attacks.
-    Removes dangerous tags and attributes while preserving safe formatting.
-    """
-    if not html:
-        return html
-
-    css_sanitizer = CSSSanitizer(allowed_css_properties=ALLOWED_STYLES)
-
-    return bleach.clean(
-        html,
-        tags=ALLOWED_TAGS,
-        attributes=ALLOWED_ATTRIBUTES,
-        css_sanitizer=css_sanitizer,
-        strip=True,
-    )
-
 
 async def get_user_email_account(
     db: AsyncSession, user_id: int
@@ -129,93 +83,163 @@ async def create_email_account(
     return account
 
 
-async def get_emails(
-    db: AsyncSession,
-    account_id: int,
-    folder: str = "inbox",
-    skip: int = 0,
-    limit: int = 50,
-) -> List[EmailMessage]:
+# Columns of the mailbox list (schemas.EmailMessageList); bodies and
+# attachments are not loaded for it
+LIST_COLUMNS = (
+    EmailMessage.id,
+    EmailMessage.subject,
+    EmailMessage.from_address,
+    EmailMessage.to_address,
+    EmailMessage.is_read,
+    EmailMessage.is_sent,
+    EmailMessage.is_starred,
+    EmailMessage.is_important,
+    EmailMessage.is_spam,
+    EmailMessage.received_at,
+    EmailMessage.delivery_status,
+    EmailMessage.has_attachments,
+    EmailMessage.snippet,
+)
+
+
+def _folder_filter(account_id: int, folder: str):
+    """WHERE clause for a mailbox view, or None for an unknown folder"""
     if folder == "inbox":
-        stmt = select(EmailMessage).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_sent == False,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_spam == False,
-                EmailMessage.folder_id.is_(None),
-            )
+        return and_(
+            EmailMessage.account_id == account_id,
+            EmailMessage.is_sent == False,
+            EmailMessage.is_deleted == False,
+            EmailMessage.is_spam == False,
+            EmailMessage.folder_id.is_(None),
         )
     elif folder == "sent":
-        stmt = select(EmailMessage).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_sent == True,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_spam == False,
-            )
+        return and_(
+            EmailMessage.account_id == account_id,
+            EmailMessage.is_sent == True,
+            EmailMessage.is_deleted == False,
+            EmailMessage.is_spam == False,
         )
     elif folder == "trash":
-        stmt = select(EmailMessage).where(
-            and_(EmailMessage.account_id == account_id, EmailMessage.is_deleted == True)
+        return and_(
+            EmailMessage.account_id == account_id, EmailMessage.is_deleted == True
         )
     elif folder == "archive":
-        stmt = select(EmailMessage).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_archived == True,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_spam == False,
-            )
+        return and_(
+            EmailMessage.account_id == account_id,
+            EmailMessage.is_archived == True,
+            EmailMessage.is_deleted == False,
+            EmailMessage.is_spam == False,
         )
     elif folder == "starred":
-        stmt = select(EmailMessage).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_starred == True,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_spam == False,
-            )
+        return and_(
+            EmailMessage.account_id == account_id,
+            EmailMessage.is_starred == True,
+            EmailMessage.is_deleted == False,
+            EmailMessage.is_spam == False,
         )
     elif folder == "important":
-        stmt = select(EmailMessage).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_important == True,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_spam == False,
-            )
+        return and_(
+            EmailMessage.account_id == account_id,
+            EmailMessage.is_important == True,
+            EmailMessage.is_deleted == False,
+            EmailMessage.is_spam == False,
         )
     elif folder == "spam":
-        stmt = select(EmailMessage).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_spam == True,
-                EmailMessage.is_deleted == False,
-            )
+        return and_(
+            EmailMessage.account_id == account_id,
+            EmailMessage.is_spam == True,
+            EmailMessage.is_deleted == False,
         )
     else:
         # Assume it's a custom folder ID
         try:
             f_id = int(folder)
-            stmt = select(EmailMessage).where(
-                and_(
-                    EmailMessage.account_id == account_id,
-                    EmailMessage.folder_id == f_id,
-                    EmailMessage.is_deleted == False,
-                )
-            )
         except ValueError:
-            return []
+            return None
+        return and_(
+            EmailMessage.account_id == account_id,
+            EmailMessage.folder_id == f_id,
+            EmailMessage.is_deleted == False,
+        )
+
+
+def _apply_keyset(
+    stmt, before_received_at: Optional[datetime], before_id: Optional[int]
+):
+    """Rows after (received_at, id) in newest-first order"""
+    if before_received_at is None:
+        return stmt
+    if before_received_at.tzinfo is not None:
+        # Stored as naive UTC
+        before_received_at = before_received_at.astimezone(timezone.utc).replace(
+            tzinfo=None
+        )
+    if before_id is None:
+        return stmt.where(EmailMessage.received_at < before_received_at)
+    return stmt.where(
+        or_(
+            EmailMessage.received_at < before_received_at,
+            and_(
+                EmailMessage.received_at == before_received_at,
+                EmailMessage.id < before_id,
+            ),
+        )
+    )
+
+
+async def get_emails(
+    db: AsyncSession,
+    account_id: int,
+    folder: str = "inbox",
+    skip: int = 0,
+    limit: int = 50,
+    before_received_at: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+) -> list:
+    """
+    Mailbox list rows (LIST_COLUMNS), newest first.
+
+    For the next page pass the last row's received_at and id as
+    before_received_at / before_id (keyset pagination); skip is kept for
+    older clients.
+    """
+    condition = _folder_filter(account_id, folder)
+    if condition is None:
+        return []
 
+    stmt = _apply_keyset(
+        select(*LIST_COLUMNS).where(condition), before_received_at, before_id
+    )
     stmt = (
-        stmt.order_by(desc(EmailMessage.received_at))
+        stmt.order_by(desc(EmailMessage.received_at), desc(EmailMessage.id))
         .offset(skip)
         .limit(limit)
-        .options(selectinload(EmailMessage.attachments))
     )
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return list(result.all())
+
+
+async def search_emails(
+    db: AsyncSession,
+    account_id: int,
+    q: str,
+    limit: int = 50,
+    before_received_at: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+) -> list:
+    """
+    Full-text search in an account's mailbox (syntax in search.py), newest
+    first, as mailbox list rows. Pages like get_emails.
+    """
+    condition = search_condition(db, account_id, parse_query(q))
+    stmt = _apply_keyset(
+        select(*LIST_COLUMNS).where(condition), before_received_at, before_id
+    )
+    stmt = stmt.order_by(desc(EmailMessage.received_at), desc(EmailMessage.id)).limit(
+        limit
+    )
+    result = await db.execute(stmt)
+    return list(result.all())
 
 
 async def get_email_attachment(
@@ -270,12 +294,26 @@ async def get_email_by_id(
 from app.core.config_service import ConfigService
 
 
+def record_delivery(message: EmailMessage, delivery: DeliveryResult) -> None:
+    message.delivery_attempts += delivery.attempts
+    if delivery.delivered:
+        message.delivery_status = DeliveryStatus.SENT.value
+        message.delivery_error = None
+    else:
+        message.delivery_status = DeliveryStatus.FAILED.value
+        message.delivery_error = delivery.error
+
+
 async def send_email(
     db: AsyncSession,
     account_id: int,
     email_data: EmailMessageCreate,
     files: List[tuple] = [],
 ) -> EmailMessage:
+    """
+    Store the message in Sent and queue it for delivery. Returns as soon as
+    it is committed; the outbox delivers it and pushes the result.
+    """
     # 1. Fetch sender account
     account = await db.get(EmailAccount, account_id)
     if not account:
@@ -294,86 +332,38 @@ async def send_email(
         is_important=email_data.is_important,
         is_sent=True,
         is_read=True,
+        snippet=make_snippet(email_data.body_text, email_data.body_html),
+        delivery_status=DeliveryStatus.PENDING.value,
     )
     db.add(db_message)
-    await db.commit()
-    await db.refresh(db_message)
-
-    # 3. Handle Attachments
-    from email.mime.multipart import MIMEMultipart
-
-    smtp_msg = MIMEMultipart("mixed")
-    smtp_msg["Subject"] = email_data.subject or ""
-    smtp_msg["From"] = account.email_address
-    smtp_msg["To"] = email_data.to_address
-    if email_data.is_important:
-        smtp_msg["Importance"] = "High"
-        smtp_msg["X-Priority"] = "1"
-        smtp_msg["Priority"] = "urgent"
-    if email_data.cc_address:
-        smtp_msg["Cc"] = email_data.cc_address
-    if email_data.bcc_address:
-        smtp_msg["Bcc"] = email_data.bcc_address
-
-    if email_data.body_text:
-        part_text = MIMEText(email_data.body_text, "plain")
-        smtp_msg.attach(part_text)
-    if email_data.body_html:
-        part_html = MIMEText(email_data.body_html, "html")
-        smtp_msg.attach(part_html)
+    await db.flush()
+    await adjust_counters(db, account_id, frozenset(), message_buckets(db_message))
+    await index_messages(
+        db, [db_message], body_index_text(email_data.body_text, email_data.body_html)
+    )
 
+    # 3. Store attachments (blob files are written off the event loop)
     for filename, content, content_type in files:
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        file_path = Path(UPLOAD_DIR) / unique_filename
-
         try:
-            with open(file_path, "wb") as f:
-                f.write(content)
-
-            attachment = EmailAttachment(
-                message_id=db_message.id,
-                file_name=filename,
-                file_path=str(file_path),
-                file_size=len(content),
-            )
-            db.add(attachment)
-
-            # Add to email message
-            from email.mime.base import MIMEBase
-
-            part = MIMEBase(
-                *(
-                    content_type.split("/", 1)
-                    if "/" in content_type
-                    else ("application", "octet-stream")
+            blob = await store_blob(db, content)
+            db.add(
+                EmailAttachment(
+                    message_id=db_message.id,
+                    filename=filename,
+                    content_type=content_type,
+                    file_path=blob.file_path,
+                    file_size=blob.file_size,
+                    blob_id=blob.id,
                 )
             )
-            part.set_payload(content)
-            import email.encoders
-
-            email.encoders.encode_base64(part)
-            part.add_header("Content-Disposition", f'attachment; filename="{filename}"')
-            smtp_msg.attach(part)
-
+            db_message.has_attachments = True
         except Exception as e:
             logger.error(f"Failed to save attachment {filename}: {e}")
 
-    await db.flush()
-
-    # 4. Send via aiosmtplib
-    smtp_host = await ConfigService.get_value(db, "email_smtp_host", "127.0.0.1")
-    smtp_port = await ConfigService.get_value(db, "email_smtp_port", "2525")
-
-    try:
-        async with aiosmtplib.SMTP(hostname=smtp_host, port=int(smtp_port)) as smtp:
-            await smtp.send_message(smtp_msg)
+    await db.commit()
 
-        logger.info(
-            f"Email sent via SMTP ({smtp_host}:{smtp_port}) to {email_data.to_address}"
-        )
-    except Exception as e:
-        logger.error(f"Failed to send email: {e}")
-        # Note: Message is already saved as Sent. We might want to mark as failed later.
+    # 4. Hand over to the outbox workers
+    outbox.enqueue(db_message.id)
 
     # Re-fetch with attachments to avoid MissingGreenlet on response serialization
     stmt = (
@@ -387,52 +377,161 @@ async def send_email(
     return db_message
 
 
-# --- Incoming Email Processing ---
+def build_outgoing_message(
+    message: EmailMessage, attachments: List[EmailAttachment]
+) -> MIMEMultipart:
+    """MIME message for a stored sent message (reads attachment files)"""
+    smtp_msg = MIMEMultipart("mixed")
+    smtp_msg["Subject"] = message.subject or ""
+    smtp_msg["From"] = message.from_address
+    smtp_msg["To"] = message.to_address
+    if message.is_important:
+        smtp_msg["Importance"] = "High"
+        smtp_msg["X-Priority"] = "1"
+        smtp_msg["Priority"] = "urgent"
+    if message.cc_address:
+        smtp_msg["Cc"] = message.cc_address
+    if message.bcc_address:
+        smtp_msg["Bcc"] = message.bcc_address
+
+    if message.body_text:
+        smtp_msg.attach(MIMEText(message.body_text, "plain"))
+    if message.body_html:
+        smtp_msg.attach(MIMEText(message.body_html, "html"))
+
+    for attachment in attachments:
+        content_type = attachment.content_type or ""
+        part = MIMEBase(
+            *(
+                content_type.split("/", 1)
+                if "/" in content_type
+                else ("application", "octet-stream")
+            )
+        )
+        with open(attachment.file_path, "rb") as f:
+            part.set_payload(f.read())
+        encoders.encode_base64(part)
+        part.add_header(
+            "Content-Disposition", f'attachment; filename="{attachment.filename}"'
+        )
+        smtp_msg.attach(part)
+
+    return smtp_msg
+
+
+async def deliver_email(db: AsyncSession, message_id: int) -> Optional[EmailMessage]:
+    """
+    Deliver a queued sent message through the relay and record the outcome.
+    Returns None if the message is no longer pending (already claimed).
+    """
+    claimed = await db.execute(
+        update(EmailMessage)
+        .where(
+            EmailMessage.id == message_id,
+            EmailMessage.delivery_status == DeliveryStatus.PENDING.value,
+        )
+        .values(
+            delivery_status=DeliveryStatus.SENDING.value,
+            delivery_claimed_at=datetime.now(timezone.utc),
+        )
+    )
+    await db.commit()
+    if claimed.rowcount == 0:
+        return None
 
+    stmt = (
+        select(EmailMessage)
+        .where(EmailMessage.id == message_id)
+        .options(
+            selectinload(EmailMessage.attachments), selectinload(EmailMessage.account)
+        )
+    )
+    message = (await db.execute(stmt)).scalar_one()
 
-async def _extract_email_body(msg) -> tuple[str, str]:
-    """Extract plain text and HTML body from email message"""
-    body_text = ""
-    body_html = ""
-
-    if msg.is_multipart():
-        for part in msg.walk():
-            ctype = part.get_content_type()
-            cdispo = str(part.get("Content-Disposition"))
-
-            if ctype == "text/plain" and "attachment" not in cdispo:
-                try:
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        body_text += payload.decode("utf-8", errors="ignore")
-                except (UnicodeDecodeError, LookupError, ValueError) as e:
-                    logger.warning(f"Failed to decode text/plain part: {e}")
-                    pass
-            elif ctype == "text/html" and "attachment" not in cdispo:
-                try:
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        body_html += sanitize_html(
-                            payload.decode("utf-8", errors="ignore")
-                        )
-                except (UnicodeDecodeError, LookupError, ValueError) as e:
-                    logger.warning(f"Failed to decode text/html part: {e}")
-                    pass
+    try:
+        smtp_msg = await asyncio.to_thread(
+            build_outgoing_message, message, list(message.attachments)
+        )
+    except OSError as e:
+        delivery = DeliveryResult(
+            delivered=False, attempts=0, error=f"Attachment unavailable: {e}"
+        )
     else:
-        try:
-            payload = msg.get_payload(decode=True)
-            if payload:
-                content = payload.decode("utf-8", errors="ignore")
-                ctype = msg.get_content_type()
-                if ctype == "text/html":
-                    body_html = sanitize_html(content)
-                else:
-                    body_text = content
-        except (UnicodeDecodeError, LookupError, ValueError) as e:
-            logger.warning(f"Failed to decode message content: {e}")
-            pass
+        # Pooled relay connection (retries transient failures)
+        smtp_host, smtp_port = await get_relay_address(db)
+        delivery = await smtp_pool.send(smtp_msg, smtp_host, smtp_port)
+    record_delivery(message, delivery)
+    await db.commit()
+
+    if delivery.delivered:
+        logger.info(f"Email {message_id} sent via SMTP to {message.to_address}")
+    else:
+        logger.error(f"Failed to send email {message_id}: {delivery.error}")
+
+    try:
+        await websocket_manager.broadcast_to_user(
+            message.account.user_id,
+            {
+                "type": "email_delivery",
+                "id": message.id,
+                "delivery_status": message.delivery_status,
+                "delivery_error": message.delivery_error,
+            },
+        )
+    except Exception as ws_err:
+        logger.warning(
+            f"Failed to push delivery status of email {message_id}: {ws_err}"
+        )
+
+    return message
+
+
+async def release_stale_claims(db: AsyncSession) -> List[int]:
+    """
+    Put messages claimed longer ago than a delivery can take back to pending
+    (the worker crashed or deliver_email raised). Fresh claims may be in
+    flight on another process and are left alone.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=smtp_pool.delivery_budget_seconds()
+        + get_settings().email_outbox_claim_grace_seconds
+    )
+    stale = and_(
+        EmailMessage.delivery_status == DeliveryStatus.SENDING.value,
+        or_(
+            EmailMessage.delivery_claimed_at.is_(None),
+            EmailMessage.delivery_claimed_at < cutoff,
+        ),
+    )
+    # Select, then update by id: MySQL has no UPDATE ... RETURNING. The
+    # update repeats the condition in case a row was claimed again meanwhile.
+    released = list((await db.execute(select(EmailMessage.id).where(stale))).scalars())
+    for start in range(0, len(released), IN_CHUNK_SIZE):
+        await db.execute(
+            update(EmailMessage)
+            .where(EmailMessage.id.in_(released[start : start + IN_CHUNK_SIZE]), stale)
+            .values(
+                delivery_status=DeliveryStatus.PENDING.value, delivery_claimed_at=None
+            )
+        )
+    await db.commit()
+    if released:
+        logger.warning(f"Outbox: released {len(released)} stale delivery claims")
+    return released
+
 
-    return body_text, body_html
+async def get_undelivered_message_ids(db: AsyncSession) -> List[int]:
+    """Sent messages waiting for delivery, including released stale claims"""
+    await release_stale_claims(db)
+    result = await db.execute(
+        select(EmailMessage.id)
+        .where(EmailMessage.delivery_status == DeliveryStatus.PENDING.value)
+        .order_by(EmailMessage.id)
+    )
+    return list(result.scalars().all())
+
+
+# --- Incoming Email Processing ---
 
 
 async def _get_attachment_settings(db: AsyncSession) -> tuple[int, int, set]:
@@ -459,83 +558,6 @@ async def _get_attachment_settings(db: AsyncSession) -> tuple[int, int, set]:
     return max_bytes, max_total_bytes, allowed_exts
 
 
-async def _save_email_attachments(
-    db: AsyncSession,
-    msg,
-    message_id: int,
-    max_bytes: int,
-    max_total_bytes: int,
-    allowed_exts: set,
-) -> None:
-    """Save email attachments to disk and database"""
-    from pathlib import Path
-
-    total_size = 0
-
-    if msg.is_multipart():
-        for part in msg.walk():
-            cdispo = str(part.get("Content-Disposition"))
-
-            if "attachment" in cdispo or "filename" in cdispo:
-                filename = part.get_filename()
-                if not filename:
-                    continue
-
-                # Check file extension
-                ext = Path(filename).suffix.lower()
-                if allowed_exts and ext not in allowed_exts:
-                    logger.warning(
-                        f"Skipping attachment with disallowed extension: {filename}"
-                    )
-                    continue
-
-                # Get file content and size
-                try:
-                    content = part.get_content()
-                    file_size = len(content)
-                except Exception as e:
-                    logger.warning(f"Failed to decode attachment {filename}: {e}")
-                    continue
-
-                # Check size limits
-                if file_size > max_bytes:
-                    logger.warning(
-                        f"Skipping oversized attachment: {filename} ({file_size} bytes)"
-                    )
-                    continue
-
-                if total_size + file_size > max_total_bytes:
-                    logger.warning(
-                        f"Total attachment size exceeded, skipping: {filename}"
-                    )
-                    continue
-
-                total_size += file_size
-
-                # Generate unique filename
-                unique_filename = f"{uuid.uuid4()}_{filename}"
-                file_path = Path(UPLOAD_DIR) / unique_filename
-
-                # Save to disk
-                try:
-                    with open(file_path, "wb") as f:
-                        f.write(content)
-                except Exception as e:
-                    logger.error(f"Failed to save attachment {filename}: {e}")
-                    continue
-
-                # Create database record
-                attachment = EmailAttachment(
-                    message_id=message_id,
-                    file_name=filename,
-                    file_path=str(file_path),
-                    file_size=file_size,
-                )
-                db.add(attachment)
-
-    await db.flush()
-
-
 async def _find_or_create_email_account(
     db: AsyncSession, recipient: str, accounts_dict: dict
 ) -> Optional[EmailAccount]:
@@ -596,23 +618,23 @@ async def process_incoming_email(
     db: AsyncSession, sender: str, recipients: List[str], content: bytes
 ) -> None:
     """Process incoming email from SMTP server and save to database"""
-    # Parse email message
-    email_msg = message_from_bytes(content)
+    await process_incoming_stream(db, sender, recipients, io.BytesIO(content))
 
-    # Extract subject
-    subject = email_msg.get("Subject", "")
-    if subject:
-        subject, charset = decode_header(subject)[0]
-        if isinstance(subject, bytes):
-            subject = subject.decode(charset or "utf-8", errors="ignore")
 
+async def process_incoming_stream(
+    db: AsyncSession, sender: str, recipients: List[str], stream: BinaryIO
+) -> None:
+    """
+    Process an incoming message read from a binary stream (a spool file).
+
+    The message is parsed incrementally in a thread; attachments are
+    decoded straight to disk and dropped once they exceed the limits, so
+    memory use doesn't grow with attachment size.
+    """
     # Clean sender address
     if "<" in sender:
         sender = sender.split("<")[1].split(">")[0]
 
-    # Extract body
-    body_text, body_html = await _extract_email_body(email_msg)
-
     # Get attachment settings
     max_bytes, max_total_bytes, allowed_exts = await _get_attachment_settings(db)
 
@@ -634,29 +656,118 @@ async def process_incoming_email(
         )
         return
 
-    # Create email messages for each recipient account
-    for recipient, clean_recipient in zip(recipients, clean_recipients):
-        account = accounts_dict.get(clean_recipient)
-        if not account:
+    parsed = await asyncio.to_thread(
+        parse_message,
+        stream,
+        storage.UPLOAD_DIR,
+        max_bytes,
+        max_total_bytes,
+        allowed_exts,
+    )
+    try:
+        await _store_parsed_email(
+            db, parsed, sender, recipients, clean_recipients, accounts_dict
+        )
+    finally:
+        # Temporary files of attachments that weren't stored
+        await asyncio.to_thread(parsed.discard)
+
+
+async def _store_parsed_email(
+    db: AsyncSession,
+    parsed: ParsedEmail,
+    sender: str,
+    recipients: List[str],
+    clean_recipients: List[str],
+    accounts_dict: dict,
+) -> None:
+    email_msg = parsed.headers
+
+    # Extract subject
+    subject = email_msg.get("Subject", "")
+    if subject:
+        subject, charset = decode_header(subject)[0]
+        if isinstance(subject, bytes):
+            subject = subject.decode(charset or "utf-8", errors="ignore")
+
+    recipient_accounts = [
+        accounts_dict[clean_recipient]
+        for clean_recipient in clean_recipients
+        if clean_recipient in accounts_dict
+    ]
+
+    # Body and attachment content are stored once for all recipients
+    body = EmailBody(
+        body_text=parsed.body_text,
+        body_html=await sanitize_html_async(parsed.body_html),
+    )
+    db.add(body)
+    # From the raw HTML: script/style content is dropped with its tags
+    snippet = make_snippet(parsed.body_text, parsed.body_html)
+    attachments = []
+    for attachment in parsed.attachments:
+        try:
+            blob = await store_blob_file(
+                db,
+                attachment.temp_path,
+                attachment.sha256,
+                attachment.size,
+                refs=len(recipient_accounts),
+            )
+        except Exception as e:
+            logger.error(f"Failed to save attachment {attachment.filename}: {e}")
             continue
+        attachments.append((attachment.filename, attachment.content_type, blob))
 
+    is_important = (
+        str(email_msg.get("X-Priority", "")).strip() == "1"
+        or str(email_msg.get("Importance", "")).lower().strip() == "high"
+        or str(email_msg.get("Priority", "")).lower().strip() == "urgent"
+    )
+    received_at = datetime.now(timezone.utc)
+
+    # One mailbox entry per recipient account
+    db_messages = []
+    for account in recipient_accounts:
         db_msg = EmailMessage(
             account_id=account.id,
             subject=subject,
             from_address=sender,
             to_address=",".join(recipients),
-            body_text=body_text,
-            body_html=body_html,
-            received_at=datetime.now(timezone.utc),
+            body=body,
+            snippet=snippet,
+            has_attachments=bool(attachments),
+            received_at=received_at,
             is_read=False,
-            is_important=str(email_msg.get("X-Priority", "")).strip() == "1"
-            or str(email_msg.get("Importance", "")).lower().strip() == "high"
-            or str(email_msg.get("Priority", "")).lower().strip() == "urgent",
+            is_important=is_important,
         )
         db.add(db_msg)
-        await db.flush()
+        db_messages.append(db_msg)
+    await db.flush()
+
+    for account, db_msg in zip(recipient_accounts, db_messages):
+        await adjust_counters(db, account.id, frozenset(), message_buckets(db_msg))
+    await index_messages(
+        db, db_messages, body_index_text(parsed.body_text, parsed.body_html)
+    )
 
-        # Notify user via WebSocket
+    for db_msg in db_messages:
+        for filename, content_type, blob in attachments:
+            db.add(
+                EmailAttachment(
+                    message_id=db_msg.id,
+                    filename=filename,
+                    content_type=content_type,
+                    file_path=blob.file_path,
+                    file_size=blob.file_size,
+                    blob_id=blob.id,
+                )
+            )
+
+    await db.commit()
+
+    # Notify users via WebSocket
+    for account, db_msg in zip(recipient_accounts, db_messages):
         try:
             await websocket_manager.broadcast_to_user(
                 account.user_id,
@@ -665,7 +776,7 @@ async def process_incoming_email(
                     "id": db_msg.id,
                     "subject": subject,
                     "from_address": sender,
-                    "received_at": db_msg.received_at.isoformat(),
+                    "received_at": received_at.isoformat(),
                 },
             )
         except Exception as ws_err:
@@ -673,12 +784,6 @@ async def process_incoming_email(
                 f"Failed to send email notification to user {account.user_id}: {ws_err}"
             )
 
-        await _save_email_attachments(
-            db, email_msg, db_msg.id, max_bytes, max_total_bytes, allowed_exts
-        )
-
-    await db.commit()
-
 
 async def update_email_message(
     db: AsyncSession, message_id: int, account_id: int, updates: EmailMessageUpdate
@@ -687,9 +792,11 @@ async def update_email_message(
     if not message:
         return None
 
+    before = message_buckets(message)
     update_data = updates.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(message, field, value)
+    await adjust_counters(db, account_id, before, message_buckets(message))
 
     await db.commit()
     # Re-fetch to ensure relationships are loaded and prevent MissingGreenlet
@@ -701,7 +808,18 @@ async def delete_email_message(db: AsyncSession, message_id: int, account_id: in
     if not message:
         return
 
-    await db.delete(message)
+    await adjust_counters(db, account_id, message_buckets(message), frozenset())
+    paths = await delete_messages(db, [message.id])
+    await db.commit()
+    await remove_blob_files(db, paths)
+
+
+async def mark_as_read(db: AsyncSession, message: EmailMessage) -> None:
+    if message.is_read:
+        return
+    before = message_buckets(message)
+    message.is_read = True
+    await adjust_counters(db, message.account_id, before, message_buckets(message))
     await db.commit()
 
 
@@ -730,145 +848,177 @@ async def empty_folder(db: AsyncSession, account_id: int, folder_type: str):
     if folder_type not in ["trash", "spam"]:
         return
 
-    from sqlalchemy import delete
-
     if folder_type == "trash":
-        stmt = delete(EmailMessage).where(
-            and_(EmailMessage.account_id == account_id, EmailMessage.is_deleted == True)
+        condition = and_(
+            EmailMessage.account_id == account_id, EmailMessage.is_deleted == True
         )
     else:
-        stmt = delete(EmailMessage).where(
-            and_(EmailMessage.account_id == account_id, EmailMessage.is_spam == True)
+        condition = and_(
+            EmailMessage.account_id == account_id, EmailMessage.is_spam == True
         )
+    await _delete_where(db, account_id, condition)
 
-    await db.execute(stmt)
-    await db.commit()
 
+# ==================== Bulk actions ====================
 
-async def get_folders(db: AsyncSession, account_id: int) -> List[EmailFolder]:
-    """Get all folders for account"""
-    stmt = (
-        select(EmailFolder)
-        .where(EmailFolder.account_id == account_id)
-        .order_by(EmailFolder.name)
-    )
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+# Messages deleted per delete_messages() call (bound parameters per statement)
+BULK_DELETE_CHUNK = 500
+# Larger selections are announced without the id list
+BULK_NOTIFY_MAX_IDS = 1000
 
 
-async def get_email_stats(db: AsyncSession, account_id: int) -> dict:
-    """Get email statistics for account"""
-
-    # Count inbox messages (not sent, not deleted, no folder)
-    inbox_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_sent == False,
-                EmailMessage.is_deleted == False,
-                EmailMessage.folder_id.is_(None),
-            )
+def _selection_filter(db: AsyncSession, account_id: int, selection: EmailSelection):
+    given = [
+        value
+        for value in (selection.ids, selection.folder, selection.q)
+        if value is not None
+    ]
+    if len(given) != 1:
+        raise HTTPException(
+            status_code=400, detail="Select messages by exactly one of ids, folder, q"
         )
-    )
-
-    # Count sent messages
-    sent_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_sent == True,
-                EmailMessage.is_deleted == False,
-            )
+    if selection.ids is not None:
+        return and_(
+            EmailMessage.account_id == account_id,
+            EmailMessage.id.in_(selection.ids),
         )
-    )
+    if selection.folder is not None:
+        condition = _folder_filter(account_id, selection.folder)
+        if condition is None:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown folder '{selection.folder}'"
+            )
+        return condition
+    return search_condition(db, account_id, parse_query(selection.q))
 
-    # Count trash messages
-    trash_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(EmailMessage.account_id == account_id, EmailMessage.is_deleted == True)
-        )
-    )
 
-    # Count archived messages
-    archived_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_archived == True,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_spam == False,
-            )
-        )
+async def _notify_mailbox(db: AsyncSession, account_id: int, event: dict) -> None:
+    """One WebSocket event per bulk action instead of one per message"""
+    user_id = await db.scalar(
+        select(EmailAccount.user_id).where(EmailAccount.id == account_id)
     )
+    try:
+        await websocket_manager.broadcast_to_user(user_id, event)
+    except Exception as ws_err:
+        logger.warning(f"Failed to send mailbox update to user {user_id}: {ws_err}")
 
-    # Count starred messages
-    starred_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_starred == True,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_spam == False,
-            )
-        )
-    )
 
-    # Count important messages
-    important_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_important == True,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_spam == False,
+async def bulk_update_emails(
+    db: AsyncSession,
+    account_id: int,
+    selection: EmailSelection,
+    updates: EmailMessageUpdate,
+) -> int:
+    """Apply flag / folder changes to the selected messages in one UPDATE"""
+    condition = _selection_filter(db, account_id, selection)
+    values = updates.model_dump(exclude_unset=True)
+    if not values:
+        return 0
+    if values.get("folder_id") is not None:
+        folder = await db.scalar(
+            select(EmailFolder.id).where(
+                EmailFolder.id == values["folder_id"],
+                EmailFolder.account_id == account_id,
             )
         )
-    )
+        if folder is None:
+            raise HTTPException(status_code=404, detail="Folder not found")
 
-    spam_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_spam == True,
-                EmailMessage.is_deleted == False,
-            )
-        )
+    result = await db.execute(
+        update(EmailMessage)
+        .where(condition)
+        .values(**values)
+        .execution_options(synchronize_session=False)
     )
+    count = result.rowcount
+    if count:
+        await invalidate_counters(db, [account_id])
+    await db.commit()
 
-    # Count total messages (not deleted)
-    total_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_spam == False,
-            )
+    if count:
+        ids = selection.ids
+        await _notify_mailbox(
+            db,
+            account_id,
+            {
+                "type": "emails_updated",
+                "ids": (
+                    ids if ids is not None and len(ids) <= BULK_NOTIFY_MAX_IDS else None
+                ),
+                "count": count,
+                "changes": values,
+            },
         )
+    return count
+
+
+async def _delete_where(db: AsyncSession, account_id: int, condition) -> List[int]:
+    """
+    Permanently delete the account's messages matching condition. Attachment
+    files are removed in the background once the delete has committed.
+    """
+    message_ids = list(
+        (await db.execute(select(EmailMessage.id).where(condition))).scalars()
     )
+    if not message_ids:
+        return []
+    paths = []
+    for start in range(0, len(message_ids), BULK_DELETE_CHUNK):
+        paths += await delete_messages(
+            db, message_ids[start : start + BULK_DELETE_CHUNK]
+        )
+    await invalidate_counters(db, [account_id])
+    await db.commit()
+    remove_blob_files_later(paths)
+    return message_ids
 
-    # Count unread messages (only incoming, not sent)
-    unread_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_read == False,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_sent == False,
-                EmailMessage.is_spam == False,
-            )
+
+async def bulk_delete_emails(
+    db: AsyncSession, account_id: int, selection: EmailSelection
+) -> int:
+    """Permanently delete the selected messages"""
+    message_ids = await _delete_where(
+        db, account_id, _selection_filter(db, account_id, selection)
+    )
+    if message_ids:
+        await _notify_mailbox(
+            db,
+            account_id,
+            {
+                "type": "emails_deleted",
+                "ids": (
+                    message_ids if len(message_ids) <= BULK_NOTIFY_MAX_IDS else None
+                ),
+                "count": len(message_ids),
+            },
         )
+    return len(message_ids)
+
+
+async def get_folders(db: AsyncSession, account_id: int) -> List[EmailFolder]:
+    """Get all folders for account"""
+    stmt = (
+        select(EmailFolder)
+        .where(EmailFolder.account_id == account_id)
+        .order_by(EmailFolder.name)
     )
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
 
+
+async def get_email_stats(db: AsyncSession, account_id: int) -> dict:
+    """Get email statistics for account (one query, or a counters row)"""
+    counts = await get_counts(db, account_id)
     return {
-        "inbox": inbox_count or 0,
-        "sent": sent_count or 0,
-        "important": important_count or 0,
-        "starred": starred_count or 0,
-        "archived": archived_count or 0,
-        "spam": spam_count or 0,
-        "trash": trash_count or 0,
-        "total": total_count or 0,
-        "unread": unread_count or 0,
+        "inbox": counts["inbox"],
+        "sent": counts["sent"],
+        "important": counts["important"],
+        "starred": counts["starred"],
+        "archived": counts["archived"],
+        "spam": counts["spam"],
+        "trash": counts["trash"],
+        "total": counts["total"],
+        "unread": counts["unread"],
     }
 
 
@@ -906,22 +1056,14 @@ async def delete_folder(db: AsyncSession, folder_id: int, account_id: int):
             .values(folder_id=None)
         )
         await db.delete(folder)
+        await invalidate_counters(db, [account_id])
         await db.commit()
 
 
 async def get_unread_count(db: AsyncSession, account_id: int) -> dict:
     """Get total unread count for account (only incoming messages)"""
-    unread_count = await db.scalar(
-        select(func.count(EmailMessage.id)).where(
-            and_(
-                EmailMessage.account_id == account_id,
-                EmailMessage.is_read == False,
-                EmailMessage.is_deleted == False,
-                EmailMessage.is_sent == False,  # Only count incoming messages
-            )
-        )
-    )
-    return {"total": unread_count or 0}
+    counts = await get_counts(db, account_id)
+    return {"total": counts["unread_total"]}
 
 
 async def mark_all_as_read(db: AsyncSession, account_id: int) -> dict:
@@ -938,5 +1080,6 @@ async def mark_all_as_read(db: AsyncSession, account_id: int) -> dict:
         )
         .values(is_read=True)
     )
+    await invalidate_counters(db, [account_id])
     await db.commit()
     return {"status": "success"}
@@ -1,51 +1,54 @@
 import logging
 from aiosmtpd.controller import Controller
-from app.core.database import AsyncSessionLocal
-from app.modules.email.service import process_incoming_email
+from app.modules.email.spool import MailSpool, mail_spool
 
 logger = logging.getLogger(__name__)
 
 
-class DatabaseHandler:
+class SpoolHandler:
+    """Accept a message once it is durably spooled; workers process it later"""
+
+    def __init__(self, spool: MailSpool):
+        self.spool = spool
+
     async def handle_DATA(self, server, session, envelope):
         sender = envelope.mail_from
         recipients = envelope.rcpt_tos
-        content = envelope.content  # Bytes
-
-        logger.info(f"SMTP: Receiving email from {sender} to {recipients}")
 
         try:
-            # We need a new DB session for this operation
-            async with AsyncSessionLocal() as db:
-                await process_incoming_email(db, sender, recipients, content)
-
-            logger.info(f"SMTP: Successfully processed email from {sender}")
-            return "250 OK"
+            await self.spool.accept(sender, recipients, envelope.content)
         except Exception as e:
             logger.error(
-                f"SMTP: Error processing incoming email from {sender}: {e}",
-                exc_info=True,
+                f"SMTP: Failed to spool email from {sender}: {e}", exc_info=True
             )
-            return "500 Internal Server Error"
+            # Temporary failure: the sending server will retry
+            return "451 Requested action aborted: local error in processing"
+
+        logger.debug("SMTP: Spooled email from %s to %s", sender, recipients)
+        return "250 OK"
 
 
 class SMTPServerManager:
-    def __init__(self, hostname="0.0.0.0", port=2525):
+    def __init__(self, hostname="0.0.0.0", port=2525, spool: MailSpool = mail_spool):
         # Using 2525 by default to avoid permission issues if not root,
         # though user asked for "like a server", often needs 25.
         # We can map 25->2525 via docker or iptables, or run as root (not recommended).
         # Let's verify with user or assume high port for dev.
         self.hostname = hostname
         self.port = port
+        self.spool = spool
         self.controller = None
 
-    def start(self):
-        handler = DatabaseHandler()
+    async def start(self):
+        """Start the spool workers on this loop and the SMTP listener thread"""
+        handler = SpoolHandler(self.spool)
         self.controller = Controller(handler, hostname=self.hostname, port=self.port)
         self.controller.start()
+        await self.spool.start()
         logger.info(f"SMTP Server started on {self.hostname}:{self.port}")
 
-    def stop(self):
+    async def stop(self):
         if self.controller:
             self.controller.stop()
+            await self.spool.stop()
             logger.info("SMTP Server stopped")
@@ -0,0 +1,240 @@
+"""
+Incoming Mail Spool
+
+The SMTP handler only writes the raw message to disk and answers 250;
+parsing, sanitizing, account lookup, attachment storage and notifications
+happen afterwards in a pool of workers on the application event loop.
+
+Layout (maildir style, one file per message):
+
+- tmp/  being written; moved to new/ once fsynced
+- new/  accepted, waiting for a worker
+- cur/  claimed by a worker (moved back to new/ on restart)
+- dead/ failed EMAIL_SPOOL_MAX_ATTEMPTS times, with a .error file next to it
+
+A spool file is a JSON envelope line ({"sender", "recipients"}) followed
+by the raw message bytes, which are handed to the processor as an open
+file so large messages are never read into memory whole. Failed messages
+are retried with exponential backoff; delivery is at-least-once.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import traceback
+import uuid
+from pathlib import Path
+from typing import Awaitable, BinaryIO, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# (sender, recipients, message file positioned at the raw message)
+ProcessFunc = Callable[[str, List[str], BinaryIO], Awaitable[None]]
+
+
+class MailSpool:
+    """Durable queue of incoming messages plus the workers that drain it"""
+
+    def __init__(
+        self,
+        directory: str,
+        process: Optional[ProcessFunc] = None,
+        workers: int = 4,
+        max_attempts: int = 5,
+        retry_seconds: float = 2.0,
+    ) -> None:
+        self.root = Path(directory)
+        self.process = process or process_spooled_email
+        self.worker_count = workers
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self._attempts: Dict[str, int] = {}
+        # Messages waiting out a retry delay (not in the queue meanwhile)
+        self._retrying: Set[str] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._dirs_ready = False
+
+    def _ensure_dirs(self) -> None:
+        # Created on first use, not at import time
+        if not self._dirs_ready:
+            for name in ("tmp", "new", "cur", "dead"):
+                (self.root / name).mkdir(parents=True, exist_ok=True)
+            self._dirs_ready = True
+
+    # ==================== Accepting ====================
+
+    def write(self, sender: str, recipients: List[str], content: bytes) -> Path:
+        """Durably store a message (blocking; call from a thread)"""
+        self._ensure_dirs()
+        name = f"{time.time_ns()}-{uuid.uuid4().hex}.eml"
+        tmp_path = self.root / "tmp" / name
+        envelope = json.dumps({"sender": sender, "recipients": recipients})
+        with open(tmp_path, "wb") as f:
+            f.write(envelope.encode() + b"\n")
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        path = self.root / "new" / name
+        os.replace(tmp_path, path)
+        return path
+
+    async def accept(self, sender: str, recipients: List[str], content: bytes) -> None:
+        """Spool a message from any event loop and wake a worker"""
+        path = await asyncio.to_thread(self.write, sender, recipients, content)
+        self._notify(path.name)
+
+    def _notify(self, name: str) -> None:
+        if self._loop is None or self._queue is None:
+            # Workers not running; the file is picked up on start()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._queue.put_nowait(name)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, name)
+
+    # ==================== Processing ====================
+
+    @staticmethod
+    def open_message(path: Path) -> Tuple[str, List[str], BinaryIO]:
+        """Read the envelope; the returned file is positioned at the message"""
+        f = open(path, "rb")
+        try:
+            envelope = json.loads(f.readline())
+        except Exception:
+            f.close()
+            raise
+        return envelope["sender"], envelope["recipients"], f
+
+    async def _handle(self, name: str) -> None:
+        new_path = self.root / "new" / name
+        cur_path = self.root / "cur" / name
+        try:
+            # Claim the message; a missing file means someone else has it
+            os.rename(new_path, cur_path)
+        except FileNotFoundError:
+            return
+
+        try:
+            sender, recipients, message = await asyncio.to_thread(
+                self.open_message, cur_path
+            )
+            with message:
+                await self.process(sender, recipients, message)
+        except Exception as e:
+            attempts = self._attempts.get(name, 0) + 1
+            self._attempts[name] = attempts
+            if attempts >= self.max_attempts:
+                self._dead_letter(name, cur_path)
+                return
+            delay = self.retry_seconds * 2 ** (attempts - 1)
+            logger.warning(
+                "Spooled email %s failed (attempt %d/%d), retrying in %.1fs: %s",
+                name,
+                attempts,
+                self.max_attempts,
+                delay,
+                e,
+            )
+            os.replace(cur_path, new_path)
+            self._retrying.add(name)
+            self._loop.call_later(delay, self._retry, name)
+            return
+
+        self._attempts.pop(name, None)
+        cur_path.unlink(missing_ok=True)
+
+    def _retry(self, name: str) -> None:
+        self._retrying.discard(name)
+        if self._queue is not None:
+            self._queue.put_nowait(name)
+
+    def _dead_letter(self, name: str, path: Path) -> None:
+        self._attempts.pop(name, None)
+        dead_path = self.root / "dead" / name
+        os.replace(path, dead_path)
+        error = traceback.format_exc()
+        dead_path.with_suffix(".error").write_text(error)
+        logger.error(
+            "Spooled email %s moved to dead letter after %d attempts",
+            name,
+            self.max_attempts,
+        )
+
+    async def _worker(self) -> None:
+        while True:
+            name = await self._queue.get()
+            try:
+                await self._handle(name)
+            except Exception:
+                logger.exception("Mail spool worker error for %s", name)
+            finally:
+                self._queue.task_done()
+
+    # ==================== Lifecycle ====================
+
+    def pending(self) -> List[str]:
+        self._ensure_dirs()
+        return sorted(p.name for p in (self.root / "new").glob("*.eml"))
+
+    async def start(self) -> None:
+        """Recover unfinished messages and start the worker pool"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        # Messages claimed by a previous run that didn't finish
+        for path in (self.root / "cur").glob("*.eml"):
+            os.replace(path, self.root / "new" / path.name)
+        for name in self.pending():
+            self._queue.put_nowait(name)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+        if self._queue.qsize():
+            logger.info(f"Mail spool: recovered {self._queue.qsize()} messages")
+
+    async def drain(self) -> None:
+        """Wait until every queued message has been processed (tests, benchmarks)"""
+        while True:
+            await self._queue.join()
+            if not self._retrying:
+                return
+            await asyncio.sleep(0.05)
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._retrying.clear()
+        self._loop = None
+        self._queue = None
+
+
+async def process_spooled_email(
+    sender: str, recipients: List[str], message: BinaryIO
+) -> None:
+    from app.core.database import AsyncSessionLocal
+    from app.modules.email.service import process_incoming_stream
+
+    async with AsyncSessionLocal() as db:
+        await process_incoming_stream(db, sender, recipients, message)
+
+
+# Singleton instance
+mail_spool = MailSpool(
+    settings.email_spool_dir,
+    workers=settings.email_spool_workers,
+    max_attempts=settings.email_spool_max_attempts,
+    retry_seconds=settings.email_spool_retry_seconds,
+)
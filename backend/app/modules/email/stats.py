@@ -0,0 +1,170 @@
+"""
+Mailbox Statistics
+
+Folder counts for the mailbox sidebar and the unread badge.
+
+- count_messages(): every count in one conditional-aggregation query
+  (SUM(CASE ...) per bucket, portable to SQLite, PostgreSQL and MySQL)
+  over the account's rows
+- Counters (EMAIL_STATS_COUNTERS): the same numbers kept in one
+  email_counters row per account. Single-message changes adjust it with
+  adjust_counters(); bulk changes drop it with invalidate_counters() and
+  the next read rebuilds it with one INSERT ... SELECT of the aggregate on
+  the writer, so no message change can land between counting and storing
+
+BUCKETS is the single definition of what each count means; the SQL
+aggregate and the per-message membership used for adjustments are both
+derived from it.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, Iterable
+
+from sqlalchemy import and_, case, delete, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.modules.email.models import EmailCounters, EmailMessage
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+counters_enabled = settings.email_stats_counters
+
+# Bucket -> required column values (None means IS NULL)
+BUCKETS: Dict[str, Dict[str, object]] = {
+    "inbox": {"is_sent": False, "is_deleted": False, "folder_id": None},
+    "sent": {"is_sent": True, "is_deleted": False},
+    "important": {"is_important": True, "is_deleted": False, "is_spam": False},
+    "starred": {"is_starred": True, "is_deleted": False, "is_spam": False},
+    "archived": {"is_archived": True, "is_deleted": False, "is_spam": False},
+    "spam": {"is_spam": True, "is_deleted": False},
+    "trash": {"is_deleted": True},
+    "total": {"is_deleted": False, "is_spam": False},
+    "unread": {
+        "is_read": False,
+        "is_deleted": False,
+        "is_sent": False,
+        "is_spam": False,
+    },
+    # Unread incoming including spam (the unread-count badge)
+    "unread_total": {"is_read": False, "is_deleted": False, "is_sent": False},
+}
+
+
+def _condition(required: Dict[str, object]):
+    columns = []
+    for field, value in required.items():
+        column = getattr(EmailMessage, field)
+        columns.append(column.is_(None) if value is None else column == value)
+    return and_(*columns)
+
+
+def message_buckets(message: EmailMessage) -> FrozenSet[str]:
+    """Buckets a (flushed) message counts towards"""
+    return frozenset(
+        name
+        for name, required in BUCKETS.items()
+        if all(getattr(message, field) == value for field, value in required.items())
+    )
+
+
+def _aggregates():
+    return [
+        func.coalesce(func.sum(case((_condition(required), 1), else_=0)), 0)
+        for required in BUCKETS.values()
+    ]
+
+
+async def count_messages(db: AsyncSession, account_id: int) -> Dict[str, int]:
+    """All bucket counts for an account in one query"""
+    stmt = select(*_aggregates()).where(EmailMessage.account_id == account_id)
+    row = (await db.execute(stmt)).one()
+    return {name: int(value) for name, value in zip(BUCKETS, row)}
+
+
+def _insert_ignore(db: AsyncSession):
+    """INSERT into email_counters that does nothing if the row exists"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert(EmailCounters).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert(EmailCounters).on_conflict_do_nothing()
+    return insert(EmailCounters).prefix_with("IGNORE", dialect="mysql")
+
+
+async def rebuild_counters(db: AsyncSession, account_id: int) -> None:
+    """
+    Store the aggregate as the account's counters row. A single statement on
+    the writer, so a concurrent adjust either is counted or finds the row.
+    """
+    aggregate = select(
+        literal(account_id), *_aggregates(), literal(datetime.now(timezone.utc))
+    ).where(EmailMessage.account_id == account_id)
+    await db.execute(
+        _insert_ignore(db).from_select(
+            ["account_id", *BUCKETS, "updated_at"], aggregate
+        )
+    )
+
+
+async def get_counts(db: AsyncSession, account_id: int) -> Dict[str, int]:
+    """Bucket counts, from the counters row when enabled"""
+    if not counters_enabled:
+        return await count_messages(db, account_id)
+
+    columns = [getattr(EmailCounters, name) for name in BUCKETS]
+    row = (
+        await db.execute(select(*columns).where(EmailCounters.account_id == account_id))
+    ).one_or_none()
+    if row is not None:
+        return dict(row._mapping)
+
+    # Rebuilt (or, if another request got there first, left as is) and read
+    # back in the same writer transaction
+    await rebuild_counters(db, account_id)
+    row = (
+        await db.execute(select(*columns).where(EmailCounters.account_id == account_id))
+    ).one()
+    await db.commit()
+    return dict(row._mapping)
+
+
+async def adjust_counters(
+    db: AsyncSession,
+    account_id: int,
+    before: FrozenSet[str],
+    after: FrozenSet[str],
+) -> None:
+    """
+    Apply one message moving from the `before` to the `after` buckets
+    (frozenset() for a created / deleted message). Part of the caller's
+    transaction; a missing row is left to be rebuilt on read.
+    """
+    if not counters_enabled or before == after:
+        return
+    values = {
+        name: getattr(EmailCounters, name) + (1 if name in after else -1)
+        for name in before ^ after
+    }
+    await db.execute(
+        update(EmailCounters)
+        .where(EmailCounters.account_id == account_id)
+        .values(**values, updated_at=datetime.now(timezone.utc))
+    )
+
+
+async def invalidate_counters(db: AsyncSession, account_ids: Iterable[int]) -> None:
+    """Drop counters after a bulk change; rebuilt on the next read"""
+    account_ids = set(account_ids)
+    if not counters_enabled or not account_ids:
+        return
+    await db.execute(
+        delete(EmailCounters).where(EmailCounters.account_id.in_(account_ids))
+    )
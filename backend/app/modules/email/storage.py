@@ -0,0 +1,274 @@
+"""
+Email Content Storage
+
+A message delivered to many internal recipients is stored once:
+
+- EmailBody: the (sanitized) text/HTML body, shared by every recipient's
+  EmailMessage row
+- EmailBlob: attachment content, content-addressed by SHA-256 and written
+  to UPLOAD_DIR/<sha256> once. Each EmailAttachment row (per recipient, per
+  file) references a blob and counts towards its ref_count; the file is
+  removed when the count drops to zero.
+
+Files released by bulk deletes are removed by a background task
+(remove_blob_files_later) after the request has committed. Blob files are
+written before their EmailBlob row; files a transaction created are
+removed the same way if it rolls back instead of committing.
+
+Disk usage and write time are O(message), not O(message x recipients).
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Set
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.database import AsyncSessionLocal
+from app.modules.email.models import (
+    EmailAttachment,
+    EmailBlob,
+    EmailBody,
+    EmailMessage,
+)
+from app.modules.email.search import remove_from_index
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = "uploads/email_attachments"
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Session.info key: blob files created in the session's current transaction
+NEW_BLOB_FILES = "email_new_blob_files"
+
+
+def _write_blob_file(path: Path, content: bytes) -> bool:
+    """Write the blob file; False if it already existed"""
+    if path.exists():
+        # Same hash, same bytes
+        return False
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _move_blob_file(temp_path: str, path: Path) -> bool:
+    """Move temp_path to the blob file; False if it already existed"""
+    if path.exists():
+        os.remove(temp_path)
+        return False
+    os.replace(temp_path, path)
+    return True
+
+
+def _track_new_file(db: AsyncSession, path: Path) -> None:
+    db.sync_session.info.setdefault(NEW_BLOB_FILES, []).append(str(path))
+
+
+async def store_blob(db: AsyncSession, content: bytes, refs: int = 1) -> EmailBlob:
+    """Store attachment content once and add `refs` references to it"""
+    digest = hashlib.sha256(content).hexdigest()
+    path = Path(UPLOAD_DIR) / digest
+    if await asyncio.to_thread(_write_blob_file, path, content):
+        _track_new_file(db, path)
+    return await _add_blob_refs(db, digest, path, len(content), refs)
+
+
+async def store_blob_file(
+    db: AsyncSession, temp_path: str, digest: str, size: int, refs: int = 1
+) -> EmailBlob:
+    """
+    Like store_blob for content already written to temp_path (in UPLOAD_DIR)
+    and hashed, e.g. by the streaming MIME parser. temp_path is consumed.
+    """
+    path = Path(UPLOAD_DIR) / digest
+    if await asyncio.to_thread(_move_blob_file, temp_path, path):
+        _track_new_file(db, path)
+    return await _add_blob_refs(db, digest, path, size, refs)
+
+
+async def _add_blob_refs(
+    db: AsyncSession, digest: str, path: Path, size: int, refs: int
+) -> EmailBlob:
+    blob = await db.scalar(select(EmailBlob).where(EmailBlob.sha256 == digest))
+    if blob is None:
+        try:
+            async with db.begin_nested():
+                blob = EmailBlob(
+                    sha256=digest,
+                    file_path=str(path),
+                    file_size=size,
+                    ref_count=refs,
+                )
+                db.add(blob)
+            return blob
+        except IntegrityError:
+            # Another writer stored the same content meanwhile
+            blob = await db.scalar(select(EmailBlob).where(EmailBlob.sha256 == digest))
+
+    await db.execute(
+        update(EmailBlob)
+        .where(EmailBlob.id == blob.id)
+        .values(ref_count=EmailBlob.ref_count + refs)
+    )
+    return blob
+
+
+async def release_blobs(db: AsyncSession, blob_ids: Iterable[int]) -> List[str]:
+    """
+    Drop one reference per occurrence in blob_ids.
+
+    Blobs left without references are deleted; their file paths are returned
+    so the caller can remove them after committing (see remove_blob_files).
+    """
+    counts = Counter(b for b in blob_ids if b is not None)
+    for blob_id, count in counts.items():
+        await db.execute(
+            update(EmailBlob)
+            .where(EmailBlob.id == blob_id)
+            .values(ref_count=EmailBlob.ref_count - count)
+        )
+    if not counts:
+        return []
+
+    result = await db.execute(
+        select(EmailBlob.id, EmailBlob.file_path).where(
+            EmailBlob.id.in_(list(counts)), EmailBlob.ref_count <= 0
+        )
+    )
+    unused = result.all()
+    if unused:
+        await db.execute(
+            delete(EmailBlob).where(EmailBlob.id.in_([r.id for r in unused]))
+        )
+    return [r.file_path for r in unused]
+
+
+async def remove_blob_files(db: AsyncSession, paths: List[str]) -> None:
+    """Remove released files unless a blob or attachment row uses them meanwhile"""
+    if not paths:
+        return
+    result = await db.execute(
+        select(EmailBlob.file_path).where(EmailBlob.file_path.in_(paths))
+    )
+    stored_again = set(result.scalars().all())
+    result = await db.execute(
+        select(EmailAttachment.file_path).where(
+            EmailAttachment.file_path.in_(paths), EmailAttachment.blob_id.is_(None)
+        )
+    )
+    stored_again.update(result.scalars().all())
+
+    def _remove():
+        for path in paths:
+            if path in stored_again:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Failed to delete email blob {path}: {e}")
+
+    await asyncio.to_thread(_remove)
+
+
+_cleanup_tasks: Set[asyncio.Task] = set()
+
+
+async def _remove_blob_files_task(paths: List[str]) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            await remove_blob_files(db, paths)
+    except Exception as e:
+        logger.error(f"Failed to clean up {len(paths)} email blob files: {e}")
+
+
+def remove_blob_files_later(paths: List[str]) -> None:
+    """remove_blob_files in a background task with its own session (call after commit)"""
+    if not paths:
+        return
+    task = asyncio.create_task(_remove_blob_files_task(paths))
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_cleanup_tasks.discard)
+
+
+async def wait_for_cleanup() -> None:
+    """Wait for scheduled file cleanup (shutdown, tests)"""
+    if _cleanup_tasks:
+        await asyncio.gather(*list(_cleanup_tasks), return_exceptions=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _keep_new_blob_files(session):
+    # Also fired when a savepoint is released; only the outer commit counts
+    if not session.in_nested_transaction():
+        session.info.pop(NEW_BLOB_FILES, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _remove_rolled_back_blob_files(session, transaction):
+    if transaction.parent is not None:
+        return
+    # Still listed: the transaction ended without committing its blob rows.
+    # remove_blob_files keeps a file if a committed row uses it meanwhile.
+    paths = session.info.pop(NEW_BLOB_FILES, None)
+    if paths:
+        remove_blob_files_later(paths)
+
+
+async def delete_orphan_bodies(db: AsyncSession, body_ids: Iterable[int]) -> None:
+    """Delete shared bodies no message points to any more"""
+    body_ids = {b for b in body_ids if b is not None}
+    if not body_ids:
+        return
+    still_used = select(EmailMessage.body_id).where(EmailMessage.body_id.in_(body_ids))
+    await db.execute(
+        delete(EmailBody).where(
+            EmailBody.id.in_(body_ids), EmailBody.id.not_in(still_used)
+        )
+    )
+
+
+async def delete_messages(db: AsyncSession, message_ids: List[int]) -> List[str]:
+    """
+    Delete messages with their attachment rows, releasing shared content.
+
+    Does not commit. Returns file paths to pass to remove_blob_files once the
+    transaction has committed: released blobs plus the files of legacy
+    attachments (stored before blobs, blob_id NULL).
+    """
+    if not message_ids:
+        return []
+
+    result = await db.execute(
+        select(EmailAttachment.blob_id, EmailAttachment.file_path).where(
+            EmailAttachment.message_id.in_(message_ids)
+        )
+    )
+    attachments = result.all()
+    blob_ids = [a.blob_id for a in attachments if a.blob_id is not None]
+    legacy_paths = [a.file_path for a in attachments if a.blob_id is None]
+    result = await db.execute(
+        select(EmailMessage.body_id).where(EmailMessage.id.in_(message_ids))
+    )
+    body_ids = result.scalars().all()
+
+    await db.execute(
+        delete(EmailAttachment).where(EmailAttachment.message_id.in_(message_ids))
+    )
+    await db.execute(delete(EmailMessage).where(EmailMessage.id.in_(message_ids)))
+    await remove_from_index(db, message_ids)
+    paths = await release_blobs(db, blob_ids)
+    await delete_orphan_bodies(db, body_ids)
+    return legacy_paths + paths
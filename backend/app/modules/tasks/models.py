@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from typing import Optional
-from sqlalchemy import String, DateTime, ForeignKey, Text
+from sqlalchemy import String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 import enum
@@ -63,3 +63,13 @@ class Task(Base):
     # Foreign Keys
     issuer = relationship("User", foreign_keys=[issuer_id])
     assignee = relationship("User", foreign_keys=[assignee_id])
+
+    __table_args__ = (
+        # Received tasks: assignee + status filter, newest first
+        Index(
+            "ix_tasks_assignee_id_status_created_at",
+            "assignee_id",
+            "status",
+            "created_at",
+        ),
+    )
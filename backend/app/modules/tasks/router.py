@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_db_readonly
 from app.modules.auth.router import get_current_user
 from app.modules.auth.models import User
 from .models import Task, TaskStatus
@@ -151,7 +151,8 @@ async def get_received_tasks(
 
 @router.get("/issued", response_model=List[TaskResponse])
 async def get_issued_tasks(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_readonly),
 ):
     """Get non-completed tasks issued by current user"""
     query = (
@@ -170,7 +171,8 @@ async def get_issued_tasks(
 
 @router.get("/completed", response_model=List[TaskResponse])
 async def get_completed_tasks(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_readonly),
 ):
     """Get completed tasks (either issued or received)"""
     query = (
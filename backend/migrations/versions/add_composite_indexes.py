@@ -0,0 +1,86 @@
+"""add composite, covering and partial indexes for hot list queries
+
+Revision ID: add_composite_indexes
+Revises: add_invitation_id_simple
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "add_composite_indexes"
+down_revision: Union[str, None] = "add_invitation_id_simple"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match how get_emails renders the inbox filter, or SQLite won't use it
+INBOX_INDEX_WHERE = {
+    "sqlite": "is_sent = 0 AND is_deleted = 0 AND is_spam = 0 AND folder_id IS NULL",
+    "postgresql": (
+        "is_sent = false AND is_deleted = false AND is_spam = false "
+        "AND folder_id IS NULL"
+    ),
+}
+
+# name -> (table, columns, covering columns for PostgreSQL INCLUDE)
+COMPOSITE_INDEXES = {
+    "ix_messages_channel_id_id": ("messages", ["channel_id", "id"], None),
+    "ix_messages_channel_id_created_at": (
+        "messages",
+        ["channel_id", "created_at"],
+        None,
+    ),
+    "ix_channel_members_user_id_channel_id": (
+        "channel_members",
+        ["user_id", "channel_id"],
+        ["last_read_message_id", "is_pinned"],
+    ),
+    "ix_email_messages_mailbox": (
+        "email_messages",
+        ["account_id", "is_deleted", "is_spam", "folder_id", "received_at"],
+        None,
+    ),
+    "ix_tasks_assignee_id_status_created_at": (
+        "tasks",
+        ["assignee_id", "status", "created_at"],
+        None,
+    ),
+    "ix_document_shares_recipient_id_created_at": (
+        "document_shares",
+        ["recipient_id", "created_at"],
+        ["document_id", "status"],
+    ),
+    "ix_archive_files_unit_folder_private_created": (
+        "archive_files",
+        ["unit_id", "folder_id", "is_private", "created_at"],
+        None,
+    ),
+}
+
+
+def upgrade() -> None:
+    for name, (table, columns, include) in COMPOSITE_INDEXES.items():
+        op.create_index(
+            name, table, columns, unique=False, postgresql_include=include or []
+        )
+
+    # Partial on SQLite/PostgreSQL; MySQL has no partial indexes and gets a
+    # plain (account_id, received_at) index instead
+    op.create_index(
+        "ix_email_messages_inbox",
+        "email_messages",
+        ["account_id", "received_at"],
+        unique=False,
+        sqlite_where=sa.text(INBOX_INDEX_WHERE["sqlite"]),
+        postgresql_where=sa.text(INBOX_INDEX_WHERE["postgresql"]),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_email_messages_inbox", table_name="email_messages")
+    for name, (table, _columns, _include) in reversed(COMPOSITE_INDEXES.items()):
+        op.drop_index(name, table_name=table)
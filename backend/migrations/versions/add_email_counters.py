@@ -0,0 +1,52 @@
+"""add per-account email counters
+
+Revision ID: add_email_counters
+Revises: add_email_delivery_status
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "add_email_counters"
+down_revision: Union[str, None] = "add_email_delivery_status"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = (
+    "inbox",
+    "sent",
+    "important",
+    "starred",
+    "archived",
+    "spam",
+    "trash",
+    "total",
+    "unread",
+    "unread_total",
+)
+
+
+def upgrade() -> None:
+    # Rows are built lazily from email_messages on first read
+    op.create_table(
+        "email_counters",
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        *(
+            sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+            for name in COUNTERS
+        ),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["account_id"], ["email_accounts.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("account_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("email_counters")
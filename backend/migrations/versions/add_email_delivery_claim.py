@@ -0,0 +1,30 @@
+"""record when an outbox worker claimed a message for delivery
+
+Revision ID: add_email_delivery_claim
+Revises: add_email_search
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "add_email_delivery_claim"
+down_revision: Union[str, None] = "add_email_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Messages left "sending" have no claim time and are released as stale
+    op.add_column(
+        "email_messages",
+        sa.Column("delivery_claimed_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("email_messages", "delivery_claimed_at")
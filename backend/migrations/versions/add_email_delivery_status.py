@@ -0,0 +1,41 @@
+"""record outbound delivery status on email messages
+
+Revision ID: add_email_delivery_status
+Revises: add_email_shared_content
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "add_email_delivery_status"
+down_revision: Union[str, None] = "add_email_shared_content"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "email_messages",
+        sa.Column("delivery_status", sa.String(length=20), nullable=True),
+    )
+    op.add_column(
+        "email_messages",
+        sa.Column(
+            "delivery_attempts", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    op.add_column(
+        "email_messages",
+        sa.Column("delivery_error", sa.Text(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("email_messages", "delivery_error")
+    op.drop_column("email_messages", "delivery_attempts")
+    op.drop_column("email_messages", "delivery_status")
@@ -0,0 +1,72 @@
+"""store snippet and has_attachments for the mailbox list
+
+Revision ID: add_email_list_columns
+Revises: add_email_counters
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.modules.email.models import make_snippet
+
+# revision identifiers, used by Alembic.
+revision: str = "add_email_list_columns"
+down_revision: Union[str, None] = "add_email_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    op.add_column(
+        "email_messages",
+        sa.Column("snippet", sa.String(length=255), nullable=True),
+    )
+    op.add_column(
+        "email_messages",
+        sa.Column(
+            "has_attachments", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+    )
+
+    conn = op.get_bind()
+    conn.execute(
+        sa.text(
+            "UPDATE email_messages SET has_attachments = EXISTS ("
+            "SELECT 1 FROM email_attachments "
+            "WHERE email_attachments.message_id = email_messages.id)"
+        )
+    )
+
+    # Snippets of existing messages, from the shared or the inline body
+    select_bodies = sa.text(
+        "SELECT m.id, COALESCE(b.body_text, m.body_text), "
+        "COALESCE(b.body_html, m.body_html) "
+        "FROM email_messages m LEFT JOIN email_bodies b ON b.id = m.body_id "
+        "WHERE m.id > :last_id ORDER BY m.id LIMIT :limit"
+    )
+    update_snippet = sa.text(
+        "UPDATE email_messages SET snippet = :snippet WHERE id = :id"
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select_bodies, {"last_id": last_id, "limit": BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            update_snippet,
+            [{"id": row[0], "snippet": make_snippet(row[1], row[2])} for row in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    op.drop_column("email_messages", "has_attachments")
+    op.drop_column("email_messages", "snippet")
@@ -0,0 +1,63 @@
+"""full-text search index over email messages
+
+Revision ID: add_email_search
+Revises: add_email_list_columns
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.modules.email.models import SEARCH_INDEX_DDL
+from app.modules.email.search import INDEX_INSERT, body_index_text, index_row
+
+# revision identifiers, used by Alembic.
+revision: str = "add_email_search"
+down_revision: Union[str, None] = "add_email_list_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    dialect = conn.dialect.name
+    if dialect not in SEARCH_INDEX_DDL:
+        return
+    for statement in SEARCH_INDEX_DDL[dialect]:
+        conn.execute(sa.text(statement))
+
+    # Index existing messages, from the shared or the inline body
+    select_messages = sa.text(
+        "SELECT m.id, m.account_id, m.subject, m.from_address, m.to_address, "
+        "m.cc_address, m.bcc_address, COALESCE(b.body_text, m.body_text) AS body_text, "
+        "COALESCE(b.body_html, m.body_html) AS body_html "
+        "FROM email_messages m LEFT JOIN email_bodies b ON b.id = m.body_id "
+        "WHERE m.id > :last_id ORDER BY m.id LIMIT :limit"
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select_messages, {"last_id": last_id, "limit": BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            INDEX_INSERT[dialect],
+            [
+                index_row(
+                    row,
+                    body_index_text(row.body_text, row.body_html),
+                )
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS email_search")
@@ -0,0 +1,77 @@
+"""store email bodies and attachment blobs once per message
+
+Revision ID: add_email_shared_content
+Revises: add_composite_indexes
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "add_email_shared_content"
+down_revision: Union[str, None] = "add_composite_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_bodies",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("body_text", sa.Text(), nullable=True),
+        sa.Column("body_html", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_email_bodies_id"), "email_bodies", ["id"], unique=False)
+
+    op.create_table(
+        "email_blobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("file_path", sa.String(length=512), nullable=False),
+        sa.Column("file_size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("sha256"),
+    )
+    op.create_index(op.f("ix_email_blobs_id"), "email_blobs", ["id"], unique=False)
+
+    # Existing rows keep their inline bodies and per-message files. Batch
+    # mode: SQLite can only add a foreign key by recreating the table.
+    with op.batch_alter_table("email_messages") as batch_op:
+        batch_op.add_column(sa.Column("body_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_email_messages_body_id", "email_bodies", ["body_id"], ["id"]
+        )
+        batch_op.create_index(
+            batch_op.f("ix_email_messages_body_id"), ["body_id"], unique=False
+        )
+    with op.batch_alter_table("email_attachments") as batch_op:
+        batch_op.add_column(sa.Column("blob_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_email_attachments_blob_id", "email_blobs", ["blob_id"], ["id"]
+        )
+        batch_op.create_index(
+            batch_op.f("ix_email_attachments_blob_id"), ["blob_id"], unique=False
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("email_attachments") as batch_op:
+        batch_op.drop_index(batch_op.f("ix_email_attachments_blob_id"))
+        batch_op.drop_constraint("fk_email_attachments_blob_id", type_="foreignkey")
+        batch_op.drop_column("blob_id")
+    with op.batch_alter_table("email_messages") as batch_op:
+        batch_op.drop_index(batch_op.f("ix_email_messages_body_id"))
+        batch_op.drop_constraint("fk_email_messages_body_id", type_="foreignkey")
+        batch_op.drop_column("body_id")
+    op.drop_index(op.f("ix_email_blobs_id"), table_name="email_blobs")
+    op.drop_table("email_blobs")
+    op.drop_index(op.f("ix_email_bodies_id"), table_name="email_bodies")
+    op.drop_table("email_bodies")
@@ -0,0 +1,142 @@
+"""
+Benchmark "select all -> mark read / move / delete" on a mailbox page.
+
+Seeds a throwaway SQLite database with one account holding --messages
+messages and applies one action to --select of them:
+
+- per message: update_email_message / delete_email_message per id (one
+  request each, the previous client behaviour)
+- bulk: bulk_update_emails / bulk_delete_emails with the id list
+
+Reports wall time and SQL statements for each.
+
+Run from the backend directory:
+    python -m scripts.bench_bulk_mailbox [--messages 5000] [--select 500]
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import tempfile
+import time
+
+# Throwaway database; must be set before app settings load
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP.name}/bench.db"
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.engine import Engine
+
+from app.core.database import AsyncSessionLocal, dispose_engines, engine, init_db
+from app.modules.auth.models import User
+from app.modules.email import service
+from app.modules.email.models import EmailAccount, EmailMessage
+from app.modules.email.schemas import EmailMessageUpdate, EmailSelection
+
+
+async def seed(messages: int) -> int:
+    await init_db()
+    async with engine.begin() as conn:
+        user_id = (
+            await conn.execute(
+                insert(User).values(
+                    username="bench", email="bench@example.com", hashed_password="x"
+                )
+            )
+        ).inserted_primary_key[0]
+        account_id = (
+            await conn.execute(
+                insert(EmailAccount).values(
+                    user_id=user_id, email_address="bench@example.com"
+                )
+            )
+        ).inserted_primary_key[0]
+        rows = [
+            {
+                "account_id": account_id,
+                "subject": f"Message {i}",
+                "from_address": "sender@external.com",
+                "to_address": "bench@example.com",
+            }
+            for i in range(messages)
+        ]
+        for start in range(0, len(rows), 5000):
+            await conn.execute(insert(EmailMessage), rows[start : start + 5000])
+    return account_id
+
+
+async def measure(name: str, func) -> None:
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    # Every engine: reads may be routed to a separate one
+    event.listen(Engine, "before_cursor_execute", count)
+    try:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await func(db)
+            elapsed = time.perf_counter() - started
+    finally:
+        event.remove(Engine, "before_cursor_execute", count)
+    print(f"{name:28} {elapsed * 1000:9.1f} ms {statements:6} statements")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--select", type=int, default=500)
+    args = parser.parse_args()
+
+    account_id = await seed(args.messages)
+    async with AsyncSessionLocal() as db:
+        ids = list(
+            await db.scalars(
+                select(EmailMessage.id)
+                .where(EmailMessage.account_id == account_id)
+                .order_by(EmailMessage.id)
+            )
+        )
+    first, second = ids[: args.select], ids[args.select : 2 * args.select]
+    mark_read = EmailMessageUpdate(is_read=True, is_archived=True)
+
+    async def update_each(db):
+        for message_id in first:
+            await service.update_email_message(db, message_id, account_id, mark_read)
+
+    async def delete_each(db):
+        for message_id in first:
+            await service.delete_email_message(db, message_id, account_id)
+
+    try:
+        await measure("mark read, per message", update_each)
+        await measure(
+            "mark read, bulk",
+            lambda db: service.bulk_update_emails(
+                db, account_id, EmailSelection(ids=second), mark_read
+            ),
+        )
+        await measure("delete, per message", delete_each)
+        await measure(
+            "delete, bulk",
+            lambda db: service.bulk_delete_emails(
+                db, account_id, EmailSelection(ids=second)
+            ),
+        )
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
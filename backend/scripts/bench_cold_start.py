@@ -0,0 +1,83 @@
+"""
+Measure worker cold start: import + lifespan startup in a fresh process.
+
+Each sample spawns a new interpreter that imports app.main and runs the
+FastAPI lifespan until the app is ready, against a throwaway SQLite
+database. The first boot creates the schema and seeds it; later boots find
+the markers in schema_meta and skip both steps.
+
+Run from the backend directory:
+    python -m scripts.bench_cold_start [--runs 5] [--max-warm-seconds 3]
+
+With --max-warm-seconds the script exits non-zero if the median warm boot
+exceeds the budget, so CI can fail on startup regressions.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BOOT = """
+import asyncio, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(boot())
+print(f"{imported - started:.4f} {ready - imported:.4f}")
+"""
+
+
+def boot(env: dict) -> tuple:
+    backend = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    result = subprocess.run(
+        [sys.executable, "-c", BOOT],
+        cwd=backend,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Boot failed:\n{result.stderr}")
+    import_s, startup_s = result.stdout.strip().splitlines()[-1].split()
+    return float(import_s), float(startup_s)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-warm-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'boot.db')}"
+        env.setdefault("SECRET_KEY", "bench-secret-key-0123456789abcdef")
+        env.setdefault("DEBUG", "true")
+
+        cold = boot(env)
+        warm = [boot(env) for _ in range(args.runs)]
+
+    warm_import = statistics.median(w[0] for w in warm)
+    warm_startup = statistics.median(w[1] for w in warm)
+    print(f"cold boot  import {cold[0]:.3f}s  startup {cold[1]:.3f}s")
+    print(f"warm boot  import {warm_import:.3f}s  startup {warm_startup:.3f}s")
+    print(f"           (median of {args.runs})")
+
+    total = warm_import + warm_startup
+    if args.max_warm_seconds is not None and total > args.max_warm_seconds:
+        print(f"FAIL: warm boot {total:.3f}s > budget {args.max_warm_seconds:.3f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
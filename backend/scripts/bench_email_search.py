@@ -0,0 +1,170 @@
+"""
+Benchmark email search (GET /email/search).
+
+Seeds a throwaway SQLite database with --messages messages spread over
+--accounts accounts, indexed in email_search, then times one page of
+results for one account:
+
+- ilike: LIKE '%word%' over subject and body (what a search without the
+  index has to do)
+- search_emails: word, phrase, prefix and filtered queries through the
+  FTS5 index
+
+Run from the backend directory:
+    python -m scripts.bench_email_search [--messages 200000] [--accounts 50]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import secrets
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Throwaway database; must be set before app settings load
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP.name}/bench.db"
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import desc, insert, or_, select
+
+from app.core.database import AsyncSessionLocal, dispose_engines, engine, init_db
+from app.modules.auth.models import User
+from app.modules.email import service
+from app.modules.email.models import EmailAccount, EmailMessage
+from app.modules.email.search import INDEX_INSERT, index_row
+
+WORDS = (
+    "report budget meeting invoice schedule review project release contract "
+    "travel lunch deadline agenda minutes draft approval delivery order "
+    "support ticket update request summary quarterly planning design"
+).split()
+
+BATCH_SIZE = 5000
+
+
+async def seed(messages: int, accounts: int) -> int:
+    await init_db()
+    rng = random.Random(0)
+    # Rare words give selective queries; common ones match many rows
+    vocabulary = WORDS + [f"term{i}" for i in range(20000)]
+    started = datetime(2025, 1, 1)
+    async with engine.begin() as conn:
+        account_ids = []
+        for i in range(accounts):
+            user_id = (
+                await conn.execute(
+                    insert(User).values(
+                        username=f"bench{i}",
+                        email=f"bench{i}@example.com",
+                        hashed_password="x",
+                    )
+                )
+            ).inserted_primary_key[0]
+            account_ids.append(
+                (
+                    await conn.execute(
+                        insert(EmailAccount).values(
+                            user_id=user_id, email_address=f"bench{i}@example.com"
+                        )
+                    )
+                ).inserted_primary_key[0]
+            )
+
+        next_id = 1
+        for start in range(0, messages, BATCH_SIZE):
+            rows, index = [], []
+            for i in range(start, min(start + BATCH_SIZE, messages)):
+                body = " ".join(rng.choices(vocabulary, k=200))
+                row = {
+                    "id": next_id,
+                    "account_id": account_ids[i % accounts],
+                    "subject": " ".join(rng.choices(WORDS, k=4)),
+                    "from_address": f"sender{rng.randrange(500)}@external.com",
+                    "to_address": f"bench{i % accounts}@example.com",
+                    "cc_address": None,
+                    "bcc_address": None,
+                    "body_text": body,
+                    "snippet": body[:200],
+                    "has_attachments": rng.random() < 0.1,
+                    "received_at": started + timedelta(seconds=i * 30),
+                }
+                rows.append(row)
+                index.append(index_row(SimpleNamespace(**row), body))
+                next_id += 1
+            await conn.execute(insert(EmailMessage.__table__), rows)
+            await conn.execute(INDEX_INSERT["sqlite"], index)
+    return account_ids[0]
+
+
+async def ilike(db, account_id: int, word: str, limit: int) -> None:
+    pattern = f"%{word}%"
+    await db.execute(
+        select(EmailMessage.id)
+        .where(
+            EmailMessage.account_id == account_id,
+            EmailMessage.is_deleted == False,
+            or_(
+                EmailMessage.subject.ilike(pattern),
+                EmailMessage._body_text.ilike(pattern),
+            ),
+        )
+        .order_by(desc(EmailMessage.received_at), desc(EmailMessage.id))
+        .limit(limit)
+    )
+
+
+async def measure(name: str, func, repeat: int = 20) -> None:
+    async with AsyncSessionLocal() as db:
+        rows = await func(db)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await func(db)
+        elapsed = time.perf_counter() - started
+    found = f"{len(rows):4} rows" if rows is not None else ""
+    print(f"{name:32} {elapsed / repeat * 1000:8.2f} ms per page {found}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    account_id = await seed(args.messages, args.accounts)
+    print(f"seeded {args.messages} messages in {time.perf_counter() - started:.1f} s")
+    limit = args.limit
+    try:
+        await measure(
+            "ilike, rare word", lambda db: ilike(db, account_id, "term123", limit)
+        )
+        for q in (
+            "term123",
+            "budget",
+            '"budget meeting"',
+            "term12*",
+            "budget has:attachment",
+            "budget after:2025-01-15 before:2025-02-01",
+        ):
+            await measure(
+                f"search {q}",
+                lambda db, q=q: service.search_emails(db, account_id, q, limit),
+            )
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
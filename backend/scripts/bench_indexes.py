@@ -0,0 +1,321 @@
+"""
+Benchmark the composite/covering/partial indexes on hot list queries.
+
+Seeds a throwaway SQLite database with realistic volumes, then runs each
+list query with the new indexes dropped (previous schema) and created,
+printing the query plan and the mean time per query for both.
+
+The queries are the ones the services issue (channel history, my channels,
+mailbox views, received tasks, shared documents, archive folder listing),
+compiled by SQLAlchemy so the SQL matches what the app sends.
+
+Run from the backend directory:
+    python -m scripts.bench_indexes [--scale 1.0] [--runs 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import and_, create_engine, desc, insert, select, text
+
+from app.core.database import Base
+from app.modules.auth.models import User, Unit
+from app.modules.chat.models import Channel, ChannelMember, Message
+from app.modules.board.models import Document, DocumentShare
+from app.modules.archive.models import ArchiveFile
+from app.modules.tasks.models import Task, TaskStatus
+from app.modules.email.models import EmailAccount, EmailMessage
+
+# Register the remaining models so create_all can resolve foreign keys
+import app.modules.admin.models  # noqa: F401
+
+NEW_INDEXES = [
+    ("messages", "ix_messages_channel_id_id"),
+    ("messages", "ix_messages_channel_id_created_at"),
+    ("channel_members", "ix_channel_members_user_id_channel_id"),
+    ("email_messages", "ix_email_messages_mailbox"),
+    ("email_messages", "ix_email_messages_inbox"),
+    ("tasks", "ix_tasks_assignee_id_status_created_at"),
+    ("document_shares", "ix_document_shares_recipient_id_created_at"),
+    ("archive_files", "ix_archive_files_unit_folder_private_created"),
+]
+
+
+def seed(conn, scale: float) -> dict:
+    n_users = int(500 * scale)
+    n_units = 20
+    n_channels = int(300 * scale)
+    n_messages = int(200_000 * scale)
+    n_emails = int(100_000 * scale)
+    n_tasks = int(30_000 * scale)
+    n_docs = int(10_000 * scale)
+    n_shares = int(50_000 * scale)
+    n_files = int(50_000 * scale)
+    rnd = random.Random(42)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def ts(i: int) -> datetime:
+        return base + timedelta(seconds=i * 7)
+
+    conn.execute(insert(Unit), [{"name": f"Unit {i}"} for i in range(n_units)])
+    conn.execute(
+        insert(User),
+        [
+            {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "hashed_password": "x",
+                "unit_id": i % n_units + 1,
+            }
+            for i in range(n_users)
+        ],
+    )
+    conn.execute(
+        insert(Channel),
+        [
+            {"name": f"channel-{i}", "created_by": i % n_users + 1}
+            for i in range(n_channels)
+        ],
+    )
+    members = {
+        (rnd.randint(1, n_channels), rnd.randint(1, n_users))
+        for _ in range(n_channels * 20)
+    }
+    conn.execute(
+        insert(ChannelMember),
+        [{"channel_id": c, "user_id": u} for c, u in members],
+    )
+    conn.execute(
+        insert(Message),
+        [
+            {
+                "channel_id": rnd.randint(1, n_channels),
+                "user_id": rnd.randint(1, n_users),
+                "content": "message",
+                "created_at": ts(i),
+            }
+            for i in range(n_messages)
+        ],
+    )
+    conn.execute(
+        insert(EmailAccount),
+        [
+            {"user_id": i + 1, "email_address": f"user{i}@example.com"}
+            for i in range(n_users)
+        ],
+    )
+    conn.execute(
+        insert(EmailMessage),
+        [
+            {
+                "account_id": rnd.randint(1, n_users),
+                "from_address": "sender@example.com",
+                "to_address": "user@example.com",
+                "subject": "Hello",
+                "body_text": "body " * 50,
+                "is_sent": rnd.random() < 0.2,
+                "is_deleted": rnd.random() < 0.1,
+                "is_spam": rnd.random() < 0.05,
+                "received_at": ts(i),
+            }
+            for i in range(n_emails)
+        ],
+    )
+    conn.execute(
+        insert(Task),
+        [
+            {
+                "issuer_id": rnd.randint(1, n_users),
+                "assignee_id": rnd.randint(1, n_users),
+                "title": "Task",
+                "description": "Do it",
+                "status": rnd.choice(list(TaskStatus)).value,
+                "deadline": ts(i),
+                "created_at": ts(i),
+            }
+            for i in range(n_tasks)
+        ],
+    )
+    conn.execute(
+        insert(Document),
+        [
+            {"title": "Doc", "file_path": "x", "owner_id": rnd.randint(1, n_users)}
+            for _ in range(n_docs)
+        ],
+    )
+    conn.execute(
+        insert(DocumentShare),
+        [
+            {
+                "document_id": rnd.randint(1, n_docs),
+                "recipient_id": rnd.randint(1, n_users),
+                "created_at": ts(i),
+            }
+            for i in range(n_shares)
+        ],
+    )
+    conn.execute(
+        insert(ArchiveFile),
+        [
+            {
+                "title": "File",
+                "file_path": "x",
+                "unit_id": rnd.randint(1, n_units),
+                "owner_id": rnd.randint(1, n_users),
+                "folder_id": None,
+                "is_private": rnd.random() < 0.2,
+                "created_at": ts(i),
+            }
+            for i in range(n_files)
+        ],
+    )
+    return {"users": n_users, "channels": n_channels, "units": n_units}
+
+
+def queries(sizes: dict):
+    """(label, statement factory taking a Random) pairs"""
+    return [
+        (
+            "channel history by id",
+            lambda r: select(Message)
+            .where(Message.channel_id == r.randint(1, sizes["channels"]))
+            .order_by(Message.id.desc())
+            .limit(50),
+        ),
+        (
+            "channel history by date",
+            lambda r: select(Message)
+            .where(Message.channel_id == r.randint(1, sizes["channels"]))
+            .order_by(Message.created_at.desc())
+            .limit(50),
+        ),
+        (
+            "my channels",
+            lambda r: select(ChannelMember.channel_id).where(
+                ChannelMember.user_id == r.randint(1, sizes["users"])
+            ),
+        ),
+        (
+            "inbox",
+            lambda r: select(EmailMessage)
+            .where(
+                and_(
+                    EmailMessage.account_id == r.randint(1, sizes["users"]),
+                    EmailMessage.is_sent == False,
+                    EmailMessage.is_deleted == False,
+                    EmailMessage.is_spam == False,
+                    EmailMessage.folder_id.is_(None),
+                )
+            )
+            .order_by(desc(EmailMessage.received_at))
+            .limit(50),
+        ),
+        (
+            "trash",
+            lambda r: select(EmailMessage)
+            .where(
+                and_(
+                    EmailMessage.account_id == r.randint(1, sizes["users"]),
+                    EmailMessage.is_deleted == True,
+                )
+            )
+            .order_by(desc(EmailMessage.received_at))
+            .limit(50),
+        ),
+        (
+            "received tasks",
+            lambda r: select(Task)
+            .where(
+                Task.assignee_id == r.randint(1, sizes["users"]),
+                Task.status.in_(
+                    [TaskStatus.IN_PROGRESS, TaskStatus.OVERDUE, TaskStatus.ON_REVIEW]
+                ),
+            )
+            .order_by(Task.created_at.desc()),
+        ),
+        (
+            "shared with me",
+            lambda r: select(DocumentShare)
+            .where(DocumentShare.recipient_id == r.randint(1, sizes["users"]))
+            .order_by(DocumentShare.created_at.desc())
+            .limit(50),
+        ),
+        (
+            "archive folder",
+            lambda r: select(ArchiveFile)
+            .where(
+                ArchiveFile.unit_id == r.randint(1, sizes["units"]),
+                ArchiveFile.folder_id.is_(None),
+                ArchiveFile.is_private == False,
+            )
+            .order_by(ArchiveFile.created_at.desc())
+            .limit(100),
+        ),
+    ]
+
+
+def measure(conn, make_stmt, runs: int):
+    rnd = random.Random(7)
+    plan_stmt = make_stmt(rnd)
+    compiled = plan_stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    plan = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    start = time.perf_counter()
+    for _ in range(runs):
+        conn.execute(make_stmt(rnd)).fetchall()
+    elapsed = (time.perf_counter() - start) / runs
+    return elapsed, " / ".join(row[-1] for row in plan)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        with engine.begin() as conn:
+            Base.metadata.create_all(conn)
+            print("Seeding...")
+            sizes = seed(conn, args.scale)
+            conn.execute(text("ANALYZE"))
+
+        results = {}
+        with engine.connect() as conn:
+            definitions = {
+                name: conn.execute(
+                    text("SELECT sql FROM sqlite_master WHERE name = :n"), {"n": name}
+                ).scalar_one()
+                for _table, name in NEW_INDEXES
+            }
+            for name in definitions:
+                conn.execute(text(f"DROP INDEX {name}"))
+            conn.execute(text("ANALYZE"))
+            for label, make_stmt in queries(sizes):
+                results[label] = [measure(conn, make_stmt, args.runs)]
+
+            for sql in definitions.values():
+                conn.execute(text(sql))
+            conn.execute(text("ANALYZE"))
+            for label, make_stmt in queries(sizes):
+                results[label].append(measure(conn, make_stmt, args.runs))
+            conn.commit()
+        engine.dispose()
+
+    for label, ((before, plan_before), (after, plan_after)) in results.items():
+        print(f"\n{label}")
+        print(f"  before {before * 1000:8.3f} ms  {plan_before}")
+        print(f"  after  {after * 1000:8.3f} ms  {plan_after}")
+        print(f"  speedup x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Load test: does logging block the event loop?
+
+Runs many concurrent "request" coroutines that each log a few records,
+while a monitor task measures event-loop lag (how late a 1 ms sleep
+wakes up). The output handler simulates a slow sink (default 2 ms per
+write, e.g. a blocked stdout pipe or a busy disk).
+
+- direct: StreamHandler on the logger, writes happen in the loop thread
+- queued: the app pipeline (ContextQueueHandler -> QueueListener thread)
+
+Run from the backend directory:
+    python -m scripts.bench_logging [--requests 2000] [--write-ms 2]
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import logging.handlers
+import os
+import queue
+import statistics
+import sys
+import time
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.logging_setup import ContextQueueHandler, JsonFormatter
+from app.core.middleware import new_request_id, request_id
+
+
+class SlowStreamHandler(logging.StreamHandler):
+    def __init__(self, write_seconds: float) -> None:
+        super().__init__(io.StringIO())
+        self.write_seconds = write_seconds
+        self.setFormatter(JsonFormatter())
+
+    def emit(self, record: logging.LogRecord) -> None:
+        time.sleep(self.write_seconds)
+        super().emit(record)
+
+
+async def monitor_lag(samples: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        samples.append(time.perf_counter() - started - 0.001)
+
+
+async def fake_request(log: logging.Logger, i: int) -> None:
+    token = request_id.set(new_request_id())
+    try:
+        log.info("request %d started", i)
+        await asyncio.sleep(0)
+        log.info("request %d loaded %d rows", i, i % 50)
+        await asyncio.sleep(0)
+        log.info("request %d done", i)
+    finally:
+        request_id.reset(token)
+
+
+async def run(mode: str, requests: int, concurrency: int, write_seconds: float):
+    log = logging.getLogger(f"bench.{mode}")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    sink = SlowStreamHandler(write_seconds)
+    listener = None
+    if mode == "queued":
+        log_queue = queue.SimpleQueue()
+        log.handlers = [ContextQueueHandler(log_queue)]
+        listener = logging.handlers.QueueListener(log_queue, sink)
+        listener.start()
+    else:
+        log.handlers = [sink]
+
+    samples: list = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(samples, stop))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(i):
+        async with semaphore:
+            await fake_request(log, i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+    if listener:
+        listener.stop()
+
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0.0
+    return {
+        "req_per_s": requests / elapsed,
+        "lag_median_ms": statistics.median(samples) * 1000 if samples else 0.0,
+        "lag_p99_ms": p99 * 1000,
+        "lag_max_ms": samples[-1] * 1000 if samples else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--write-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    for mode in ("direct", "queued"):
+        result = await run(mode, args.requests, args.concurrency, args.write_ms / 1000)
+        print(
+            f"{mode:7} {result['req_per_s']:9.0f} req/s   loop lag "
+            f"median {result['lag_median_ms']:7.2f} ms   "
+            f"p99 {result['lag_p99_ms']:7.2f} ms   "
+            f"max {result['lag_max_ms']:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,254 @@
+"""
+Benchmark incoming mail ingestion over SMTP.
+
+Starts the internal SMTP server against a throwaway SQLite database and
+sends messages (HTML body + attachment, several internal recipients)
+from concurrent clients in a separate process. Reports:
+
+- accepted: messages/s as seen by senders (time until every 250 reply)
+  and the median / p95 SMTP transaction time (how long a session is held)
+- processed: messages/s until every message is stored in the database
+
+Modes:
+- inline: the previous handler, which parsed and stored the message
+  before replying
+- spool: the message is spooled to disk, then workers process it
+
+Run from the backend directory:
+    python -m scripts.bench_mail_ingest [--messages 300] [--recipients 10]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import secrets
+import socket
+import sys
+import tempfile
+import time
+from email.message import EmailMessage as MimeMessage
+
+# Throwaway database and spool; must be set before app settings load
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP.name}/bench.db"
+os.environ["EMAIL_SPOOL_DIR"] = os.path.join(_TMP.name, "spool")
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Attachments are written relative to the working directory
+os.chdir(_TMP.name)
+
+from aiosmtpd.controller import Controller
+from sqlalchemy import func, insert, select
+
+from app.core.config import get_settings
+from app.core.database import dispose_engines, engine, init_db
+from app.modules.auth.models import User
+from app.modules.email.models import EmailAccount, EmailMessage
+from app.modules.email.smtp_server import SMTPServerManager
+from app.modules.email.spool import MailSpool, process_spooled_email
+
+settings = get_settings()
+
+
+class InlineHandler:
+    """The handler before spooling: process, then reply"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        # Process on the loop that owns the database pool
+        self.loop = loop
+
+    async def handle_DATA(self, server, session, envelope):
+        future = asyncio.run_coroutine_threadsafe(
+            process_spooled_email(
+                envelope.mail_from, envelope.rcpt_tos, io.BytesIO(envelope.content)
+            ),
+            self.loop,
+        )
+        await asyncio.wrap_future(future)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_message(recipients, attachment_kb: int) -> bytes:
+    msg = MimeMessage()
+    msg["From"] = "sender@external.com"
+    msg["To"] = ", ".join(recipients)
+    msg["Subject"] = "Quarterly report"
+    msg.set_content("Plain text body\n" * 50)
+    msg.add_alternative(
+        "<html><body>"
+        + "<p style='color: red'>Report <b>body</b> <script>x()</script></p>" * 200
+        + "</body></html>",
+        subtype="html",
+    )
+    msg.add_attachment(
+        os.urandom(attachment_kb * 1024),
+        maintype="application",
+        subtype="octet-stream",
+        filename="report.pdf",
+    )
+    return msg.as_bytes()
+
+
+async def seed(users: int) -> list:
+    domain = settings.internal_email_domain
+    await init_db()
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "username": f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "hashed_password": "x",
+                }
+                for i in range(users)
+            ],
+        )
+        await conn.execute(
+            insert(EmailAccount),
+            [
+                {"user_id": i + 1, "email_address": f"user{i}@{domain}"}
+                for i in range(users)
+            ],
+        )
+    return [f"user{i}@{domain}" for i in range(users)]
+
+
+# Senders run in a separate process so they don't compete with the server
+SENDER = """
+import asyncio, sys, time
+import aiosmtplib
+
+port, path, messages, concurrency = sys.argv[1], sys.argv[2], *map(int, sys.argv[3:5])
+recipients = sys.argv[5].split(",")
+raw = open(path, "rb").read()
+latencies = []
+
+async def client(queue):
+    while not queue.empty():
+        queue.get_nowait()
+        sent = time.perf_counter()
+        await aiosmtplib.send(raw, sender="sender@external.com", recipients=recipients,
+                              hostname="127.0.0.1", port=int(port), timeout=120)
+        latencies.append(time.perf_counter() - sent)
+
+async def main():
+    queue = asyncio.Queue()
+    for _ in range(messages):
+        queue.put_nowait(None)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(queue) for _ in range(concurrency)))
+    latencies.sort()
+    print(time.perf_counter() - started, latencies[len(latencies) // 2],
+          latencies[int(len(latencies) * 0.95) - 1])
+
+asyncio.run(main())
+"""
+
+
+async def send_all(port, raw_path, recipients, messages, concurrency) -> tuple:
+    """(elapsed, p50, p95) seconds for sending every message"""
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        SENDER,
+        str(port),
+        raw_path,
+        str(messages),
+        str(concurrency),
+        ",".join(recipients),
+        stdout=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError("Sender process failed")
+    elapsed, p50, p95 = map(float, stdout.split())
+    return elapsed, p50, p95
+
+
+async def stored_count() -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count(EmailMessage.id)))).scalar_one()
+
+
+async def run(mode, raw_path, recipients, messages, concurrency) -> tuple:
+    before = await stored_count()
+    port = free_port()
+    started = time.perf_counter()
+    if mode == "inline":
+        controller = Controller(
+            InlineHandler(asyncio.get_running_loop()), hostname="127.0.0.1", port=port
+        )
+        controller.start()
+        try:
+            accepted, p50, p95 = await send_all(
+                port, raw_path, recipients, messages, concurrency
+            )
+        finally:
+            controller.stop()
+        processed = time.perf_counter() - started
+    else:
+        spool = MailSpool(
+            settings.email_spool_dir, workers=settings.email_spool_workers
+        )
+        server = SMTPServerManager(hostname="127.0.0.1", port=port, spool=spool)
+        await server.start()
+        try:
+            accepted, p50, p95 = await send_all(
+                port, raw_path, recipients, messages, concurrency
+            )
+            await spool.drain()
+            processed = time.perf_counter() - started
+        finally:
+            await server.stop()
+    stored = await stored_count() - before
+    return messages / accepted, messages / processed, stored, p50, p95
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--recipients", type=int, default=10)
+    parser.add_argument("--attachment-kb", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--modes", default="inline,spool")
+    args = parser.parse_args()
+
+    try:
+        addresses = await seed(args.recipients)
+        raw = build_message(addresses, args.attachment_kb)
+        raw_path = os.path.join(_TMP.name, "message.eml")
+        with open(raw_path, "wb") as f:
+            f.write(raw)
+        print(
+            f"{args.messages} messages x {args.recipients} recipients, "
+            f"{len(raw) // 1024} KiB each, concurrency {args.concurrency}"
+        )
+        for mode in args.modes.split(","):
+            accepted, processed, stored, p50, p95 = await run(
+                mode, raw_path, addresses, args.messages, args.concurrency
+            )
+            print(
+                f"{mode:7} accepted {accepted:7.1f} msg/s "
+                f"(session p50 {p50 * 1000:6.1f} ms, p95 {p95 * 1000:6.1f} ms)   "
+                f"processed {processed:7.1f} msg/s   ({stored} mailbox rows)"
+            )
+    finally:
+        await dispose_engines()
+        _TMP.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,151 @@
+"""
+Benchmark the mailbox list (GET /email/messages) with large bodies.
+
+Seeds a throwaway SQLite database with one account holding --messages
+inbox messages whose HTML bodies are --body-kb each, then times one page
+of --limit rows:
+
+- full rows: EmailMessage entities with attachments, snippet computed
+  from the body per row (the previous query)
+- projection: get_emails, list columns only
+- deep page by offset vs keyset (before_received_at / before_id) at
+  --depth rows into the mailbox
+
+Run from the backend directory:
+    python -m scripts.bench_mailbox_list [--messages 5000] [--body-kb 100]
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Throwaway database; must be set before app settings load
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP.name}/bench.db"
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import desc, insert, select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import AsyncSessionLocal, dispose_engines, engine, init_db
+from app.modules.auth.models import User
+from app.modules.email import service
+from app.modules.email.models import EmailAccount, EmailMessage, make_snippet
+
+
+async def seed(messages: int, body_kb: int) -> int:
+    await init_db()
+    body = "<p>Quarterly report <b>body</b></p>" * (body_kb * 1024 // 34)
+    started = datetime(2026, 1, 1)
+    async with engine.begin() as conn:
+        user_id = (
+            await conn.execute(
+                insert(User).values(
+                    username="bench", email="bench@example.com", hashed_password="x"
+                )
+            )
+        ).inserted_primary_key[0]
+        account_id = (
+            await conn.execute(
+                insert(EmailAccount).values(
+                    user_id=user_id, email_address="bench@example.com"
+                )
+            )
+        ).inserted_primary_key[0]
+        rows = [
+            {
+                "account_id": account_id,
+                "subject": f"Message {i}",
+                "from_address": "sender@external.com",
+                "to_address": "bench@example.com",
+                "body_html": body,
+                "snippet": make_snippet(None, body),
+                "received_at": started + timedelta(seconds=i),
+            }
+            for i in range(messages)
+        ]
+        for start in range(0, len(rows), 500):
+            await conn.execute(insert(EmailMessage), rows[start : start + 500])
+    return account_id
+
+
+async def full_rows(db, account_id: int, skip: int, limit: int) -> None:
+    stmt = (
+        select(EmailMessage)
+        .where(
+            EmailMessage.account_id == account_id,
+            EmailMessage.is_sent == False,
+            EmailMessage.is_deleted == False,
+            EmailMessage.is_spam == False,
+            EmailMessage.folder_id.is_(None),
+        )
+        .order_by(desc(EmailMessage.received_at))
+        .offset(skip)
+        .limit(limit)
+        .options(selectinload(EmailMessage.attachments))
+    )
+    for message in (await db.execute(stmt)).scalars():
+        make_snippet(message.body_text, message.body_html)
+        len(message.attachments)
+
+
+async def measure(name: str, func, repeat: int = 20) -> None:
+    async with AsyncSessionLocal() as db:
+        await func(db)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await func(db)
+            db.expunge_all()
+        elapsed = time.perf_counter() - started
+    print(f"{name:22} {elapsed / repeat * 1000:8.2f} ms per page")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--body-kb", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=4000)
+    args = parser.parse_args()
+
+    account_id = await seed(args.messages, args.body_kb)
+    limit = args.limit
+    try:
+        await measure(
+            "full rows, first page", lambda db: full_rows(db, account_id, 0, limit)
+        )
+        await measure(
+            "projection, first page",
+            lambda db: service.get_emails(db, account_id, "inbox", 0, limit),
+        )
+
+        async with AsyncSessionLocal() as db:
+            rows = await service.get_emails(db, account_id, "inbox", args.depth - 1, 1)
+        anchor = rows[0]
+        await measure(
+            "offset, deep page",
+            lambda db: service.get_emails(db, account_id, "inbox", args.depth, limit),
+        )
+        await measure(
+            "keyset, deep page",
+            lambda db: service.get_emails(
+                db, account_id, "inbox", 0, limit, anchor.received_at, anchor.id
+            ),
+        )
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Benchmark the mailbox sidebar counts (GET /email/stats + /email/unread-count).
+
+Seeds a throwaway SQLite database with one account holding --messages
+messages with mixed flags and times one stats + unread-count poll:
+
+- per-bucket: one COUNT query per folder/bucket (the previous queries)
+- aggregate: one conditional-aggregation query
+- counters: the email_counters row (EMAIL_STATS_COUNTERS=true)
+
+Run from the backend directory:
+    python -m scripts.bench_mailbox_stats [--messages 50000] [--polls 200]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import secrets
+import sys
+import tempfile
+import time
+
+# Throwaway database; must be set before app settings load
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP.name}/bench.db"
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import AsyncSessionLocal, dispose_engines, engine, init_db
+from app.modules.auth.models import User
+from app.modules.email import service, stats
+from app.modules.email.models import EmailAccount, EmailMessage
+
+
+async def seed(messages: int) -> int:
+    await init_db()
+    rng = random.Random(0)
+    async with engine.begin() as conn:
+        user_id = (
+            await conn.execute(
+                insert(User).values(
+                    username="bench", email="bench@example.com", hashed_password="x"
+                )
+            )
+        ).inserted_primary_key[0]
+        account_id = (
+            await conn.execute(
+                insert(EmailAccount).values(
+                    user_id=user_id, email_address="bench@example.com"
+                )
+            )
+        ).inserted_primary_key[0]
+        rows = [
+            {
+                "account_id": account_id,
+                "subject": f"Message {i}",
+                "from_address": "sender@external.com",
+                "to_address": "bench@example.com",
+                "is_sent": rng.random() < 0.2,
+                "is_read": rng.random() < 0.7,
+                "is_deleted": rng.random() < 0.1,
+                "is_spam": rng.random() < 0.05,
+                "is_starred": rng.random() < 0.05,
+                "is_archived": rng.random() < 0.1,
+                "is_important": rng.random() < 0.05,
+            }
+            for i in range(messages)
+        ]
+        for start in range(0, len(rows), 5000):
+            await conn.execute(insert(EmailMessage), rows[start : start + 5000])
+    return account_id
+
+
+async def per_bucket(db, account_id: int) -> None:
+    for required in stats.BUCKETS.values():
+        await db.scalar(
+            select(func.count(EmailMessage.id)).where(
+                EmailMessage.account_id == account_id, stats._condition(required)
+            )
+        )
+
+
+async def poll(db, account_id: int) -> None:
+    await service.get_email_stats(db, account_id)
+    await service.get_unread_count(db, account_id)
+
+
+async def measure(name: str, func, account_id: int, polls: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await func(db, account_id)  # warm up (and build the counters row)
+        started = time.perf_counter()
+        for _ in range(polls):
+            await func(db, account_id)
+        elapsed = time.perf_counter() - started
+    print(f"{name:12} {elapsed / polls * 1000:8.2f} ms per poll")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--polls", type=int, default=200)
+    args = parser.parse_args()
+
+    account_id = await seed(args.messages)
+    try:
+        await measure("per-bucket", per_bucket, account_id, args.polls)
+        stats.counters_enabled = False
+        await measure("aggregate", poll, account_id, args.polls)
+        stats.counters_enabled = True
+        await measure("counters", poll, account_id, args.polls)
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
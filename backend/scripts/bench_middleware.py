@@ -0,0 +1,176 @@
+"""
+Benchmark the request middleware: BaseHTTPMiddleware stack vs pure ASGI.
+
+Drives a small FastAPI app directly through the ASGI interface (no socket,
+no HTTP client overhead), so the numbers isolate the middleware cost:
+
+- legacy: the previous LoggingMiddleware + RequestIDMiddleware +
+  SecurityHeadersMiddleware (BaseHTTPMiddleware subclasses, print per request)
+- asgi: RequestContextMiddleware
+
+Routes: GET /api/health (small JSON) and GET /api/files/download (FileResponse).
+
+Run from the backend directory:
+    python -m scripts.bench_middleware [--requests 5000] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi import FastAPI
+from fastapi.responses import FileResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.middleware import RequestContextMiddleware
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        print(f"Incoming request: {request.method} {request.url.path}")
+        return await call_next(request)
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = str(uuid4())
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        response.headers["Permissions-Policy"] = (
+            "geolocation=(), microphone=(), camera=(), payment=(), usb=(), "
+            "magnetometer=(), gyroscope=(), accelerometer=()"
+        )
+        if request.url.path.startswith("/api"):
+            response.headers["Content-Security-Policy"] = (
+                "default-src 'none'; frame-ancestors 'none'"
+            )
+        return response
+
+
+def build_app(stack: str, download_path: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/health")
+    async def health():
+        return {"status": "healthy", "database": {"status": "connected"}}
+
+    @app.get("/api/files/download")
+    async def download():
+        return FileResponse(download_path, filename="report.bin")
+
+    if stack == "legacy":
+        app.add_middleware(LegacyLoggingMiddleware)
+        app.add_middleware(LegacyRequestIDMiddleware)
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+    else:
+        app.add_middleware(RequestContextMiddleware, sample_rate=0.01)
+    return app
+
+
+async def call(app, path: str) -> int:
+    """Run one GET through the ASGI app, return the number of body bytes"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    sent = False
+    received = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return received
+
+
+async def run(app, path: str, requests: int, concurrency: int) -> float:
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            await call(app, path)
+
+    # Warm up routing, middleware stack construction and file cache
+    for _ in range(50):
+        await call(app, path)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--file-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        download_path = os.path.join(tmp, "report.bin")
+        with open(download_path, "wb") as f:
+            f.write(os.urandom(args.file_kb * 1024))
+
+        results = {}
+        for stack in ("legacy", "asgi"):
+            app = build_app(stack, download_path)
+            # The legacy stack prints every request; keep it off the terminal
+            with contextlib.redirect_stdout(io.StringIO()):
+                for label, path, n in (
+                    ("/api/health", "/api/health", args.requests),
+                    ("download", "/api/files/download", args.requests // 5),
+                ):
+                    results[(stack, label)] = await run(app, path, n, args.concurrency)
+
+    for label in ("/api/health", "download"):
+        legacy = results[("legacy", label)]
+        asgi = results[("asgi", label)]
+        print(
+            f"{label:12} legacy {legacy:8.0f} req/s   asgi {asgi:8.0f} req/s   "
+            f"x{asgi / legacy:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""
+Benchmark parsing of large incoming messages: full tree vs streaming.
+
+Builds a message with a text/HTML body and one large attachment, writes it
+to a file (as the mail spool does) and parses it:
+
+- stdlib: message_from_bytes on the whole file, then decode every
+  attachment (the previous path)
+- streaming: StreamingMimeParser reading the file in chunks, attachments
+  decoded to temporary files
+
+Reports wall time and peak Python heap (tracemalloc), with an attachment
+under and over the size limit.
+
+Run from the backend directory:
+    python -m scripts.bench_mime_parse [--attachment-mb 20] [--limit-mb 10]
+"""
+
+import argparse
+import email
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from email.message import EmailMessage as MimeMessage
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.modules.email.mime_stream import parse_message
+
+
+def build_message(attachment_mb: int) -> bytes:
+    msg = MimeMessage()
+    msg["From"] = "sender@external.com"
+    msg["To"] = "user@example.com"
+    msg["Subject"] = "Large attachment"
+    msg.set_content("Plain text body\n" * 50)
+    msg.add_alternative("<p>HTML body</p>" * 200, subtype="html")
+    msg.add_attachment(
+        os.urandom(attachment_mb * 1024 * 1024),
+        maintype="application",
+        subtype="octet-stream",
+        filename="archive.zip",
+    )
+    return msg.as_bytes()
+
+
+def stdlib(path: str, tmp: str, limit: int) -> None:
+    with open(path, "rb") as f:
+        msg = email.message_from_bytes(f.read())
+    for part in msg.walk():
+        if part.get_filename():
+            content = part.get_payload(decode=True)
+            if len(content) <= limit:
+                with open(os.path.join(tmp, "attachment"), "wb") as out:
+                    out.write(content)
+
+
+def streaming(path: str, tmp: str, limit: int) -> None:
+    with open(path, "rb") as f:
+        parsed = parse_message(f, tmp, limit, limit * 2)
+    parsed.discard()
+
+
+def measure(func, *args) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attachment-mb", type=int, default=20)
+    parser.add_argument("--limit-mb", type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "message.eml")
+        with open(path, "wb") as f:
+            f.write(build_message(args.attachment_mb))
+        size_mb = os.path.getsize(path) / 1024 / 1024
+
+        for label, limit_mb in (
+            ("within limit", args.limit_mb),
+            ("over limit", args.attachment_mb // 2),
+        ):
+            print(
+                f"{size_mb:.1f} MiB message, {args.attachment_mb} MiB attachment, "
+                f"limit {limit_mb} MiB ({label})"
+            )
+            for name, func in (("stdlib", stdlib), ("streaming", streaming)):
+                elapsed, peak = measure(func, path, tmp, limit_mb * 1024 * 1024)
+                print(
+                    f"  {name:10} {elapsed * 1000:8.1f} ms   "
+                    f"peak heap {peak / 1024 / 1024:8.1f} MiB"
+                )
+
+
+if __name__ == "__main__":
+    main()
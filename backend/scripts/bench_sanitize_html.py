@@ -0,0 +1,156 @@
+"""
+Benchmark sanitizing incoming HTML bodies.
+
+Uses the HTML mails in scripts/email_corpus (newsletter, receipt, Outlook
+reply thread, code review notification; or --corpus DIR with your own
+.html files) and times:
+
+- per call: bleach.clean with a new CSSSanitizer per body (the previous
+  sanitize_html)
+- cleaner: the sanitizer's reused bleach Cleaner, no cache
+- newsletter fan-out: one body delivered --deliveries times (one SMTP
+  transaction per recipient) through sanitize_html with the hash cache
+- large bodies: --large bodies of --large-kb each cleaned concurrently by
+  sanitize_html_async, in-process vs the process pool, with the worst
+  event-loop stall seen meanwhile
+
+Run from the backend directory:
+    python -m scripts.bench_sanitize_html [--repeat 50] [--large-kb 512]
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import secrets
+import sys
+import time
+
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.modules.email import sanitizer
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "email_corpus")
+
+
+def load_corpus(directory: str) -> dict:
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            corpus[os.path.basename(path)] = f.read()
+    if not corpus:
+        sys.exit(f"No .html files in {directory}")
+    return corpus
+
+
+def clean_per_call(html: str) -> str:
+    import bleach
+    from bleach.css_sanitizer import CSSSanitizer
+
+    return bleach.clean(
+        html,
+        tags=sanitizer.ALLOWED_TAGS,
+        attributes=sanitizer.ALLOWED_ATTRIBUTES,
+        css_sanitizer=CSSSanitizer(allowed_css_properties=sanitizer.ALLOWED_STYLES),
+        strip=True,
+    )
+
+
+def time_per_body(func, html: str, repeat: int) -> float:
+    func(html)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def clean_concurrently(bodies: list) -> tuple:
+    """Wall time for all bodies and the longest event-loop stall meanwhile"""
+    stall = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal stall
+        while running:
+            tick = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - tick)
+
+    watcher = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(sanitizer.sanitize_html_async(html) for html in bodies))
+    elapsed = time.perf_counter() - started
+    running = False
+    await watcher
+    return elapsed * 1000, stall * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--deliveries", type=int, default=200)
+    parser.add_argument("--large", type=int, default=8)
+    parser.add_argument("--large-kb", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print(f"{'body':22} {'size':>8} {'per call':>10} {'cleaner':>10}")
+    for name, html in corpus.items():
+        per_call = time_per_body(clean_per_call, html, args.repeat)
+        cleaner = time_per_body(sanitizer.clean_html, html, args.repeat)
+        print(
+            f"{name:22} {len(html):8} {per_call:8.2f}ms {cleaner:8.2f}ms "
+            f"({per_call / cleaner:.1f}x)"
+        )
+
+    newsletter = corpus.get("newsletter.html", next(iter(corpus.values())))
+    sanitizer.sanitized_cache.clear()
+    started = time.perf_counter()
+    for _ in range(args.deliveries):
+        clean_per_call(newsletter)
+    uncached = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for _ in range(args.deliveries):
+        sanitizer.sanitize_html(newsletter)
+    cached = (time.perf_counter() - started) * 1000
+    print(
+        f"\nnewsletter x {args.deliveries}: per call {uncached:.1f} ms, "
+        f"cached {cached:.1f} ms"
+    )
+
+    # Distinct large bodies (a unique comment each, so the cache can't help)
+    base = "".join(corpus.values())
+    copies = max(1, args.large_kb * 1024 // len(base))
+    bodies = [f"<!-- {i} -->" + base * copies for i in range(args.large)]
+    settings = sanitizer.settings
+    settings.email_sanitize_process_bytes = 65536
+    print(f"\n{args.large} bodies of {len(bodies[0]) // 1024} KiB:")
+    for workers in (0, args.workers):
+        settings.email_sanitize_workers = workers
+        sanitizer.sanitized_cache.clear()
+        if workers:
+            # Start the workers outside the timing
+            await asyncio.gather(
+                *(
+                    sanitizer.sanitize_html_async(f"<p>warm up {i}</p>" * 10000)
+                    for i in range(workers)
+                )
+            )
+            sanitizer.sanitized_cache.clear()
+        elapsed, stall = await clean_concurrently(bodies)
+        label = f"pool, {workers} workers" if workers else "in-process"
+        print(f"{label:22} {elapsed:9.1f} ms, longest loop stall {stall:7.1f} ms")
+    sanitizer.shutdown_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""
+Benchmark the send-email request path against a slow relay.
+
+Uses a throwaway SQLite database and a local aiosmtpd relay that takes
+--relay-ms to accept each message. Sends --messages emails with an
+attachment through the email service and reports the median / p95 time
+until send_email returns (what the HTTP caller waits for):
+
+- inline: send_email followed by delivery in the same call (the previous
+  path, which waited for the relay before responding)
+- queued: send_email only; outbox workers deliver in the background.
+  Also reports the time until every message is delivered.
+
+Run from the backend directory:
+    python -m scripts.bench_send_email [--messages 50] [--relay-ms 200]
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+# Throwaway database; must be set before app settings load
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP.name}/bench.db"
+os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Attachments are written relative to the working directory
+os.chdir(_TMP.name)
+
+from aiosmtpd.controller import Controller
+
+from app.core.database import AsyncSessionLocal, dispose_engines, init_db
+from app.modules.auth.models import User
+from app.modules.email import service
+from app.modules.email.models import EmailAccount
+from app.modules.email.outbox import outbox
+from app.modules.email.schemas import EmailMessageCreate
+
+
+class SlowRelay:
+    def __init__(self, delay_seconds: float) -> None:
+        self.delay_seconds = delay_seconds
+        self.delivered = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay_seconds)
+        self.delivered += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def seed() -> int:
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        user = User(username="sender", email="sender@example.com", hashed_password="x")
+        db.add(user)
+        await db.flush()
+        account = EmailAccount(user_id=user.id, email_address="sender@example.com")
+        db.add(account)
+        await db.commit()
+        return account.id
+
+
+async def send(account_id: int, i: int, inline: bool) -> float:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        message = await service.send_email(
+            db,
+            account_id,
+            EmailMessageCreate(
+                subject=f"Report {i}",
+                to_address="someone@external.com",
+                body_text="Quarterly report attached\n" * 20,
+            ),
+            files=[(f"report-{i}.pdf", os.urandom(200 * 1024), "application/pdf")],
+        )
+        if inline:
+            await service.deliver_email(db, message.id)
+    return time.perf_counter() - started
+
+
+def report(name: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{name:8} response p50 {statistics.median(latencies) * 1000:8.1f} ms   "
+        f"p95 {p95 * 1000:8.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--relay-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    relay = SlowRelay(args.relay_ms / 1000)
+    controller = Controller(relay, hostname="127.0.0.1", port=free_port())
+    controller.start()
+
+    async def relay_address(db):
+        return "127.0.0.1", controller.port
+
+    service.get_relay_address = relay_address
+    account_id = await seed()
+    try:
+        report(
+            "inline",
+            [await send(account_id, i, True) for i in range(args.messages)],
+        )
+
+        await outbox.start()
+        started = time.perf_counter()
+        latencies = [await send(account_id, i, False) for i in range(args.messages)]
+        report("queued", latencies)
+        await outbox.drain()
+        elapsed = time.perf_counter() - started
+        print(
+            f"{'':8} all {args.messages} delivered after {elapsed * 1000:.0f} ms "
+            f"({relay.delivered} total at relay)"
+        )
+        await outbox.stop()
+
+        async with AsyncSessionLocal() as db:
+            pending = await service.get_undelivered_message_ids(db)
+            assert not pending, pending
+    finally:
+        controller.stop()
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
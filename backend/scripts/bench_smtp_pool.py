@@ -0,0 +1,108 @@
+"""
+Benchmark outbound delivery: connection per message vs the SMTP pool.
+
+Starts a local aiosmtpd relay whose greeting/EHLO takes --handshake-ms
+(a remote relay's round trips and TLS setup) and delivers --messages
+notification emails:
+
+- per-message: aiosmtplib.SMTP opened and closed for every message (the
+  previous send_email / send_notification_email path)
+- pool: SMTPPool.send one after another (keep-alive)
+- pool batch: SMTPPool.send_many (SMTP_POOL_MAX_PER_HOST connections)
+
+Run from the backend directory:
+    python -m scripts.bench_smtp_pool [--messages 200] [--handshake-ms 20]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+from email.message import EmailMessage
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+
+from app.core.smtp_pool import SMTPPool
+
+
+class SlowHandshakeRelay:
+    def __init__(self, handshake_seconds: float) -> None:
+        self.handshake_seconds = handshake_seconds
+        self.delivered = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake_seconds)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_message(i: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@koordinator.local"
+    msg["To"] = f"user{i}@example.com"
+    msg["Subject"] = f"Task assigned #{i}"
+    msg.set_content("<p>You have a new task</p>", subtype="html")
+    return msg
+
+
+async def per_message(messages, port) -> None:
+    for msg in messages:
+        async with aiosmtplib.SMTP(hostname="127.0.0.1", port=port) as smtp:
+            await smtp.send_message(msg)
+
+
+async def pool_sequential(messages, port) -> None:
+    pool = SMTPPool()
+    for msg in messages:
+        await pool.send(msg, "127.0.0.1", port)
+    await pool.close()
+
+
+async def pool_batch(messages, port) -> None:
+    pool = SMTPPool()
+    await pool.send_many(messages, "127.0.0.1", port)
+    await pool.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    handler = SlowHandshakeRelay(args.handshake_ms / 1000)
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    messages = [build_message(i) for i in range(args.messages)]
+    try:
+        for name, func in (
+            ("per-message", per_message),
+            ("pool", pool_sequential),
+            ("pool batch", pool_batch),
+        ):
+            started = time.perf_counter()
+            await func(messages, controller.port)
+            elapsed = time.perf_counter() - started
+            print(f"{name:12} {args.messages / elapsed:8.1f} msg/s")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+"""
+Benchmark SQLite connection handling: NullPool vs pooled writer + readers.
+
+Each simulated request opens a session, runs a few indexed reads and
+(optionally) one insert + commit, mirroring a typical API call. NullPool
+reconnects and re-applies PRAGMAs per session; the pooled setup reuses
+warm connections (page cache, mmap) and serializes writes on one writer.
+
+Run from the backend directory:
+    python -m scripts.bench_sqlite_pool [--requests 2000] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base, RoutingSession, set_sqlite_pragma
+from app.modules.auth.models import User
+
+# Register every model so create_all can resolve foreign keys
+import app.modules.chat.models  # noqa: F401
+import app.modules.board.models  # noqa: F401
+import app.modules.archive.models  # noqa: F401
+import app.modules.admin.models  # noqa: F401
+import app.modules.tasks.models  # noqa: F401
+import app.modules.email.models  # noqa: F401
+
+
+def legacy_pragma(dbapi_connection, connection_record):
+    """PRAGMAs applied by the previous NullPool setup"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def make_nullpool(url: str):
+    engine = create_async_engine(url, poolclass=NullPool)
+    event.listen(engine.sync_engine, "connect", legacy_pragma)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return factory, [engine]
+
+
+def make_pooled(url: str, readers: int):
+    writer = create_async_engine(url, pool_size=1, max_overflow=0, pool_timeout=60)
+    reader = create_async_engine(url, pool_size=readers, max_overflow=readers)
+    for engine in (writer, reader):
+        event.listen(engine.sync_engine, "connect", set_sqlite_pragma)
+    factory = async_sessionmaker(
+        writer,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        reader=reader,
+        expire_on_commit=False,
+    )
+    return factory, [writer, reader]
+
+
+async def seed(url: str, users: int) -> None:
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        "username": f"user{i}",
+                        "email": f"user{i}@example.com",
+                        "hashed_password": "x",
+                        "full_name": f"User {i}",
+                    }
+                    for i in range(users)
+                ],
+            )
+    finally:
+        await engine.dispose()
+
+
+async def run(factory, requests: int, concurrency: int, write_every: int, users: int):
+    counter = iter(range(requests))
+    latencies = []
+
+    async def one_request(n: int) -> None:
+        start = time.perf_counter()
+        async with factory() as session:
+            for k in range(3):
+                await session.execute(
+                    select(User).where(User.id == (n + k) % users + 1)
+                )
+            if write_every and n % write_every == 0:
+                await session.execute(
+                    insert(User).values(
+                        username=f"bench{n}-{time.monotonic_ns()}",
+                        email=f"bench{n}-{time.monotonic_ns()}@example.com",
+                        hashed_password="x",
+                        full_name="Bench",
+                    )
+                )
+                await session.commit()
+        latencies.append(time.perf_counter() - start)
+
+    async def worker() -> None:
+        for n in counter:
+            await one_request(n)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument(
+        "--write-every", type=int, default=10, help="1 in N requests writes (0=none)"
+    )
+    args = parser.parse_args()
+
+    for label, make in (
+        ("NullPool", lambda url: make_nullpool(url)),
+        ("Pooled writer + readers", lambda url: make_pooled(url, args.readers)),
+    ):
+        for concurrency in (1, args.concurrency):
+            with tempfile.TemporaryDirectory() as tmp:
+                url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+                await seed(url, args.users)
+                factory, engines = make(url)
+                try:
+                    elapsed, lat = await run(
+                        factory,
+                        args.requests,
+                        concurrency,
+                        args.write_every,
+                        args.users,
+                    )
+                finally:
+                    for engine in engines:
+                        await engine.dispose()
+
+            p50 = lat[len(lat) // 2] * 1000
+            p99 = lat[int(len(lat) * 0.99)] * 1000
+            print(
+                f"{label:<24} c={concurrency:<3} {args.requests / elapsed:8.0f} req/s  "
+                f"p50 {p50:6.2f} ms  p99 {p99:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""
+Benchmark JWT verification cost per request.
+
+Simulates the frontend polling several endpoints at once with the same
+access token and compares a full jose.jwt.decode per call against the
+cached decode_access_token path.
+
+Run from the backend directory:
+    python -m scripts.bench_token_verification [--requests 20000] [--tokens 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add backend directory to sys.path so we can import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from jose import jwt
+
+from app.core.config import get_settings
+from app.core.security import create_access_token, decode_access_token, token_cache
+
+settings = get_settings()
+
+
+def bench(label: str, fn, tokens: list, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        fn(tokens[i % len(tokens)])
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / requests * 1_000_000
+    print(f"{label:<28} {requests:>8} calls  {per_call_us:8.2f} µs/call")
+    return per_call_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument(
+        "--tokens", type=int, default=50, help="distinct users/tokens in rotation"
+    )
+    args = parser.parse_args()
+
+    tokens = [create_access_token({"sub": uid}) for uid in range(1, args.tokens + 1)]
+
+    def full_decode(token: str) -> dict:
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+
+    token_cache.clear()
+    before = bench("jose.jwt.decode (before)", full_decode, tokens, args.requests)
+    token_cache.clear()
+    after = bench(
+        "decode_access_token (after)", decode_access_token, tokens, args.requests
+    )
+    print(f"Speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ import os
 # Add the backend directory to sys.path
 sys.path.append(os.path.join(os.getcwd(), "backend"))
 
-from app.core.database import AsyncSessionLocal, init_db
+from app.core.database import AsyncSessionLocal, dispose_engines, init_db
 from sqlalchemy import select
 from app.modules.auth.models import User
 
@@ -22,5 +22,12 @@ async def check_db_emails():
         print(f"----------------------")
 
 
+async def main():
+    try:
+        await check_db_emails()
+    finally:
+        await dispose_engines()
+
+
 if __name__ == "__main__":
-    asyncio.run(check_db_emails())
+    asyncio.run(main())
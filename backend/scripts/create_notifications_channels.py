@@ -16,7 +16,7 @@ load_dotenv(os.path.join(backend_dir, ".env"))
 # Add the backend directory to Python path
 sys.path.insert(0, backend_dir)
 
-from app.core.database import AsyncSessionLocal
+from app.core.database import AsyncSessionLocal, dispose_engines
 from app.modules.auth.service import UserService
 from app.modules.auth.models import User
 from sqlalchemy import select
@@ -46,5 +46,12 @@ async def create_notifications_channels():
         print("Done!")
 
 
+async def main():
+    try:
+        await create_notifications_channels()
+    finally:
+        await dispose_engines()
+
+
 if __name__ == "__main__":
-    asyncio.run(create_notifications_channels())
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Database Migration + Seeding Command
+
+Brings the schema to the latest Alembic revision (a fresh database gets
+create_all and is stamped at head), seeds default data, then records the
+schema fingerprint and seed version in schema_meta. Workers compare against
+these markers on startup and skip both steps when nothing changed.
+
+Run once per deploy, before starting workers (set AUTO_MIGRATE=false so
+workers only check the markers):
+    python -m scripts.migrate [--force] [--no-seed]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import dispose_engines, engine, init_db
+from app.core.models import SchemaMeta
+from scripts import seed_db
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+def alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return config
+
+
+async def upgrade_schema() -> None:
+    """
+    Apply pending Alembic migrations, then refresh the schema fingerprint.
+
+    The fingerprint is only written after `alembic upgrade head`, so an
+    upgraded database is never reported current while columns are missing.
+    """
+    async with engine.connect() as conn:
+        tables = set(await conn.run_sync(lambda c: inspect(c).get_table_names()))
+    config = alembic_config()
+
+    # env.py calls asyncio.run(), so Alembic commands run in a worker thread
+    if not tables - {SchemaMeta.__tablename__}:
+        await init_db(force=True)
+        await asyncio.to_thread(command.stamp, config, "head")
+        return
+
+    if "alembic_version" not in tables:
+        raise SystemExit(
+            "❌ Database has tables but no alembic_version. Stamp the revision "
+            "it matches (`alembic stamp <revision>`) and re-run this command."
+        )
+
+    await asyncio.to_thread(command.upgrade, config, "head")
+    # create_all only adds tables that no migration covers; the fingerprint
+    # is rewritten unconditionally because the upgrade may have changed it
+    await init_db(force=True)
+
+
+async def main(force: bool = False, seed: bool = True) -> None:
+    try:
+        await upgrade_schema()
+        print("✅ Database schema is at the latest revision")
+
+        if seed:
+            if not await seed_db.main(force=force):
+                print("⏭️  Seed data is up to date")
+    finally:
+        await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force", action="store_true", help="Re-seed even if the marker is current"
+    )
+    parser.add_argument("--no-seed", action="store_true", help="Skip seeding")
+    args = parser.parse_args()
+    asyncio.run(main(force=args.force, seed=not args.no_seed))
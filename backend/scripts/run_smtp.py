@@ -24,7 +24,7 @@ async def main():
     smtp_server = SMTPServerManager(hostname=smtp_host, port=smtp_port)
 
     logger.info(f"Starting standalone SMTP server on {smtp_host}:{smtp_port}...")
-    smtp_server.start()
+    await smtp_server.start()
 
     try:
         # Keep the script running
@@ -32,7 +32,7 @@ async def main():
             await asyncio.sleep(3600)
     except (KeyboardInterrupt, SystemExit):
         logger.info("Stopping SMTP server...")
-        smtp_server.stop()
+        await smtp_server.stop()
 
 
 if __name__ == "__main__":
@@ -21,15 +21,44 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func
 
-from app.core.database import AsyncSessionLocal
+from app.core.database import (
+    AsyncSessionLocal,
+    SEED_VERSION_KEY,
+    dispose_engines,
+    engine,
+    read_schema_meta,
+    write_schema_meta,
+)
 from app.core.models import SystemSetting
 from app.core.config import get_settings
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from app.modules.auth.models import User, Unit
 from app.modules.chat.models import ChannelMember
 
+# Register every model so relationship() strings resolve when run standalone
+import app.modules.admin.models  # noqa
+import app.modules.archive.models  # noqa
+import app.modules.board.models  # noqa
+import app.modules.email.models  # noqa
+import app.modules.tasks.models  # noqa
+import app.modules.zsspd.models  # noqa
+
 settings = get_settings()
 
+# Bump when seeded data changes so existing databases get re-seeded
+SEED_VERSION = 1
+
+
+def seed_marker() -> str:
+    """Seed version plus the settings that change what gets seeded"""
+    return f"{SEED_VERSION}:{settings.admin_username}:{settings.seed_test_data}"
+
+
+async def is_seeded() -> bool:
+    async with engine.connect() as conn:
+        meta = await read_schema_meta(conn)
+    return meta.get(SEED_VERSION_KEY) == seed_marker()
+
 
 async def cleanup_duplicate_channel_memberships(session: AsyncSession) -> None:
     """Remove duplicate channel memberships to allow UniqueConstraint"""
@@ -285,7 +314,7 @@ async def seed_initial_admin(session: AsyncSession, units_map: dict) -> None:
         admin_user = User(
             username=settings.admin_username,
             email=settings.admin_email,
-            hashed_password=get_password_hash(settings.admin_password),
+            hashed_password=await get_password_hash_async(settings.admin_password),
             full_name="Главный Администратор",
             role="admin",
             unit_id=unit_id,
@@ -374,7 +403,7 @@ async def seed_test_users(session: AsyncSession, units_map: dict) -> None:
             new_user = User(
                 username=u_data["username"],
                 email=u_data["email"],
-                hashed_password=get_password_hash(
+                hashed_password=await get_password_hash_async(
                     "test123"
                 ),  # Hardcoded is fine for TEST users
                 full_name=u_data["full_name"],
@@ -388,8 +417,16 @@ async def seed_test_users(session: AsyncSession, units_map: dict) -> None:
     await session.commit()
 
 
-async def main():
-    """Main seeding function"""
+async def main(force: bool = False) -> bool:
+    """
+    Main seeding function.
+
+    Skipped when the stored seed marker is current (warm boot).
+    Returns True if seeding ran.
+    """
+    if not force and await is_seeded():
+        return False
+
     print("🌱 Starting database seeding...")
 
     async with AsyncSessionLocal() as session:
@@ -408,6 +445,9 @@ async def main():
 
             await seed_test_users(session, units_map)
 
+            async with engine.begin() as conn:
+                await write_schema_meta(conn, SEED_VERSION_KEY, seed_marker())
+
             print("🎉 Database seeding completed successfully!")
         except Exception as e:
             await session.rollback()
@@ -420,7 +460,16 @@ async def main():
             else:
                 print(f"❌ Error during seeding: {e}")
             raise
+    return True
+
+
+async def run() -> None:
+    """Standalone entry point: seed, then close the pooled connections"""
+    try:
+        await main()
+    finally:
+        await dispose_engines()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run())
@@ -5,7 +5,7 @@ import os
 # Add backend directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.database import init_db, engine
+from app.core.database import dispose_engines, init_db, engine
 from sqlalchemy import text
 
 
@@ -25,5 +25,12 @@ async def verify():
             print(f"Columns found: {columns}")
 
 
+async def main():
+    try:
+        await verify()
+    finally:
+        await dispose_engines()
+
+
 if __name__ == "__main__":
-    asyncio.run(verify())
+    asyncio.run(main())
@@ -3,7 +3,7 @@ import pytest_asyncio
 import os
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_db_readonly
 from app.main import app
 from app.core.config import get_settings
 
@@ -66,6 +66,7 @@ async def client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_readonly] = override_get_db
 
     # Use ASGITransport for direct app testing without running server
     async with AsyncClient(
@@ -97,3 +98,23 @@ def disable_rate_limiting():
     app.dependency_overrides.pop(rate_limit_auth, None)
     app.dependency_overrides.pop(rate_limit_api, None)
     app.dependency_overrides.pop(rate_limit_file_upload, None)
+
+
+@pytest.fixture(autouse=True)
+def reset_settings_cache():
+    """Each test runs in its own rolled-back transaction, so drop the settings snapshot"""
+    from app.core.config_service import settings_cache
+
+    settings_cache.invalidate()
+    yield
+    settings_cache.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def reset_user_cache():
+    """User IDs are reused after rollback, so never carry cached users between tests"""
+    from app.modules.auth.cache import user_cache
+
+    user_cache.clear()
+    yield
+    user_cache.clear()
@@ -121,3 +121,49 @@ async def test_archive_file_upload_and_permissions(
         f"/api/archive/files/{file_id}/view", headers=headers_admin
     )
     assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_archive_batch_action_checks_every_source(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """Batch move/copy rejects missing items and another unit's items"""
+    headers_a, _, unit_a = await get_auth_headers(
+        client, db_session, "batchA", "Batch Unit A"
+    )
+    headers_b, _, unit_b = await get_auth_headers(
+        client, db_session, "batchB", "Batch Unit B"
+    )
+
+    response = await client.post(
+        "/api/archive/folders", headers=headers_a, json={"name": "A folder"}
+    )
+    folder_id = response.json()["id"]
+    response = await client.post(
+        "/api/archive/upload",
+        headers=headers_a,
+        data={"title": "A doc"},
+        files={"file": ("a.txt", b"unit a", "text/plain")},
+    )
+    file_id = response.json()["id"]
+
+    async def batch(headers, unit, item_ids, item_types):
+        return await client.post(
+            "/api/archive/batch-action",
+            headers=headers,
+            json={
+                "action": "copy",
+                "item_ids": item_ids,
+                "item_types": item_types,
+                "target_unit_id": unit.id,
+            },
+        )
+
+    response = await batch(headers_b, unit_b, [file_id], ["file"])
+    assert response.status_code == 403
+    response = await batch(headers_b, unit_b, [folder_id], ["folder"])
+    assert response.status_code == 403
+    response = await batch(headers_a, unit_a, [file_id, 999999], ["file", "file"])
+    assert response.status_code == 404
+    response = await batch(headers_a, unit_a, [file_id, folder_id], ["file", "folder"])
+    assert response.status_code == 200
@@ -108,3 +108,77 @@ async def test_get_me_protected(client: AsyncClient, db_session: AsyncSession):
     assert response.status_code == 200
     data = response.json()
     assert data["username"] == "meuser"
+
+
+@pytest.mark.asyncio
+async def test_current_user_cache_invalidated_on_block(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """Cached identity is reused, and blocking a user takes effect immediately"""
+    from app.modules.auth.cache import user_cache
+    from app.modules.auth.schemas import AdminUserUpdate
+    from app.modules.auth.service import UserService
+
+    user = User(
+        username="cacheduser",
+        email="cached@example.com",
+        hashed_password=get_password_hash("pass"),
+        is_active=True,
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    login_res = await client.post(
+        "/api/auth/login", data={"username": "cacheduser", "password": "pass"}
+    )
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    response = await client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 200
+
+    cached = await user_cache.get(user.id)
+    assert cached is not None
+    assert cached.username == "cacheduser"
+
+    response = await client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == "cacheduser"
+
+    await UserService.update_user_profile(
+        db_session, user.id, AdminUserUpdate(is_active=False)
+    )
+    assert await user_cache.get(user.id) is None
+
+    response = await client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_access_and_refresh_tokens(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """A logged-out access token is rejected even though it hasn't expired"""
+    user = User(
+        username="logoutuser",
+        email="logout@example.com",
+        hashed_password=get_password_hash("pass"),
+        is_active=True,
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    login_res = await client.post(
+        "/api/auth/login", data={"username": "logoutuser", "password": "pass"}
+    )
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+    refresh_token = login_res.cookies["refresh_token"]
+
+    assert (await client.get("/api/auth/me", headers=headers)).status_code == 200
+    assert (await client.post("/api/auth/logout", headers=headers)).status_code == 200
+    assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+
+    # The refresh cookie reaches /logout, so the refresh token is revoked too
+    response = await client.post(
+        "/api/auth/refresh", json={"refresh_token": refresh_token}
+    )
+    assert response.status_code == 401
@@ -105,3 +105,39 @@ def cleanup_uploads():
     # We should ideally track files created and delete only them
     # For simplicity in these tests, we assume we are running in an isolated environment/worktree
     pass
+
+
+@pytest.mark.asyncio
+async def test_document_share(client: AsyncClient, db_session: AsyncSession):
+    """Test sharing a document with another user"""
+    headers, owner = await get_auth_headers(client, db_session, "shareowner")
+    _, recipient = await get_auth_headers(client, db_session, "sharerecipient")
+    recipient_id = recipient.id
+
+    files = {"file": ("shared.txt", b"shared", "text/plain")}
+    res = await client.post(
+        "/api/board/documents",
+        headers=headers,
+        data={"title": "Shared"},
+        files=files,
+    )
+    doc_id = res.json()["id"]
+
+    response = await client.post(
+        f"/api/board/documents/{doc_id}/share",
+        headers=headers,
+        json={"recipient_id": recipient_id},
+    )
+    assert response.status_code == 200
+    share = response.json()
+    assert share["document_id"] == doc_id
+    assert share["recipient_id"] == recipient_id
+
+    # Sharing again returns the existing share
+    response = await client.post(
+        f"/api/board/documents/{doc_id}/share",
+        headers=headers,
+        json={"recipient_id": recipient_id},
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == share["id"]
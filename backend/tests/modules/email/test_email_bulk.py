@@ -0,0 +1,208 @@
+import os
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.modules.email import service as email_service
+from app.modules.email import stats, storage
+from app.modules.email.models import EmailAccount, EmailFolder, EmailMessage
+from tests.modules.email.test_email_flow import get_auth_headers
+from tests.modules.email.test_email_storage import background_cleanup, build_message
+
+
+async def create_mailbox(db: AsyncSession, user, count: int) -> EmailAccount:
+    domain = get_settings().internal_email_domain
+    account = EmailAccount(user_id=user.id, email_address=f"{user.username}@{domain}")
+    db.add(account)
+    await db.flush()
+    for i in range(count):
+        db.add(
+            EmailMessage(
+                account_id=account.id,
+                subject=f"Report {i}" if i % 2 else f"Invoice {i}",
+                from_address="sender@external.com",
+                to_address=account.email_address,
+            )
+        )
+    await db.commit()
+    return account
+
+
+async def message_ids(db: AsyncSession, account_id: int) -> list:
+    result = await db.scalars(
+        select(EmailMessage.id)
+        .where(EmailMessage.account_id == account_id)
+        .order_by(EmailMessage.id)
+    )
+    return list(result)
+
+
+@pytest.fixture
+def ws_events(monkeypatch):
+    events = []
+
+    async def broadcast(user_id, message):
+        events.append((user_id, message))
+
+    monkeypatch.setattr(email_service.websocket_manager, "broadcast_to_user", broadcast)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_is_one_statement(
+    engine, client: AsyncClient, db_session: AsyncSession, ws_events
+):
+    headers, user = await get_auth_headers(client, db_session, "bulkuser")
+    account = await create_mailbox(db_session, user, 60)
+    _, other_user = await get_auth_headers(client, db_session, "bulkother")
+    other = await create_mailbox(db_session, other_user, 3)
+    folder = EmailFolder(account_id=account.id, name="Reports", slug="reports")
+    db_session.add(folder)
+    await db_session.commit()
+
+    folder_id, user_id = folder.id, user.id
+    ids = await message_ids(db_session, account.id)
+    other_ids = await message_ids(db_session, other.id)
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.post(
+            "/api/email/messages/bulk-update",
+            json={
+                "ids": ids[:50] + other_ids,
+                "updates": {"is_read": True, "folder_id": folder_id},
+            },
+            headers=headers,
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.text
+    assert response.json() == {"count": 50}
+    assert len([s for s in statements if s.startswith("UPDATE email_messages")]) == 1
+    assert len(statements) < 10
+
+    db_session.expire_all()
+    messages = list(
+        await db_session.scalars(
+            select(EmailMessage).where(EmailMessage.id.in_(ids + other_ids))
+        )
+    )
+    moved = {m.id for m in messages if m.is_read and m.folder_id == folder_id}
+    assert moved == set(ids[:50])
+
+    # One notification for the whole batch
+    assert ws_events == [
+        (
+            user_id,
+            {
+                "type": "emails_updated",
+                "ids": ids[:50] + other_ids,
+                "count": 50,
+                "changes": {"is_read": True, "folder_id": folder_id},
+            },
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_by_folder_and_query(
+    client: AsyncClient, db_session: AsyncSession, ws_events, monkeypatch
+):
+    monkeypatch.setattr(stats, "counters_enabled", True)
+    headers, user = await get_auth_headers(client, db_session, "bulkquery")
+    account = await create_mailbox(db_session, user, 10)
+    domain = get_settings().internal_email_domain
+    await email_service.process_incoming_email(
+        db_session,
+        "sender@external.com",
+        [f"bulkquery@{domain}"],
+        b"Subject: Quarterly invoice\r\n\r\nPlease pay the invoice",
+    )
+    assert (await stats.get_counts(db_session, account.id))["unread"] == 11
+
+    response = await client.post(
+        "/api/email/messages/bulk-update",
+        json={"q": "invoice", "updates": {"is_starred": True}},
+        headers=headers,
+    )
+    assert response.json() == {"count": 1}
+
+    response = await client.post(
+        "/api/email/messages/bulk-update",
+        json={"folder": "inbox", "updates": {"is_read": True}},
+        headers=headers,
+    )
+    assert response.json() == {"count": 11}
+    assert ws_events[-1][1]["ids"] is None
+
+    # Counters were dropped and are rebuilt from the rows
+    counts = await stats.get_counts(db_session, account.id)
+    assert counts == await stats.count_messages(db_session, account.id)
+    assert counts["unread"] == 0 and counts["starred"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_selection_is_validated(
+    client: AsyncClient, db_session: AsyncSession
+):
+    headers, user = await get_auth_headers(client, db_session, "bulkinvalid")
+    await create_mailbox(db_session, user, 1)
+    _, other_user = await get_auth_headers(client, db_session, "bulkinvalid2")
+    other = await create_mailbox(db_session, other_user, 0)
+    foreign_folder = EmailFolder(account_id=other.id, name="Theirs", slug="theirs")
+    db_session.add(foreign_folder)
+    await db_session.commit()
+
+    for body, status in (
+        ({"ids": [1], "folder": "inbox", "updates": {"is_read": True}}, 400),
+        ({"updates": {"is_read": True}}, 400),
+        ({"folder": "nope", "updates": {"is_read": True}}, 400),
+        ({"folder": "inbox", "updates": {"folder_id": foreign_folder.id}}, 404),
+    ):
+        response = await client.post(
+            "/api/email/messages/bulk-update", json=body, headers=headers
+        )
+        assert response.status_code == status, body
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_cleans_up_in_background(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    ws_events,
+    tmp_path,
+    monkeypatch,
+    background_cleanup,
+):
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    headers, user = await get_auth_headers(client, db_session, "bulkdelete")
+    account = await create_mailbox(db_session, user, 5)
+    recipient = f"bulkdelete@{get_settings().internal_email_domain}"
+    await email_service.process_incoming_email(
+        db_session,
+        "sender@external.com",
+        [recipient],
+        build_message([recipient], os.urandom(4096)),
+    )
+    assert len(os.listdir(tmp_path)) == 1
+
+    ids = await message_ids(db_session, account.id)
+    ws_events.clear()
+    response = await client.post(
+        "/api/email/messages/bulk-delete", json={"ids": ids[3:]}, headers=headers
+    )
+    assert response.json() == {"count": 3}
+    await background_cleanup()
+
+    assert await message_ids(db_session, account.id) == ids[:3]
+    assert os.listdir(tmp_path) == []
+    assert [e["type"] for _, e in ws_events] == ["emails_deleted"]
+    assert ws_events[0][1]["ids"] == ids[3:]
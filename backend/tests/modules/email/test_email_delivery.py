@@ -0,0 +1,255 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.smtp_pool import SMTPPool
+from app.modules.auth.models import User
+from app.modules.email import service as email_service
+from app.modules.email import storage
+from app.modules.email.models import EmailAccount
+from app.modules.email.outbox import Outbox
+from app.modules.email.schemas import EmailMessageCreate
+
+
+class RelayHandler:
+    def __init__(self):
+        self.reply = "250 OK"
+        self.delivered = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reply.startswith("250"):
+            self.delivered.append(envelope)
+        return self.reply
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def relay(monkeypatch, tmp_path):
+    handler = RelayHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+
+    async def relay_address(db):
+        return "127.0.0.1", controller.port
+
+    monkeypatch.setattr(email_service, "get_relay_address", relay_address)
+    monkeypatch.setattr(
+        email_service, "smtp_pool", SMTPPool(retries=2, backoff_seconds=0.01)
+    )
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    yield handler
+    controller.stop()
+
+
+async def create_account(db: AsyncSession, username: str) -> EmailAccount:
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    account = EmailAccount(user_id=user.id, email_address=f"{username}@example.com")
+    db.add(account)
+    await db.commit()
+    return account
+
+
+@pytest.fixture
+def pushed(monkeypatch):
+    events = []
+
+    async def broadcast_to_user(user_id, event):
+        events.append((user_id, event))
+
+    monkeypatch.setattr(
+        email_service.websocket_manager, "broadcast_to_user", broadcast_to_user
+    )
+    return events
+
+
+@pytest.mark.asyncio
+async def test_send_email_queues_and_outbox_delivers(
+    db_session: AsyncSession, relay, pushed
+):
+    account = await create_account(db_session, "deliverer")
+
+    message = await email_service.send_email(
+        db_session,
+        account.id,
+        EmailMessageCreate(
+            subject="Report", to_address="someone@external.com", body_text="Hi"
+        ),
+        files=[("report.txt", b"contents", "text/plain")],
+    )
+
+    # Persisted and queued; nothing sent yet
+    assert message.delivery_status == "pending"
+    assert [a.filename for a in message.attachments] == ["report.txt"]
+    assert relay.delivered == []
+    assert await email_service.get_undelivered_message_ids(db_session) == [message.id]
+
+    delivered = await email_service.deliver_email(db_session, message.id)
+
+    assert delivered.delivery_status == "sent"
+    assert delivered.delivery_attempts == 1
+    assert delivered.delivery_error is None
+    assert relay.delivered[0].rcpt_tos == ["someone@external.com"]
+    assert b"report.txt" in relay.delivered[0].content
+    assert pushed == [
+        (
+            account.user_id,
+            {
+                "type": "email_delivery",
+                "id": message.id,
+                "delivery_status": "sent",
+                "delivery_error": None,
+            },
+        )
+    ]
+    # Already delivered: a second (recovered) run does nothing
+    assert await email_service.deliver_email(db_session, message.id) is None
+    assert len(relay.delivered) == 1
+
+
+@pytest.mark.asyncio
+async def test_deliver_email_records_failure(db_session: AsyncSession, relay, pushed):
+    account = await create_account(db_session, "bounced")
+    relay.reply = "550 Mailbox unavailable"
+
+    message = await email_service.send_email(
+        db_session,
+        account.id,
+        EmailMessageCreate(subject="Report", to_address="nobody@external.com"),
+    )
+    delivered = await email_service.deliver_email(db_session, message.id)
+
+    assert delivered.delivery_status == "failed"
+    assert delivered.delivery_error.startswith("550")
+    assert relay.delivered == []
+    assert pushed[0][1]["delivery_status"] == "failed"
+
+
+@pytest.mark.asyncio
+async def test_interrupted_deliveries_are_recovered(db_session: AsyncSession, relay):
+    account = await create_account(db_session, "interrupted")
+    message = await email_service.send_email(
+        db_session,
+        account.id,
+        EmailMessageCreate(subject="Report", to_address="someone@external.com"),
+    )
+    # Claimed by a worker that died before recording the outcome
+    message.delivery_status = "sending"
+    message.delivery_claimed_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    await db_session.commit()
+
+    assert await email_service.get_undelivered_message_ids(db_session) == [message.id]
+    await db_session.refresh(message)
+    assert message.delivery_status == "pending"
+    assert message.delivery_claimed_at is None
+
+
+@pytest.mark.asyncio
+async def test_claims_in_flight_are_not_recovered(db_session: AsyncSession, relay):
+    account = await create_account(db_session, "inflight")
+    message = await email_service.send_email(
+        db_session,
+        account.id,
+        EmailMessageCreate(subject="Report", to_address="someone@external.com"),
+    )
+    # Claimed just now by a worker in another process
+    message.delivery_status = "sending"
+    message.delivery_claimed_at = datetime.now(timezone.utc)
+    await db_session.commit()
+
+    assert await email_service.get_undelivered_message_ids(db_session) == []
+    assert await email_service.release_stale_claims(db_session) == []
+    await db_session.refresh(message)
+    assert message.delivery_status == "sending"
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_reclaimed(
+    db_session: AsyncSession, relay, monkeypatch
+):
+    account = await create_account(db_session, "crashed")
+    message = await email_service.send_email(
+        db_session,
+        account.id,
+        EmailMessageCreate(subject="Report", to_address="someone@external.com"),
+    )
+    message_id = message.id
+
+    async def broken_relay_address(db):
+        raise RuntimeError("settings unavailable")
+
+    monkeypatch.setattr(email_service, "get_relay_address", broken_relay_address)
+    with pytest.raises(RuntimeError):
+        await email_service.deliver_email(db_session, message_id)
+
+    # Left claimed; released once the claim outlives the relay's retry budget
+    assert await email_service.release_stale_claims(db_session) == []
+    monkeypatch.setattr(
+        email_service.smtp_pool, "delivery_budget_seconds", lambda: -3600.0
+    )
+    assert await email_service.release_stale_claims(db_session) == [message_id]
+    await db_session.refresh(message)
+    assert message.delivery_status == "pending"
+
+
+@pytest.mark.asyncio
+async def test_outbox_delivers_recovered_and_new_messages():
+    delivered = []
+
+    async def deliver(message_id):
+        if message_id == 2:
+            raise RuntimeError("database unavailable")
+        delivered.append(message_id)
+
+    async def recover():
+        return [1, 2]
+
+    outbox = Outbox(deliver=deliver, recover=recover, workers=2)
+    outbox.enqueue(99)  # not running yet: left for recovery
+    await outbox.start()
+    try:
+        outbox.enqueue(3)
+        await outbox.drain()
+    finally:
+        await outbox.stop()
+
+    assert sorted(delivered) == [1, 3]
+    assert not outbox.is_running
+
+
+@pytest.mark.asyncio
+async def test_outbox_requeues_reclaimed_messages():
+    delivered = []
+    reclaimed = [[5], []]
+
+    async def deliver(message_id):
+        delivered.append(message_id)
+
+    async def recover():
+        return []
+
+    async def reclaim():
+        return reclaimed.pop(0) if reclaimed else []
+
+    outbox = Outbox(
+        deliver=deliver, recover=recover, reclaim=reclaim, reclaim_seconds=0.01
+    )
+    await outbox.start()
+    try:
+        while not delivered:
+            await asyncio.sleep(0.01)
+        await outbox.drain()
+    finally:
+        await outbox.stop()
+
+    assert delivered == [5]
@@ -3,12 +3,18 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.modules.auth.models import User
-from app.modules.email.models import EmailAccount, EmailMessage, EmailAttachment
+from app.modules.email.models import (
+    EmailAccount,
+    EmailMessage,
+    EmailAttachment,
+    make_snippet,
+)
 from app.modules.email import service as email_service
 from app.core.security import get_password_hash
 from app.core.config import get_settings
 import os
 import shutil
+from datetime import datetime, timedelta
 
 
 # Helper to get auth headers
@@ -92,6 +98,7 @@ async def test_email_processing_and_api(client: AsyncClient, db_session: AsyncSe
     messages = response.json()
     assert len(messages) >= 1
     assert messages[0]["subject"] == "Test Subject"
+    assert messages[0]["snippet"] == "Hello! This is a test email with dangerous tags."
 
     # 5. Test Unread Count
     response = await client.get("/api/email/unread-count", headers=headers)
@@ -153,6 +160,65 @@ async def test_email_flags_and_deletion(client: AsyncClient, db_session: AsyncSe
     assert any(m["id"] == message.id for m in res_trash.json())
 
 
+@pytest.mark.asyncio
+async def test_message_list_pages_by_date_and_id(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """List rows carry stored snippets and page by (received_at, id)"""
+    headers, user = await get_auth_headers(client, db_session, "pageuser")
+    account = EmailAccount(user_id=user.id, email_address="pageuser@example.com")
+    db_session.add(account)
+    await db_session.flush()
+
+    # Several messages share a timestamp, so the id breaks ties
+    base = datetime(2026, 1, 1, 12, 0)
+    for i in range(7):
+        db_session.add(
+            EmailMessage(
+                account_id=account.id,
+                subject=f"Page {i}",
+                from_address="someone@else.com",
+                to_address="pageuser@example.com",
+                body_html="<style>p {}</style><p>Body &amp; more</p>" * 1000,
+                snippet=make_snippet(None, f"<p>Body {i}</p>"),
+                has_attachments=i == 0,
+                received_at=base - timedelta(minutes=i // 3),
+            )
+        )
+    await db_session.commit()
+
+    seen = []
+    params = {"folder": "inbox", "limit": 3}
+    while True:
+        response = await client.get(
+            "/api/email/messages", headers=headers, params=params
+        )
+        assert response.status_code == 200
+        page = response.json()
+        if not page:
+            break
+        seen += page
+        params = {
+            **params,
+            "before_received_at": page[-1]["received_at"],
+            "before_id": page[-1]["id"],
+        }
+
+    # Newest first, then highest id first
+    order = [2, 1, 0, 5, 4, 3, 6]
+    assert [m["subject"] for m in seen] == [f"Page {i}" for i in order]
+    assert [m["has_attachments"] for m in seen] == [i == 0 for i in order]
+    assert seen[0]["snippet"] == "Body 2"
+    assert "body_html" not in seen[0]
+
+
+def test_snippet_skips_markup():
+    html = "<head><title>T</title></head><style>p {}</style><p>Hi&nbsp;<b>there</b></p>"
+    assert make_snippet(None, html) == "Hi there"
+    assert make_snippet("  Plain\n\n text ", html) == "Plain text"
+    assert len(make_snippet("x" * 5000, None)) == 200
+
+
 @pytest.fixture(scope="module", autouse=True)
 def cleanup_email_uploads():
     """Ensure email uploads directory is cleaned after tests"""
@@ -0,0 +1,172 @@
+from datetime import datetime
+from email.header import Header
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.modules.email import service as email_service
+from app.modules.email import storage
+from app.modules.email.models import EmailAccount, EmailMessage
+from app.modules.email.search import parse_query
+from tests.modules.email.test_email_flow import get_auth_headers
+
+ATTACHMENT_EMAIL = (
+    b"From: builds@ci.example.com\r\n"
+    b"To: {to}\r\n"
+    b"Subject: Nightly build log\r\n"
+    b"MIME-Version: 1.0\r\n"
+    b'Content-Type: multipart/mixed; boundary="b"\r\n'
+    b"\r\n"
+    b"--b\r\n"
+    b"Content-Type: text/plain\r\n"
+    b"\r\n"
+    b"Build finished, log attached.\r\n"
+    b"--b\r\n"
+    b'Content-Type: text/plain; name="build.log"\r\n'
+    b'Content-Disposition: attachment; filename="build.log"\r\n'
+    b"\r\n"
+    b"all green\r\n"
+    b"--b--\r\n"
+)
+
+
+async def deliver(db: AsyncSession, sender: str, to: str, subject: str, body: str):
+    raw = (
+        f"From: {sender}\r\nTo: {to}\r\n"
+        f"Subject: {Header(subject, 'utf-8').encode()}\r\n"
+        f"Content-Type: text/html; charset=utf-8\r\n\r\n{body}"
+    ).encode()
+    await email_service.process_incoming_email(db, sender, [to], raw)
+
+
+async def search(client: AsyncClient, headers: dict, q: str, **params) -> list:
+    response = await client.get(
+        "/api/email/search", params={"q": q, **params}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return [m["subject"] for m in response.json()]
+
+
+def test_parse_query_filters():
+    query = parse_query(
+        'quarterly "budget review" from:alice has:attachment '
+        "after:2026-01-01 before:2026-02-01 is:unread foo:bar"
+    )
+    assert query.terms == ["quarterly", "budget review", "foo:bar"]
+    assert query.from_address == ["alice"]
+    assert query.has_attachment and query.is_unread
+    assert query.after == datetime(2026, 1, 1)
+    assert query.before == datetime(2026, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_search_terms_filters_and_paging(
+    client: AsyncClient, db_session: AsyncSession, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    headers, user = await get_auth_headers(client, db_session, "searchuser")
+    other_headers, _ = await get_auth_headers(client, db_session, "searchother")
+    domain = get_settings().internal_email_domain
+    to = f"searchuser@{domain}"
+
+    await deliver(
+        db_session,
+        "alice@partner.com",
+        to,
+        "Quarterly budget review",
+        "<p>Numbers for the <b>budget</b> meeting</p><script>secretword</script>",
+    )
+    await deliver(
+        db_session, "bob@partner.com", to, "Lunch", "<p>Budget lunch on Friday</p>"
+    )
+    await deliver(
+        db_session, "carol@partner.com", to, "Café plans", "<p>Résumé attached</p>"
+    )
+    await email_service.process_incoming_email(
+        db_session,
+        "builds@ci.example.com",
+        [to],
+        ATTACHMENT_EMAIL.replace(b"{to}", to.encode()),
+    )
+    # Same words in someone else's mailbox
+    await deliver(
+        db_session,
+        "alice@partner.com",
+        f"searchother@{domain}",
+        "Budget",
+        "<p>budget</p>",
+    )
+
+    account = await db_session.scalar(
+        select(EmailAccount).where(EmailAccount.user_id == user.id)
+    )
+    messages = {
+        m.subject: m
+        for m in await db_session.scalars(
+            select(EmailMessage).where(EmailMessage.account_id == account.id)
+        )
+    }
+    for day, subject in enumerate(sorted(messages), start=1):
+        messages[subject].received_at = datetime(2026, 3, day)
+    await db_session.commit()
+
+    assert await search(client, headers, "budget") == [
+        "Quarterly budget review",
+        "Lunch",
+    ]
+    assert await search(client, headers, '"budget meeting"') == [
+        "Quarterly budget review"
+    ]
+    assert await search(client, headers, "budg*") == [
+        "Quarterly budget review",
+        "Lunch",
+    ]
+    assert await search(client, headers, "secretword") == []
+    assert await search(client, headers, "cafe resume") == ["Café plans"]
+    assert await search(client, headers, "partner") == [
+        "Quarterly budget review",
+        "Lunch",
+        "Café plans",
+    ]
+    assert await search(client, headers, "budget from:bob") == ["Lunch"]
+    assert await search(client, headers, "has:attachment") == ["Nightly build log"]
+    assert await search(client, headers, "log has:attachment") == ["Nightly build log"]
+    assert await search(client, headers, "partner after:2026-03-02") == [
+        "Quarterly budget review",
+        "Lunch",
+    ]
+    assert await search(client, headers, "partner before:2026-03-02") == ["Café plans"]
+    assert await search(client, other_headers, "budget") == ["Budget"]
+
+    # Cursor paging over the newest-first results
+    response = await client.get(
+        "/api/email/search", params={"q": "budget", "limit": 1}, headers=headers
+    )
+    (first,) = response.json()
+    rest = await search(
+        client,
+        headers,
+        "budget",
+        before_received_at=first["received_at"],
+        before_id=first["id"],
+    )
+    assert [first["subject"]] + rest == ["Quarterly budget review", "Lunch"]
+
+    response = await client.get(
+        "/api/email/search", params={"q": "after:yesterday"}, headers=headers
+    )
+    assert response.status_code == 400
+
+    # Permanently deleted messages leave the index
+    await email_service.delete_email_message(
+        db_session, messages["Lunch"].id, account.id
+    )
+    assert await search(client, headers, "budget") == ["Quarterly budget review"]
+    remaining = await db_session.scalar(
+        text("SELECT count(*) FROM email_search WHERE rowid = :id"),
+        {"id": messages["Lunch"].id},
+    )
+    assert remaining == 0
@@ -0,0 +1,189 @@
+import itertools
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.auth.models import User
+from app.modules.email import service as email_service
+from app.modules.email import stats, storage
+from app.modules.email.models import (
+    EmailAccount,
+    EmailCounters,
+    EmailFolder,
+    EmailMessage,
+)
+from app.modules.email.schemas import EmailMessageUpdate
+
+FLAGS = ("is_sent", "is_read", "is_deleted", "is_spam", "is_starred", "is_archived")
+
+
+async def create_mailbox(db: AsyncSession, username: str) -> EmailAccount:
+    """An account with one message per flag combination, half of them in a folder"""
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    account = EmailAccount(user_id=user.id, email_address=f"{username}@example.com")
+    db.add(account)
+    await db.flush()
+    folder = EmailFolder(account_id=account.id, name="Projects", slug="projects")
+    db.add(folder)
+    await db.flush()
+
+    for i, values in enumerate(itertools.product((False, True), repeat=len(FLAGS))):
+        db.add(
+            EmailMessage(
+                account_id=account.id,
+                subject=f"Message {i}",
+                from_address="sender@external.com",
+                to_address=account.email_address,
+                is_important=i % 3 == 0,
+                folder_id=folder.id if i % 2 else None,
+                **dict(zip(FLAGS, values)),
+            )
+        )
+    await db.commit()
+    return account
+
+
+async def count_separately(db: AsyncSession, account_id: int) -> dict:
+    """Bucket counts computed in Python from the rows"""
+    messages = list(
+        await db.scalars(
+            select(EmailMessage).where(EmailMessage.account_id == account_id)
+        )
+    )
+    return {
+        name: sum(
+            1 for m in messages if all(getattr(m, f) == v for f, v in required.items())
+        )
+        for name, required in stats.BUCKETS.items()
+    }
+
+
+@pytest.mark.asyncio
+async def test_stats_come_from_one_query(engine, db_session: AsyncSession):
+    account = await create_mailbox(db_session, "statsuser")
+    expected = await count_separately(db_session, account.id)
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        result = await email_service.get_email_stats(db_session, account.id)
+        unread = await email_service.get_unread_count(db_session, account.id)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert len(statements) == 2
+    assert result == {k: expected[k] for k in result}
+    assert unread == {"total": expected["unread_total"]}
+    assert expected["inbox"] and expected["unread"] < expected["unread_total"]
+
+
+@pytest.mark.asyncio
+async def test_adjust_during_rebuild_is_counted(db_session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(stats, "counters_enabled", True)
+    account = await create_mailbox(db_session, "rebuilduser")
+    account_id = account.id
+    unread = await db_session.scalar(
+        select(EmailMessage.id).where(
+            EmailMessage.account_id == account_id,
+            EmailMessage.is_read.is_(False),
+            EmailMessage.is_sent.is_(False),
+            EmailMessage.is_deleted.is_(False),
+            EmailMessage.is_spam.is_(False),
+        )
+    )
+    await db_session.commit()
+
+    # Another request marks a message read (its adjust finds no row yet)
+    # just before the rebuild stores the counters
+    interleaved = []
+
+    def concurrent_mark_read(conn, cursor, statement, params, context, executemany):
+        if interleaved or not statement.startswith("INSERT"):
+            return
+        if "email_counters" in statement:
+            interleaved.append(statement)
+            conn.exec_driver_sql(
+                "UPDATE email_messages SET is_read = 1 WHERE id = ?", (unread,)
+            )
+            conn.exec_driver_sql(
+                "UPDATE email_counters SET unread = unread - 1 WHERE account_id = ?",
+                (account_id,),
+            )
+
+    before = await stats.count_messages(db_session, account_id)
+    sync_engine = db_session.bind.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", concurrent_mark_read)
+    try:
+        stored = await stats.get_counts(db_session, account_id)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", concurrent_mark_read)
+
+    assert interleaved
+    assert stored == await stats.count_messages(db_session, account_id)
+    assert stored["unread"] == before["unread"] - 1
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_message_changes(
+    db_session: AsyncSession, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(stats, "counters_enabled", True)
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    account = await create_mailbox(db_session, "counteruser")
+
+    async def assert_counters_match():
+        stored = await stats.get_counts(db_session, account.id)
+        assert stored == await stats.count_messages(db_session, account.id)
+
+    # First read builds the row, later reads use it
+    await assert_counters_match()
+    assert await db_session.get(EmailCounters, account.id) is not None
+
+    messages = list(
+        await db_session.scalars(
+            select(EmailMessage)
+            .where(EmailMessage.account_id == account.id)
+            .order_by(EmailMessage.id)
+        )
+    )
+    for i, message in enumerate(messages[:12]):
+        updates = EmailMessageUpdate(
+            is_read=not message.is_read,
+            is_spam=i % 2 == 0,
+            is_deleted=i % 3 == 0,
+            folder_id=None,
+        )
+        await email_service.update_email_message(
+            db_session, message.id, account.id, updates
+        )
+        await assert_counters_match()
+
+    unread = next(m for m in messages[12:] if not m.is_read)
+    await email_service.mark_as_read(db_session, unread)
+    await assert_counters_match()
+
+    await email_service.delete_email_message(db_session, messages[-1].id, account.id)
+    await assert_counters_match()
+
+    inbox = (await stats.get_counts(db_session, account.id))["inbox"]
+    await email_service.process_incoming_email(
+        db_session,
+        "sender@external.com",
+        [account.email_address],
+        b"Subject: New\r\n\r\nHello",
+    )
+    await assert_counters_match()
+    assert (await stats.get_counts(db_session, account.id))["inbox"] == inbox + 1
+
+    # Bulk changes drop the row; it is rebuilt on the next read
+    await email_service.mark_all_as_read(db_session, account.id)
+    db_session.expunge_all()
+    assert await db_session.get(EmailCounters, account.id) is None
+    await assert_counters_match()
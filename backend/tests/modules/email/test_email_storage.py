@@ -0,0 +1,220 @@
+import os
+from email.message import EmailMessage as MimeMessage
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.modules.auth.models import User
+from app.modules.email import service as email_service
+from app.modules.email import storage
+from app.modules.email.models import (
+    EmailAccount,
+    EmailAttachment,
+    EmailBlob,
+    EmailBody,
+    EmailMessage,
+)
+
+
+async def create_accounts(db: AsyncSession, prefix: str, count: int) -> list:
+    addresses = []
+    for i in range(count):
+        user = User(
+            username=f"{prefix}{i}",
+            email=f"{prefix}{i}@example.com",
+            hashed_password="x",
+        )
+        db.add(user)
+        await db.flush()
+        address = f"{prefix}{i}@storage.test"
+        db.add(EmailAccount(user_id=user.id, email_address=address))
+        addresses.append(address)
+    await db.flush()
+    return addresses
+
+
+def build_message(recipients, attachment: bytes) -> bytes:
+    msg = MimeMessage()
+    msg["From"] = "sender@external.com"
+    msg["To"] = ", ".join(recipients)
+    msg["Subject"] = "Shared content"
+    msg.set_content("Plain body")
+    msg.add_alternative("<p>HTML <script>x()</script>body</p>", subtype="html")
+    msg.add_attachment(
+        attachment,
+        maintype="application",
+        subtype="pdf",
+        filename="report.pdf",
+    )
+    return msg.as_bytes()
+
+
+@pytest_asyncio.fixture
+async def background_cleanup(db_session: AsyncSession, monkeypatch):
+    """Background file cleanup on the test's connection; waited for at the end"""
+    monkeypatch.setattr(
+        storage,
+        "AsyncSessionLocal",
+        async_sessionmaker(bind=db_session.bind, expire_on_commit=False),
+    )
+    yield storage.wait_for_cleanup
+    await storage.wait_for_cleanup()
+
+
+async def count(db: AsyncSession, model) -> int:
+    return await db.scalar(select(func.count(model.id)))
+
+
+@pytest.mark.asyncio
+async def test_multi_recipient_mail_is_stored_once(
+    db_session: AsyncSession, tmp_path, monkeypatch, background_cleanup
+):
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    recipients = await create_accounts(db_session, "shared", 3)
+    attachment = os.urandom(64 * 1024)
+    bodies_before = await count(db_session, EmailBody)
+
+    await email_service.process_incoming_email(
+        db_session,
+        sender="sender@external.com",
+        recipients=recipients,
+        content=build_message(recipients, attachment),
+    )
+
+    result = await db_session.execute(
+        select(EmailMessage).where(EmailMessage.to_address == ",".join(recipients))
+    )
+    messages = result.unique().scalars().all()
+    assert len(messages) == 3
+    assert await count(db_session, EmailBody) == bodies_before + 1
+    assert len({m.body_id for m in messages}) == 1
+    assert messages[0].body_text.strip() == "Plain body"
+    assert "<script>" not in messages[0].body_html
+
+    result = await db_session.execute(
+        select(EmailAttachment).where(
+            EmailAttachment.message_id.in_([m.id for m in messages])
+        )
+    )
+    attachments = result.scalars().all()
+    assert len(attachments) == 3
+    assert {a.filename for a in attachments} == {"report.pdf"}
+    blob = await db_session.get(EmailBlob, attachments[0].blob_id)
+    assert {a.blob_id for a in attachments} == {blob.id}
+    assert blob.ref_count == 3
+    assert blob.file_size == len(attachment)
+    assert os.listdir(tmp_path) == [blob.sha256]
+
+    # Deleting one copy keeps the shared content
+    await email_service.delete_email_message(
+        db_session, messages[0].id, messages[0].account_id
+    )
+    await db_session.refresh(blob)
+    assert blob.ref_count == 2
+    assert os.path.exists(blob.file_path)
+
+    # Deleting the last copies releases the body and the file
+    for message in messages[1:]:
+        message.is_deleted = True
+        await db_session.commit()
+        await email_service.empty_folder(db_session, message.account_id, "trash")
+    await background_cleanup()
+
+    remaining = await db_session.scalar(
+        select(func.count(EmailBlob.id)).where(EmailBlob.sha256 == blob.sha256)
+    )
+    assert remaining == 0
+    assert await count(db_session, EmailBody) == bodies_before
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_identical_attachments_share_a_blob(
+    db_session: AsyncSession, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    recipients = await create_accounts(db_session, "dedup", 1)
+    attachment = os.urandom(1024)
+
+    for _ in range(2):
+        await email_service.process_incoming_email(
+            db_session,
+            sender="sender@external.com",
+            recipients=recipients,
+            content=build_message(recipients, attachment),
+        )
+
+    blobs = (await db_session.execute(select(EmailBlob))).scalars().all()
+    blob = next(b for b in blobs if b.file_path.startswith(str(tmp_path)))
+    assert blob.ref_count == 2
+    assert len(os.listdir(tmp_path)) == 1
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_blob_files_are_removed(engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(storage, "AsyncSessionLocal", sessions)
+    existing = os.urandom(512)
+
+    async with sessions() as db:
+        kept = await storage.store_blob(db, existing)
+        await db.commit()
+        kept_id, kept_sha256 = kept.id, kept.sha256
+
+        # Stored in a transaction that fails (after writing its message
+        # rows, as ingest does): its new files go with it
+        await create_accounts(db, "rolledback", 1)
+        await storage.store_blob(db, os.urandom(512))
+        temp_path = tmp_path / "upload.tmp"
+        temp_path.write_bytes(os.urandom(512))
+        await storage.store_blob_file(db, str(temp_path), "f" * 64, 512)
+        # An existing file gains a reference; it stays
+        await storage.store_blob(db, existing)
+        await db.rollback()
+        await storage.wait_for_cleanup()
+
+        assert os.listdir(tmp_path) == [kept_sha256]
+
+        await db.delete(await db.get(EmailBlob, kept_id))
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_legacy_attachment_files_are_removed(db_session: AsyncSession, tmp_path):
+    await create_accounts(db_session, "legacy", 1)
+    account = await db_session.scalar(
+        select(EmailAccount).where(EmailAccount.email_address == "legacy0@storage.test")
+    )
+    # Attachments saved before blob storage: blob_id NULL, one file per row
+    # (a forwarded copy may point at the same file)
+    shared = tmp_path / "report.pdf"
+    shared.write_bytes(os.urandom(256))
+    message_ids = []
+    for _ in range(2):
+        message = EmailMessage(
+            account_id=account.id,
+            subject="Legacy",
+            from_address="sender@external.com",
+            to_address=account.email_address,
+        )
+        db_session.add(message)
+        await db_session.flush()
+        db_session.add(
+            EmailAttachment(
+                message_id=message.id,
+                filename="report.pdf",
+                file_path=str(shared),
+                file_size=256,
+            )
+        )
+        message_ids.append(message.id)
+    await db_session.flush()
+
+    await email_service.delete_email_message(db_session, message_ids[0], account.id)
+    assert shared.exists()
+
+    await email_service.delete_email_message(db_session, message_ids[1], account.id)
+    assert not shared.exists()
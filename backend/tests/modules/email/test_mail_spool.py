@@ -0,0 +1,101 @@
+import socket
+
+import aiosmtplib
+import pytest
+
+from app.modules.email.smtp_server import SMTPServerManager
+from app.modules.email.spool import MailSpool
+
+RAW_EMAIL = (
+    b"From: sender@external.com\r\n"
+    b"To: user@example.com\r\n"
+    b"Subject: Spooled\r\n"
+    b"\r\n"
+    b"Hello"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_smtp_accepts_into_spool_and_workers_process(tmp_path):
+    processed = []
+
+    async def process(sender, recipients, message):
+        processed.append((sender, recipients, message.read()))
+
+    spool = MailSpool(str(tmp_path), process=process, workers=2)
+    server = SMTPServerManager(hostname="127.0.0.1", port=free_port(), spool=spool)
+    await server.start()
+    try:
+        for _ in range(3):
+            await aiosmtplib.send(
+                RAW_EMAIL,
+                sender="sender@external.com",
+                recipients=["user@example.com", "other@example.com"],
+                hostname="127.0.0.1",
+                port=server.port,
+            )
+        await spool.drain()
+    finally:
+        await server.stop()
+
+    assert len(processed) == 3
+    sender, recipients, content = processed[0]
+    assert sender == "sender@external.com"
+    assert recipients == ["user@example.com", "other@example.com"]
+    assert b"Subject: Spooled" in content
+    assert not list(tmp_path.glob("*/*.eml"))
+
+
+@pytest.mark.asyncio
+async def test_failed_messages_retry_then_dead_letter(tmp_path):
+    calls = {"flaky": 0, "broken": 0}
+
+    async def process(sender, recipients, message):
+        kind = recipients[0]
+        calls[kind] += 1
+        if kind == "broken" or calls[kind] == 1:
+            raise RuntimeError(f"{kind} failure")
+
+    spool = MailSpool(
+        str(tmp_path), process=process, max_attempts=3, retry_seconds=0.01
+    )
+    await spool.start()
+    try:
+        await spool.accept("a@example.com", ["flaky"], RAW_EMAIL)
+        await spool.accept("a@example.com", ["broken"], RAW_EMAIL)
+        await spool.drain()
+    finally:
+        await spool.stop()
+
+    assert calls == {"flaky": 2, "broken": 3}
+    dead = list((tmp_path / "dead").glob("*.eml"))
+    assert len(dead) == 1
+    assert "broken failure" in dead[0].with_suffix(".error").read_text()
+    assert spool.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_spooled_messages_survive_restart(tmp_path):
+    processed = []
+
+    async def process(sender, recipients, message):
+        processed.append(recipients)
+
+    # Accepted while no workers run (e.g. crash right after the 250 reply)
+    spool = MailSpool(str(tmp_path), process=process)
+    spool.write("a@example.com", ["first"], RAW_EMAIL)
+    claimed = spool.write("a@example.com", ["second"], RAW_EMAIL)
+    claimed.rename(tmp_path / "cur" / claimed.name)
+
+    await spool.start()
+    try:
+        await spool.drain()
+    finally:
+        await spool.stop()
+    assert sorted(processed) == [["first"], ["second"]]
@@ -0,0 +1,109 @@
+import email
+import os
+from email.message import EmailMessage as MimeMessage
+
+from app.modules.email.mime_stream import StreamingMimeParser
+
+MB = 1024 * 1024
+
+
+def build_message(attachments) -> bytes:
+    msg = MimeMessage()
+    msg["From"] = "sender@external.com"
+    msg["To"] = "user@example.com"
+    msg["Subject"] = "=?utf-8?b?0J/RgNC40LLQtdGC?="
+    msg.set_content("Plain body\n-- \nSignature\n")
+    msg.add_alternative("<p>Café <b>html</b></p>", subtype="html")
+    for filename, content in attachments:
+        if isinstance(content, str):
+            msg.add_attachment(content, filename=filename, cte="quoted-printable")
+        else:
+            msg.add_attachment(
+                content,
+                maintype="application",
+                subtype="octet-stream",
+                filename=filename,
+            )
+    return msg.as_bytes()
+
+
+def parse(raw: bytes, directory, chunk: int = 64 * 1024, **limits):
+    parser = StreamingMimeParser(
+        str(directory),
+        limits.get("max_attachment_bytes", 10 * MB),
+        limits.get("max_total_bytes", 20 * MB),
+        limits.get("allowed_exts"),
+    )
+    for i in range(0, len(raw), chunk):
+        parser.feed(raw[i : i + chunk])
+    return parser.close()
+
+
+def test_matches_stdlib_parser_for_any_chunking(tmp_path):
+    binary = os.urandom(300 * 1024)
+    text = "Line with = sign and ümlaut\n" * 200
+    raw = build_message([("data.bin", binary), ("notes.txt", text)])
+    expected = email.message_from_bytes(raw)
+
+    for chunk in (7, 1000, 64 * 1024):
+        parsed = parse(raw, tmp_path, chunk=chunk)
+        assert parsed.headers.items() == expected.items()
+        assert parsed.body_text == "Plain body\n-- \nSignature\n"
+        assert "Café <b>html</b>" in parsed.body_html
+
+        files = {a.filename: a for a in parsed.attachments}
+        assert set(files) == {"data.bin", "notes.txt"}
+        with open(files["data.bin"].temp_path, "rb") as f:
+            assert f.read() == binary
+        with open(files["notes.txt"].temp_path, "rb") as f:
+            assert f.read().decode() == text
+        assert files["data.bin"].size == len(binary)
+        assert files["notes.txt"].content_type == "text/plain"
+        parsed.discard()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_oversized_attachments_are_dropped_while_decoding(tmp_path):
+    raw = build_message(
+        [
+            ("big.bin", os.urandom(2 * MB)),
+            ("small.bin", os.urandom(1024)),
+            ("second.bin", os.urandom(MB // 2)),
+        ]
+    )
+
+    parsed = parse(raw, tmp_path, max_attachment_bytes=MB, max_total_bytes=MB // 2)
+
+    # big.bin exceeds the per-file limit, second.bin the per-message total
+    assert [a.filename for a in parsed.attachments] == ["small.bin"]
+    assert os.listdir(tmp_path) == [os.path.basename(parsed.attachments[0].temp_path)]
+    parsed.discard()
+    assert os.listdir(tmp_path) == []
+
+
+def test_disallowed_extensions_are_skipped(tmp_path):
+    raw = build_message([("run.exe", b"MZ"), ("doc.pdf", b"%PDF")])
+
+    parsed = parse(raw, tmp_path, allowed_exts={".pdf"})
+
+    assert [a.filename for a in parsed.attachments] == ["doc.pdf"]
+    parsed.discard()
+
+
+def test_single_part_message(tmp_path):
+    raw = (
+        b"From: sender@external.com\r\n"
+        b"Subject: Plain\r\n"
+        b"Content-Type: text/html; charset=utf-8\r\n"
+        b"\r\n"
+        b"<h1>Hello!</h1>\r\n"
+        b"<p>Body</p>"
+    )
+
+    parsed = parse(raw, tmp_path, chunk=5)
+
+    assert parsed.headers["Subject"] == "Plain"
+    assert parsed.body_html == "<h1>Hello!</h1>\r\n<p>Body</p>"
+    assert parsed.body_text == ""
+    assert parsed.attachments == []
@@ -0,0 +1,88 @@
+import pytest
+
+from app.modules.email import sanitizer
+from app.modules.email.sanitizer import (
+    ALLOWED_ATTRIBUTES,
+    ALLOWED_STYLES,
+    ALLOWED_TAGS,
+    SanitizedCache,
+    sanitize_html,
+    sanitize_html_async,
+)
+
+SAMPLES = [
+    "<h1>Hello!</h1><p>Text with <script>alert('xss')</script>tags.</p>",
+    '<a href="javascript:alert(1)" onclick="x()">link</a>'
+    '<a href="https://example.com" rel="nofollow" target="_blank">ok</a>',
+    '<table style="width: 100%; position: fixed"><tr>'
+    '<td style="color: red; background-image: url(x)">cell</td></tr></table>',
+    '<img src="cid:logo" alt="Logo"><img src="https://cdn.example.com/a.png" '
+    'width="10" onerror="x()">',
+    "<!--[if mso]><v:rect></v:rect><![endif]--><center><font>old</font></center>",
+]
+
+
+def test_cleaner_matches_bleach_clean():
+    import bleach
+    from bleach.css_sanitizer import CSSSanitizer
+
+    for html in SAMPLES:
+        expected = bleach.clean(
+            html,
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            css_sanitizer=CSSSanitizer(allowed_css_properties=ALLOWED_STYLES),
+            strip=True,
+        )
+        assert sanitizer.clean_html(html) == expected
+
+
+def test_dangerous_markup_is_removed():
+    cleaned = sanitize_html("".join(SAMPLES))
+    for fragment in ("<script", "javascript:", "onclick", "onerror", "position"):
+        assert fragment not in cleaned
+    assert "<h1>Hello!</h1>" in cleaned
+    assert 'href="https://example.com"' in cleaned
+    assert "color: red" in cleaned
+
+
+def test_each_body_is_cleaned_once(monkeypatch):
+    calls = []
+    clean_html = sanitizer.clean_html
+    monkeypatch.setattr(sanitizer, "sanitized_cache", SanitizedCache(1024 * 1024))
+    monkeypatch.setattr(
+        sanitizer, "clean_html", lambda html: calls.append(html) or clean_html(html)
+    )
+
+    first = sanitize_html(SAMPLES[0])
+    assert sanitize_html(SAMPLES[0]) == first
+    assert sanitize_html(SAMPLES[1]) != first
+    assert calls == SAMPLES[:2]
+
+
+def test_cache_is_bounded_by_size():
+    cache = SanitizedCache(max_chars=10)
+    for text in ("aaaa", "bbbb", "cccc"):
+        cache.put(cache.key(text), text)
+    assert cache.get(cache.key("aaaa")) is None
+    assert cache.get(cache.key("cccc")) == "cccc"
+    # Larger than the whole cache: not kept
+    cache.put(cache.key("x" * 11), "x" * 11)
+    assert cache.get(cache.key("x" * 11)) is None
+
+
+@pytest.mark.asyncio
+async def test_large_bodies_use_the_process_pool(monkeypatch):
+    monkeypatch.setattr(sanitizer.settings, "email_sanitize_workers", 1)
+    monkeypatch.setattr(sanitizer.settings, "email_sanitize_process_bytes", 1000)
+    monkeypatch.setattr(sanitizer, "sanitized_cache", SanitizedCache(1024 * 1024))
+    large = SAMPLES[0] * 100
+    try:
+        cleaned = await sanitize_html_async(large)
+        assert sanitizer._pool is not None
+    finally:
+        sanitizer.shutdown_pool()
+    assert cleaned == sanitizer.clean_html(large)
+    # Small bodies stay in-process
+    assert await sanitize_html_async(SAMPLES[1]) == sanitizer.clean_html(SAMPLES[1])
+    assert sanitizer._pool is None
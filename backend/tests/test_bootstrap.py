@@ -0,0 +1,47 @@
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import (
+    SCHEMA_VERSION_KEY,
+    init_db,
+    read_schema_meta,
+    schema_is_current,
+    write_schema_meta,
+)
+
+BOOTSTRAP_DB_PATH = "./test_bootstrap.db"
+BOOTSTRAP_DB_URL = f"sqlite+aiosqlite:///{BOOTSTRAP_DB_PATH}"
+
+
+@pytest.fixture
+async def fresh_engine():
+    engine = create_async_engine(BOOTSTRAP_DB_URL)
+    yield engine
+    await engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(BOOTSTRAP_DB_PATH + suffix):
+            os.remove(BOOTSTRAP_DB_PATH + suffix)
+
+
+@pytest.mark.asyncio
+async def test_init_db_skips_when_schema_marker_is_current(fresh_engine):
+    async with fresh_engine.connect() as conn:
+        assert await read_schema_meta(conn) == {}
+    assert not await schema_is_current(fresh_engine)
+
+    # Cold boot creates the schema and records its fingerprint
+    assert await init_db(bind=fresh_engine) is True
+    assert await schema_is_current(fresh_engine)
+
+    # Warm boot is a no-op
+    assert await init_db(bind=fresh_engine) is False
+    assert await init_db(bind=fresh_engine, force=True) is True
+
+    # A changed model fingerprint triggers create_all again
+    async with fresh_engine.begin() as conn:
+        await write_schema_meta(conn, SCHEMA_VERSION_KEY, "outdated")
+    assert not await schema_is_current(fresh_engine)
+    assert await init_db(bind=fresh_engine) is True
+    assert await schema_is_current(fresh_engine)
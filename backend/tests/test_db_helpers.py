@@ -0,0 +1,126 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.db_helpers import (
+    accessible_archive_file_ids,
+    accessible_archive_folder_ids,
+    accessible_document_ids,
+    check_access,
+    get_or_404,
+)
+from app.core.query_metrics import query_budget
+from app.modules.archive.models import ArchiveFile, ArchiveFolder
+from app.modules.auth.models import Unit, User
+from app.modules.board.models import Document, DocumentShare
+from app.modules.chat.models import Channel, ChannelMember, Message
+
+
+@pytest.fixture
+async def access_graph(db_session):
+    unit_a, unit_b = Unit(name="Access A"), Unit(name="Access B")
+    db_session.add_all([unit_a, unit_b])
+    await db_session.flush()
+
+    owner = User(
+        username="acl_owner", email="o@x.com", hashed_password="x", unit_id=unit_a.id
+    )
+    reader = User(
+        username="acl_reader", email="r@x.com", hashed_password="x", unit_id=unit_a.id
+    )
+    db_session.add_all([owner, reader])
+    await db_session.flush()
+
+    own, shared, posted, private = (
+        Document(title=t, file_path=t, owner_id=owner.id)
+        for t in ("own", "shared", "posted", "private")
+    )
+    db_session.add_all([own, shared, posted, private])
+    channel = Channel(name="acl", created_by=owner.id)
+    db_session.add(channel)
+    await db_session.flush()
+
+    db_session.add(DocumentShare(document_id=shared.id, recipient_id=reader.id))
+    db_session.add(ChannelMember(channel_id=channel.id, user_id=reader.id))
+    visible = Message(
+        channel_id=channel.id, user_id=owner.id, content="doc", document_id=posted.id
+    )
+    files = [
+        ArchiveFile(title="a", file_path="a", unit_id=unit_a.id, owner_id=owner.id),
+        ArchiveFile(title="b", file_path="b", unit_id=unit_b.id, owner_id=owner.id),
+    ]
+    folders = [
+        ArchiveFolder(name="a", unit_id=unit_a.id, owner_id=owner.id),
+        ArchiveFolder(name="b", unit_id=unit_b.id, owner_id=owner.id),
+    ]
+    db_session.add_all([visible, *files, *folders])
+    await db_session.commit()
+
+    return {
+        "owner": owner,
+        "reader": reader,
+        "docs": (own, shared, posted, private),
+        "files": files,
+        "folders": folders,
+    }
+
+
+@pytest.mark.asyncio
+async def test_accessible_document_ids_in_one_query(db_session, access_graph):
+    own, shared, posted, private = access_graph["docs"]
+    ids = [d.id for d in access_graph["docs"]]
+
+    with query_budget(1):
+        allowed = await accessible_document_ids(
+            db_session, access_graph["reader"].id, ids
+        )
+    assert allowed == {shared.id, posted.id}
+
+    owner_allowed = await accessible_document_ids(
+        db_session, access_graph["owner"].id, ids
+    )
+    assert owner_allowed == set(ids)
+
+
+@pytest.mark.asyncio
+async def test_accessible_archive_items(db_session, access_graph):
+    reader = access_graph["reader"]
+
+    file_a, file_b = access_graph["files"]
+    assert await accessible_archive_file_ids(
+        db_session, reader, [file_a.id, file_b.id]
+    ) == {file_a.id}
+
+    folder_a, folder_b = access_graph["folders"]
+    assert await accessible_archive_folder_ids(
+        db_session, reader, [folder_a.id, folder_b.id]
+    ) == {folder_a.id}
+
+
+@pytest.mark.asyncio
+async def test_get_or_404_and_check_access(db_session, access_graph):
+    own, shared, _posted, private = access_graph["docs"]
+    reader = access_graph["reader"]
+
+    assert await get_or_404(db_session, Document, shared.id) is shared
+    with pytest.raises(HTTPException) as exc:
+        await get_or_404(db_session, Document, 999999)
+    assert exc.value.status_code == 404
+
+    await check_access(
+        db_session,
+        shared,
+        reader.id,
+        share_model=DocumentShare,
+        entity_id_field="document_id",
+        user_id_field="recipient_id",
+    )
+    with pytest.raises(HTTPException) as exc:
+        await check_access(
+            db_session,
+            private,
+            reader.id,
+            share_model=DocumentShare,
+            entity_id_field="document_id",
+            user_id_field="recipient_id",
+        )
+    assert exc.value.status_code == 403
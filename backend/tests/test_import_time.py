@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative `-X importtime` budget for `import app.main`, in milliseconds.
+# Generous enough for slow CI machines; regressions are usually much larger
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "3000"))
+
+# Optional dependencies that must only load on first use
+DEFERRED_MODULES = ["zeroconf", "aiosmtpd", "aiosmtplib", "bleach", "psutil"]
+
+PROBE = """
+import json, sys
+import app.main
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def import_app(subsystems: str):
+    env = dict(os.environ, SUBSYSTEMS=subsystems)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    modules = set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.endswith("| app.main"):
+            cumulative_us = int(line.split("|")[1])
+    assert cumulative_us is not None, "app.main missing from importtime output"
+    return modules, cumulative_us / 1000
+
+
+def test_app_import_time_within_budget():
+    modules, import_ms = import_app("email,smtp,zsspd,mdns,metrics")
+
+    assert import_ms < IMPORT_TIME_BUDGET_MS, (
+        f"import app.main took {import_ms:.0f} ms "
+        f"(budget {IMPORT_TIME_BUDGET_MS} ms)"
+    )
+    loaded = [name for name in DEFERRED_MODULES if name in modules]
+    assert not loaded, f"Imported eagerly: {loaded}"
+
+
+def test_disabled_subsystems_are_not_imported():
+    modules, _ = import_app("")
+
+    for name in (
+        "app.modules.email.router",
+        "app.modules.zsspd.router",
+        "prometheus_fastapi_instrumentator",
+    ):
+        assert name not in modules
@@ -0,0 +1,67 @@
+import io
+import json
+import logging
+import logging.handlers
+import queue
+import time
+
+from app.core.logging_setup import (
+    ContextQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    parse_sample_rates,
+)
+from app.core.middleware import request_id
+
+
+class SlowHandler(logging.Handler):
+    """Handler whose writes take 10 ms (slow disk / blocked stdout)"""
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.setFormatter(JsonFormatter())
+
+    def emit(self, record):
+        time.sleep(0.01)
+        self.stream.write(self.format(record) + "\n")
+
+
+def test_queue_handler_keeps_slow_io_off_the_caller():
+    stream = io.StringIO()
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, SlowHandler(stream))
+    test_logger = logging.getLogger("tests.logging.pipeline")
+    test_logger.handlers = [ContextQueueHandler(log_queue)]
+    test_logger.propagate = False
+    test_logger.setLevel(logging.INFO)
+    listener.start()
+    try:
+        token = request_id.set("req-1")
+        started = time.perf_counter()
+        for i in range(50):
+            test_logger.info("message %d of %s", i, "batch")
+        elapsed = time.perf_counter() - started
+        request_id.reset(token)
+    finally:
+        listener.stop()
+
+    # 50 x 10 ms of I/O happened on the listener thread, not here
+    assert elapsed < 0.1
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 50
+    assert lines[3]["message"] == "message 3 of batch"
+    assert lines[3]["request_id"] == "req-1"
+    assert lines[3]["logger"] == "tests.logging.pipeline"
+
+
+def test_sampling_filter_keeps_warnings():
+    info = logging.LogRecord("x", logging.INFO, __file__, 1, "hi", None, None)
+    warning = logging.LogRecord("x", logging.WARNING, __file__, 1, "hi", None, None)
+    assert not SamplingFilter(0.0).filter(info)
+    assert SamplingFilter(0.0).filter(warning)
+    assert SamplingFilter(1.0).filter(info)
+    assert parse_sample_rates("app.access=0.1, chat = 0.5,bad") == {
+        "app.access": 0.1,
+        "chat": 0.5,
+    }
@@ -0,0 +1,65 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core.middleware import RequestContextMiddleware, request_id
+
+
+def make_app(seen_ids):
+    async def api(request):
+        seen_ids.append((request.state.request_id, request_id.get()))
+        return PlainTextResponse(
+            "ok", headers={"X-Frame-Options": "SAMEORIGIN", "X-Custom": "1"}
+        )
+
+    async def stream(request):
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}".encode()
+
+        return StreamingResponse(chunks())
+
+    app = Starlette(routes=[Route("/api/ping", api), Route("/files/stream", stream)])
+    return RequestContextMiddleware(app, sample_rate=0)
+
+
+@pytest.mark.asyncio
+async def test_request_id_and_security_headers():
+    seen_ids = []
+    async with AsyncClient(
+        transport=ASGITransport(app=make_app(seen_ids)), base_url="http://test"
+    ) as client:
+        response = await client.get("/api/ping")
+        generated = response.headers["x-request-id"]
+        assert seen_ids == [(generated, generated)]
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert response.headers["content-security-policy"].startswith(
+            "default-src 'none'"
+        )
+        # Middleware values replace the app's, other headers are kept
+        assert response.headers.get_list("x-frame-options") == ["DENY"]
+        assert response.headers["x-custom"] == "1"
+
+        second = await client.get("/api/ping")
+        assert second.headers["x-request-id"] != generated
+
+        # Well-formed IDs from the proxy are kept, anything else is replaced
+        forwarded = await client.get(
+            "/api/ping", headers={"X-Request-ID": "edge-1234abcd"}
+        )
+        assert forwarded.headers["x-request-id"] == "edge-1234abcd"
+        bogus = await client.get("/api/ping", headers={"X-Request-ID": "a b\tc"})
+        assert bogus.headers["x-request-id"] != "a b\tc"
+
+
+@pytest.mark.asyncio
+async def test_streaming_responses_pass_through():
+    async with AsyncClient(
+        transport=ASGITransport(app=make_app([])), base_url="http://test"
+    ) as client:
+        response = await client.get("/files/stream")
+        assert response.text == "chunk0chunk1chunk2"
+        assert response.headers["x-frame-options"] == "DENY"
+        assert "content-security-policy" not in response.headers
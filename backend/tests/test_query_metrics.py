@@ -0,0 +1,66 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+
+from app.core.query_metrics import normalize_statement, query_budget
+from app.core.security import create_access_token
+from app.modules.auth.models import User
+from app.modules.tasks.models import Task, TaskStatus
+
+
+def test_normalize_statement_collapses_in_lists_and_literals():
+    sql, fingerprint = normalize_statement(
+        "SELECT users.id FROM users\n WHERE users.id IN (?, ?, ?) AND users.role = 'admin'"
+    )
+    assert sql == "SELECT users.id FROM users WHERE users.id IN (?) AND users.role = ?"
+    assert fingerprint == "SELECT users"
+    assert normalize_statement("SELECT 1 FROM users WHERE id IN (?, ?)")[0] == (
+        normalize_statement("SELECT 1 FROM users WHERE id IN (?, ?, ?, ?)")[0]
+    )
+
+
+@pytest.mark.asyncio
+async def test_query_budget_fails_when_exceeded(db_session):
+    with pytest.raises(AssertionError, match="Query budget exceeded"):
+        with query_budget(1):
+            await db_session.execute(select(User))
+            await db_session.execute(select(User))
+
+
+@pytest.mark.asyncio
+async def test_issued_tasks_query_count_is_constant(client, db_session):
+    issuer = User(username="budget_issuer", email="bi@example.com", hashed_password="x")
+    assignee = User(
+        username="budget_assignee", email="ba@example.com", hashed_password="x"
+    )
+    db_session.add_all([issuer, assignee])
+    await db_session.flush()
+    deadline = datetime.now(timezone.utc) + timedelta(days=1)
+    db_session.add_all(
+        Task(
+            title=f"Task {i}",
+            description="Budget check",
+            issuer_id=issuer.id,
+            assignee_id=assignee.id,
+            deadline=deadline,
+            status=TaskStatus.IN_PROGRESS,
+        )
+        for i in range(10)
+    )
+    await db_session.commit()
+
+    headers = {
+        "Authorization": f"Bearer {create_access_token({'sub': str(issuer.id)})}"
+    }
+    labels = {"route": "/api/tasks/issued"}
+    before = REGISTRY.get_sample_value("db_queries_per_request_count", labels) or 0
+
+    # user lookup + tasks + issuers/assignees + their units, regardless of row count
+    with query_budget(6):
+        response = await client.get("/api/tasks/issued", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+
+    after = REGISTRY.get_sample_value("db_queries_per_request_count", labels)
+    assert after == before + 1
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import event, select
+
+from app.core.query_metrics import query_budget
+from app.core.repository import BaseRepository
+from app.modules.auth.models import Unit
+
+units = BaseRepository(Unit)
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_returns_ids_in_order(db_session):
+    ids = await units.bulk_insert(db_session, [{"name": f"Bulk {i}"} for i in range(5)])
+    assert len(ids) == 5
+
+    result = await db_session.execute(
+        select(Unit.id, Unit.name).where(Unit.id.in_(ids))
+    )
+    names = dict(result.all())
+    assert [names[i] for i in ids] == [f"Bulk {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_get_many_uses_identity_map_and_one_query(db_session):
+    ids = await units.bulk_insert(db_session, [{"name": f"Many {i}"} for i in range(4)])
+    cached = await units.get_by_id(db_session, ids[0])
+
+    with query_budget(1):
+        found = await units.get_many(db_session, ids + [ids[0], 999999])
+
+    assert set(found) == set(ids)
+    assert found[ids[0]] is cached
+
+
+@pytest.mark.asyncio
+async def test_count_update_many_and_bulk_update(db_session):
+    ids = await units.bulk_insert(
+        db_session, [{"name": f"Count {i}"} for i in range(3)]
+    )
+    assert await units.count(db_session, Unit.name.like("Count %")) == 3
+
+    assert await units.update_many(db_session, ids[:2], {"description": "batch"}) == 2
+    await units.bulk_update(db_session, [{"id": ids[2], "description": "single"}])
+
+    result = await db_session.execute(
+        select(Unit.description).where(Unit.id.in_(ids)).order_by(Unit.id)
+    )
+    assert result.scalars().all() == ["batch", "batch", "single"]
+
+
+@pytest.mark.asyncio
+async def test_iterate_pages_by_keyset(db_session):
+    ids = await units.bulk_insert(db_session, [{"name": f"Iter {i}"} for i in range(7)])
+
+    batches = [
+        [u.id for u in batch]
+        async for batch in units.iterate(
+            db_session, Unit.name.like("Iter %"), batch_size=3
+        )
+    ]
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert [i for b in batches for i in b] == sorted(ids)
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_can_join_the_callers_transaction(db_session):
+    commits = []
+    sync_session = db_session.sync_session
+
+    def listener(session):
+        commits.append(session)
+
+    event.listen(sync_session, "after_commit", listener)
+    try:
+        ids = await units.bulk_insert(
+            db_session, [{"name": f"Tx {i}"} for i in range(3)], commit=False
+        )
+        await units.update_many(db_session, ids, {"description": "tx"}, commit=False)
+        await units.bulk_update(
+            db_session, [{"id": ids[0], "description": "first"}], commit=False
+        )
+        assert commits == []
+        assert db_session.in_transaction()
+
+        await db_session.commit()
+        assert len(commits) == 1
+    finally:
+        event.remove(sync_session, "after_commit", listener)
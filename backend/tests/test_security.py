@@ -0,0 +1,137 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.core.security import (
+    TokenVerificationCache,
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    get_password_hash_async,
+    token_cache,
+    verify_password_async,
+)
+
+
+def test_decode_access_token_caches_claims():
+    token_cache.clear()
+    token = create_access_token({"sub": 42})
+
+    first = decode_access_token(token)
+    assert first["sub"] == "42"
+    assert token_cache.get(token) is not None
+
+    # Callers get a copy, so mutating it can't poison the cache
+    first["sub"] = "mutated"
+    assert decode_access_token(token)["sub"] == "42"
+
+
+def test_refresh_and_expired_tokens_are_not_cached():
+    token_cache.clear()
+    refresh = create_refresh_token({"sub": 1})
+    assert decode_access_token(refresh)["type"] == "refresh"
+    assert token_cache.get(refresh) is None
+
+    expired = create_access_token({"sub": 1}, expires_delta=timedelta(seconds=-1))
+    assert decode_access_token(expired) is None
+    assert token_cache.get(expired) is None
+
+
+def test_discard_user_and_bounded_size():
+    cache = TokenVerificationCache(max_size=2)
+    tokens = [create_access_token({"sub": uid}) for uid in (1, 2, 3)]
+    for token in tokens:
+        cache.put(token, decode_access_token(token))
+
+    assert cache.get(tokens[0]) is None
+    assert cache.get(tokens[2]) is not None
+
+    cache.discard_user(3)
+    assert cache.get(tokens[2]) is None
+    assert cache.get(tokens[1]) is not None
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_does_not_block_event_loop():
+    ticks = 0
+    stop = asyncio.Event()
+
+    async def ticker():
+        nonlocal ticks
+        while not stop.is_set():
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    hashes = await asyncio.gather(
+        *(get_password_hash_async("secret") for _ in range(3))
+    )
+    stop.set()
+    await ticker_task
+
+    # Three 12-round hashes take hundreds of ms; the loop kept running meanwhile
+    assert ticks > 5
+    assert await verify_password_async("secret", hashes[0])
+    assert not await verify_password_async("wrong", hashes[0])
+
+
+def test_bloom_filter_has_no_false_negatives():
+    from app.core.token_revocation import BloomFilter
+
+    bloom = BloomFilter(capacity=1000)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 100
+
+
+@pytest.mark.asyncio
+async def test_revocation_during_rebuild_is_kept(monkeypatch):
+    from app.core import token_revocation
+    from app.core.token_revocation import TokenRevocationStore
+
+    store = TokenRevocationStore(capacity=100, rebuild_interval_seconds=60)
+
+    async def zremrangebyscore(name, min_score, max_score):
+        return 0
+
+    async def zrangebyscore(name, min_score, max_score):
+        # Published by another worker while this one reads the sorted set
+        await store._handle_revoked({"jti": "revoked-meanwhile"})
+        return ["revoked-earlier"]
+
+    redis = token_revocation.redis_manager
+    monkeypatch.setattr(redis, "zremrangebyscore", zremrangebyscore)
+    monkeypatch.setattr(redis, "zrangebyscore", zrangebyscore)
+    await store.rebuild()
+
+    assert "revoked-earlier" in store._filter
+    assert "revoked-meanwhile" in store._filter
+
+
+@pytest.mark.asyncio
+async def test_failed_rebuild_keeps_the_filter(monkeypatch):
+    from app.core import token_revocation
+    from app.core.token_revocation import TokenRevocationStore
+
+    store = TokenRevocationStore(capacity=100, rebuild_interval_seconds=60)
+    store._load(["revoked"])
+
+    class FailingRedis:
+        async def zremrangebyscore(self, *args):
+            return 0
+
+        async def zrangebyscore(self, *args):
+            raise ConnectionError("redis down")
+
+    redis = token_revocation.redis_manager
+    monkeypatch.setattr(redis, "_fallback_mode", False)
+    monkeypatch.setattr(redis, "_redis", FailingRedis())
+    with pytest.raises(ConnectionError):
+        await store.rebuild()
+
+    assert "revoked" in store._filter
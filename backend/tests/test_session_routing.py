@@ -0,0 +1,150 @@
+import os
+
+import pytest
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base, RoutingSession, set_sqlite_pragma
+from app.core.replicas import ReplicaSet, request_user_id
+from app.modules.auth.models import User
+
+ROUTING_DB_PATH = "./test_routing.db"
+ROUTING_DB_URL = f"sqlite+aiosqlite:///{ROUTING_DB_PATH}"
+
+
+@pytest.fixture
+async def routed_sessions():
+    writer = create_async_engine(ROUTING_DB_URL, pool_size=1, max_overflow=0)
+    reader = create_async_engine(ROUTING_DB_URL, pool_size=2, max_overflow=0)
+    for eng in (writer, reader):
+        event.listen(eng.sync_engine, "connect", set_sqlite_pragma)
+
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    used = []
+    for name, eng in (("writer", writer), ("reader", reader)):
+        event.listen(
+            eng.sync_engine,
+            "before_cursor_execute",
+            lambda *args, _name=name: used.append(_name),
+        )
+
+    factory = async_sessionmaker(
+        writer,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        reader=reader,
+        expire_on_commit=False,
+    )
+    yield factory, used
+
+    await writer.dispose()
+    await reader.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(ROUTING_DB_PATH + suffix):
+            os.remove(ROUTING_DB_PATH + suffix)
+
+
+@pytest.mark.asyncio
+async def test_reads_use_reader_and_writes_stick_to_writer(routed_sessions):
+    factory, used = routed_sessions
+
+    async with factory() as session:
+        await session.execute(select(User))
+        assert used == ["reader"]
+
+        used.clear()
+        session.add(
+            User(
+                username="routed",
+                email="routed@example.com",
+                hashed_password="x",
+                full_name="Routed User",
+            )
+        )
+        await session.flush()
+        # After a write, reads in the same transaction see uncommitted rows
+        result = await session.execute(select(User).where(User.username == "routed"))
+        assert result.scalar_one_or_none() is not None
+        assert set(used) == {"writer"}
+
+        await session.commit()
+
+        # A new transaction goes back to the reader and sees the committed row
+        used.clear()
+        result = await session.execute(select(User).where(User.username == "routed"))
+        assert result.scalar_one_or_none() is not None
+        assert used == ["reader"]
+
+
+@pytest.mark.asyncio
+async def test_raw_sql_writes_use_writer(routed_sessions):
+    factory, used = routed_sessions
+
+    async with factory() as session:
+        await session.execute(text("SELECT count(*) FROM users"))
+        assert used == ["reader"]
+
+        used.clear()
+        await session.execute(
+            text("UPDATE users SET full_name = 'Raw' WHERE username = 'nobody'")
+        )
+        await session.execute(text("select count(*) FROM users"))
+        assert set(used) == {"writer"}
+        await session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_readonly_sessions_use_replica_until_user_writes(routed_sessions):
+    factory, used = routed_sessions
+    writer = factory.kw["bind"]
+    replica = create_async_engine(ROUTING_DB_URL)
+    event.listen(
+        replica.sync_engine,
+        "before_cursor_execute",
+        lambda *args: used.append("replica"),
+    )
+    replica_set = ReplicaSet(
+        [replica],
+        max_lag_seconds=5,
+        read_your_writes_seconds=60,
+        check_interval_seconds=60,
+    )
+    readonly = async_sessionmaker(
+        writer,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        replicas=replica_set,
+    )
+    token = request_user_id.set(42)
+    try:
+        used.clear()
+        async with readonly() as session:
+            await session.execute(select(User))
+        assert used == ["replica"]
+
+        # Lagging replicas drop out of rotation
+        replica_set._lag[0] = 30
+        used.clear()
+        async with readonly() as session:
+            await session.execute(select(User))
+        assert used == ["writer"]
+        replica_set._lag[0] = 0
+
+        # After this user's write, their reads stay on the primary
+        replica_set.mark_write(42)
+        used.clear()
+        async with readonly() as session:
+            await session.execute(select(User))
+        assert used == ["writer"]
+
+        # Other users keep reading from the replica
+        request_user_id.set(7)
+        used.clear()
+        async with readonly() as session:
+            await session.execute(select(User))
+        assert used == ["replica"]
+    finally:
+        request_user_id.reset(token)
+        await replica.dispose()
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import event
+
+from app.core.config_service import ConfigService, SettingsCache, settings_cache
+from app.core.models import SystemSetting
+from app.modules.admin.service import SystemSettingService
+
+
+async def _count_queries(db_session, coro):
+    statements = []
+    sync_engine = db_session.bind.engine.sync_engine
+
+    def before_execute(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", before_execute)
+    try:
+        result = await coro
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_execute)
+    return result, len(statements)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_memory(db_session):
+    db_session.add_all(
+        [
+            SystemSetting(key="chat_rate_limit", value="30", type="int", group="chat"),
+            SystemSetting(key="chat_allow_delete", value="false", type="bool"),
+        ]
+    )
+    await db_session.flush()
+
+    await settings_cache.load(db_session)
+
+    value, queries = await _count_queries(
+        db_session, ConfigService.get_value(db_session, "chat_rate_limit")
+    )
+    assert value == "30"
+    assert queries == 0
+
+    assert await SystemSettingService.get_value(db_session, "chat_rate_limit") == 30
+    assert (
+        await SystemSettingService.get_value(db_session, "chat_allow_delete") is False
+    )
+    assert await ConfigService.get_value(db_session, "missing", "dflt") == "dflt"
+    assert (
+        await ConfigService.get_value(db_session, "chat_rate_limit", group="email")
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_set_value_updates_cache(db_session):
+    await ConfigService.set_value(db_session, "chat_page_size", "25", group="chat")
+    assert await ConfigService.get_value(db_session, "chat_page_size") == "25"
+
+    await ConfigService.set_value(db_session, "chat_page_size", "40")
+    value, queries = await _count_queries(
+        db_session, ConfigService.get_value(db_session, "chat_page_size")
+    )
+    assert value == "40"
+    assert queries == 0
+
+
+@pytest.mark.asyncio
+async def test_change_message_from_other_worker():
+    cache = SettingsCache()
+    cache._loaded_at = 0.0
+    cache._subscribed = True
+
+    await cache._handle_message(
+        {"key": "email_smtp_port", "value": "2526", "type": "int", "group": "email"}
+    )
+    entry = await cache.get(None, "email_smtp_port")
+    assert entry.value == "2526"
+
+    await cache._handle_message({"reload": True})
+    assert not cache.is_loaded
+
+
+@pytest.mark.asyncio
+async def test_snapshot_expires_without_redis(monkeypatch):
+    from app.core import config_service
+    from app.core.redis_manager import redis_manager
+
+    # In-memory pub/sub fallback: no notifications from other workers
+    monkeypatch.setattr(redis_manager, "_fallback_mode", True)
+    monkeypatch.setattr(redis_manager, "_local_subscribers", {})
+    cache = SettingsCache()
+    await cache.subscribe()
+    cache._loaded_at = config_service.time.monotonic()
+    assert cache.is_loaded
+
+    cache._loaded_at -= config_service.UNSUBSCRIBED_TTL_SECONDS + 1
+    assert not cache.is_loaded
@@ -0,0 +1,105 @@
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.core.smtp_pool import SMTPPool
+
+
+class RelayHandler:
+    """Local relay stand-in: records sessions, replies from a script"""
+
+    def __init__(self, replies=()):
+        self.replies = list(replies)
+        self.sessions = set()
+        self.delivered = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        if self.replies:
+            return self.replies.pop(0)
+        self.delivered.append(envelope.content)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_message(i: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@example.com"
+    msg["To"] = f"user{i}@example.com"
+    msg["Subject"] = f"Notification {i}"
+    msg.set_content("Body")
+    return msg
+
+
+@pytest.fixture
+def relay():
+    handler = RelayHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_reuses_connections_within_host_limit(relay):
+    handler, port = relay
+    pool = SMTPPool(max_per_host=2)
+
+    results = await pool.send_many(
+        [build_message(i) for i in range(20)], "127.0.0.1", port
+    )
+    # Later messages reuse the idle connections
+    result = await pool.send(build_message(20), "127.0.0.1", port)
+    await pool.close()
+
+    assert all(r.delivered for r in results) and result.delivered
+    assert len(handler.delivered) == 21
+    assert pool.connects <= 2
+    assert len(handler.sessions) <= 2
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried(relay):
+    handler, port = relay
+    handler.replies = ["451 Try again later"]
+    pool = SMTPPool(retries=3, backoff_seconds=0.01)
+
+    result = await pool.send(build_message(0), "127.0.0.1", port)
+    await pool.close()
+
+    assert result.delivered
+    assert result.attempts == 2
+    assert len(handler.delivered) == 1
+
+
+@pytest.mark.asyncio
+async def test_permanent_failures_are_not_retried(relay):
+    handler, port = relay
+    handler.replies = ["554 Rejected"]
+    pool = SMTPPool(retries=3, backoff_seconds=0.01)
+
+    result = await pool.send(build_message(0), "127.0.0.1", port)
+    await pool.close()
+
+    assert not result.delivered
+    assert result.permanent
+    assert result.attempts == 1
+    assert result.error.startswith("554")
+
+
+@pytest.mark.asyncio
+async def test_unreachable_relay_gives_up_after_retries():
+    pool = SMTPPool(retries=2, backoff_seconds=0.01, timeout=2)
+
+    result = await pool.send(build_message(0), "127.0.0.1", free_port())
+
+    assert not result.delivered
+    assert not result.permanent
+    assert result.attempts == 2